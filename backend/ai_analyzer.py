@@ -1,34 +1,61 @@
 """
 AI Analysis Module for The Village
 
-This module uses Google Gemini to analyze call transcripts in real-time and detect:
+This module analyzes call transcripts in real-time (via a pluggable backend, Google
+Gemini by default - see analysis_backends.py) and detects:
 - Wellbeing indicators (emotional, physical, cognitive)
 - Concerns that require action
 - Profile updates (new information about the elder)
 """
 
 import os
-import json
+import asyncio
+import time
 import uuid
 from typing import Dict, List, Optional
 from datetime import datetime
-import google.genai as genai
 
 from backend.models import (
     CallSession, TranscriptLine, WellbeingAssessment,
-    Concern, ProfileFact, Elder
+    Concern, ProfileFact, Elder, WellbeingDimension
 )
+from backend.analysis_backends import AnalysisBackend, create_backend
+from backend.analysis_context import AnalysisContextStore
 
-# Configure Gemini
-GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
+# Per-request timeout and global limit on concurrent LLM requests (across all calls)
+ANALYSIS_TIMEOUT_SECONDS = float(os.environ.get("ANALYSIS_TIMEOUT_SECONDS", "20"))
+ANALYSIS_MAX_CONCURRENCY = int(os.environ.get("ANALYSIS_MAX_CONCURRENCY", "8"))
+
+# Bounds for the per-call context store
+ANALYSIS_CONTEXT_MAX_CALLS = int(os.environ.get("ANALYSIS_CONTEXT_MAX_CALLS", "500"))
+ANALYSIS_CONTEXT_MAX_LINES = int(os.environ.get("ANALYSIS_CONTEXT_MAX_LINES", "50"))
+ANALYSIS_CONTEXT_IDLE_TTL_SECONDS = float(os.environ.get("ANALYSIS_CONTEXT_IDLE_TTL_SECONDS", "1800"))
+
+# Normalize backend vocabulary to the model enums
+CONCERN_DIMENSIONS = {d.value for d in WellbeingDimension}
+SEVERITY_ALIASES = {"medium": "moderate"}
+PROFILE_CATEGORY_ALIASES = {"health": "medical", "routine": "preferences"}
 
 
 class AIAnalyzer:
-    """Analyzes call transcripts using Google Gemini 2.5 Flash"""
+    """Analyzes call transcripts using an AnalysisBackend (Gemini by default)"""
 
-    def __init__(self):
-        self.model = genai.Client(api_key=GOOGLE_API_KEY) if GOOGLE_API_KEY else None
-        self.analysis_context = {}  # Store running context per call_id
+    def __init__(
+        self,
+        backend: Optional[AnalysisBackend] = None,
+        timeout_seconds: float = ANALYSIS_TIMEOUT_SECONDS,
+        max_concurrency: int = ANALYSIS_MAX_CONCURRENCY
+    ):
+        self.backend = backend or create_backend()
+        # Running context per call_id (bounded, evicts idle calls)
+        self.analysis_context = AnalysisContextStore(
+            max_calls=ANALYSIS_CONTEXT_MAX_CALLS,
+            max_lines_per_call=ANALYSIS_CONTEXT_MAX_LINES,
+            idle_ttl_seconds=ANALYSIS_CONTEXT_IDLE_TTL_SECONDS,
+            on_evict=self.backend.release
+        )
+        self.timeout_seconds = timeout_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
 
     async def analyze_transcript_chunk(
         self,
@@ -37,7 +64,7 @@ class AIAnalyzer:
         new_transcript_line: TranscriptLine
     ) -> Dict:
         """
-        Analyze a new transcript chunk and return insights.
+        Record a new transcript chunk and analyze the call.
 
         Returns:
             {
@@ -47,56 +74,45 @@ class AIAnalyzer:
                 "suggested_actions": List[Dict]
             }
         """
-        call_id = call.id
-
-        # Initialize context if this is the first chunk
-        if call_id not in self.analysis_context:
-            self.analysis_context[call_id] = {
-                "transcript_history": [],
-                "detected_concerns": [],
-                "wellbeing_indicators": {
-                    "mood": None,
-                    "energy": None,
-                    "cognitive_clarity": None,
-                    "social_engagement": None
-                }
-            }
+        self.record_transcript_line(call, new_transcript_line)
+        return await self.analyze_call(call, elder)
 
-        # Add to context
-        context = self.analysis_context[call_id]
+    def record_transcript_line(self, call: CallSession, new_transcript_line: TranscriptLine):
+        """Add a transcript line to the call's running context without analyzing it."""
+        context = self._get_context(call.id)
         context["transcript_history"].append({
             "speaker": new_transcript_line.speaker,
             "text": new_transcript_line.text,
             "timestamp": new_transcript_line.timestamp
         })
+        context["lines_seen"] += 1
+
+    async def analyze_call(self, call: CallSession, elder: Elder) -> Dict:
+        """
+        Analyze the latest state of a call's transcript.
+        Same return shape as analyze_transcript_chunk.
+        """
+        call_id = call.id
+        context = self._get_context(call_id)
 
         # Only analyze if we have enough context (at least 3 exchanges)
         if len(context["transcript_history"]) < 3:
-            return {
-                "wellbeing_update": None,
-                "concerns": [],
-                "profile_facts": [],
-                "suggested_actions": []
-            }
-
-        # Build analysis prompt
-        prompt = self._build_analysis_prompt(elder, context["transcript_history"])
+            return self._empty_analysis()
 
         try:
-            # Call Gemini API
-            if not self.model:
-                return {
-                    "wellbeing_update": None,
-                    "concerns": [],
-                    "profile_facts": [],
-                    "suggested_actions": []
-                }
-
-            response = self.model.models.generate_content(
-                model='gemini-2.0-flash-exp',
-                contents=prompt
-            )
-            analysis = self._parse_gemini_response(response.text)
+            if not self.backend.available:
+                return self._empty_analysis()
+
+            lines_seen = context["lines_seen"]
+            async with self._semaphore:
+                analysis = await asyncio.wait_for(
+                    self.backend.analyze(elder, context),
+                    timeout=self.timeout_seconds
+                )
+
+            # The next analysis only needs the lines added after this one
+            context["lines_analyzed"] = lines_seen
+            context["last_analysis"] = analysis
 
             # Update wellbeing assessment
             wellbeing_update = self._create_wellbeing_assessment(
@@ -130,122 +146,38 @@ class AIAnalyzer:
                 "suggested_actions": suggested_actions
             }
 
+        except asyncio.TimeoutError:
+            print(f"AI analysis timed out after {self.timeout_seconds}s for call {call_id}")
+            return self._empty_analysis()
         except Exception as e:
             print(f"Error in AI analysis: {e}")
-            return {
-                "wellbeing_update": None,
-                "concerns": [],
-                "profile_facts": [],
-                "suggested_actions": []
+            return self._empty_analysis()
+
+    def _get_context(self, call_id: str) -> Dict:
+        """Get the running context for a call, creating it on the first chunk"""
+        return self.analysis_context.get_or_create(call_id, lambda: {
+            "transcript_history": [],  # Becomes a bounded ring buffer in the store
+            "lines_seen": 0,
+            "lines_analyzed": 0,
+            "last_analysis": None,
+            "started_at": time.monotonic(),
+            "detected_concerns": [],
+            "wellbeing_indicators": {
+                "mood": None,
+                "energy": None,
+                "cognitive_clarity": None,
+                "social_engagement": None
             }
+        })
 
-    def _build_analysis_prompt(self, elder: Elder, transcript_history: List[Dict]) -> str:
-        """Build the analysis prompt for Gemini"""
-
-        # Format transcript
-        transcript_text = "\n".join([
-            f"{line['speaker'].upper()}: {line['text']}"
-            for line in transcript_history[-10:]  # Last 10 exchanges
-        ])
-
-        prompt = f"""You are an AI assistant analyzing a wellness check-in call with an elderly person.
-
-**Elder Information:**
-- Name: {elder.name}
-- Age: {elder.age}
-- Baseline: {elder.wellbeing_baseline.typical_mood if elder.wellbeing_baseline else 'Unknown'}
-
-**Recent Conversation:**
-{transcript_text}
-
-**Your Task:**
-Analyze this conversation and provide a JSON response with the following structure:
-
-{{
-  "wellbeing": {{
-    "mood": "description of current mood",
-    "loneliness_level": "none|mild|moderate|high",
-    "grief_indicators": true|false,
-    "fear_indicators": true|false,
-    "hope_indicators": true|false,
-    "emotional_notes": "any emotional observations",
-    "depression_indicators": ["specific observations"],
-    "anxiety_indicators": ["specific observations"],
-    "purpose_level": "strong|moderate|low|absent",
-    "mental_pattern_change": true|false,
-    "mental_notes": "any mental health observations",
-    "family_contact_recency": "when they last spoke to family",
-    "isolation_level": "none|mild|moderate|severe",
-    "community_engagement": "description of social activities",
-    "support_network_strength": "strong|moderate|weak",
-    "social_notes": "any social observations",
-    "pain_reported": true|false,
-    "pain_details": "description if pain reported",
-    "mobility_concerns": true|false,
-    "sleep_issues": true|false,
-    "nutrition_concerns": true|false,
-    "medication_issues": true|false,
-    "energy_level": "good|low|very_low",
-    "physical_notes": "any physical observations",
-    "memory_concerns": true|false,
-    "orientation_issues": true|false,
-    "cognitive_baseline_change": true|false,
-    "cognitive_notes": "any cognitive observations",
-    "overall_concern_level": "none|low|moderate|high|critical"
-  }},
-  "concerns": [
-    {{
-      "type": "physical|emotional|cognitive|social|safety",
-      "severity": "low|medium|high|critical",
-      "description": "what was said or observed",
-      "action_required": true|false,
-      "reasoning": "why this is a concern"
-    }}
-  ],
-  "profile_updates": [
-    {{
-      "category": "health|family|interests|routine|preferences",
-      "fact": "new information learned"
-    }}
-  ],
-  "suggested_actions": [
-    {{
-      "action_type": "call_family|call_neighbor|call_medical|call_volunteer",
-      "urgency": "immediate|soon|routine",
-      "reason": "why this action is needed",
-      "suggested_contact": "which village member role"
-    }}
-  ]
-}}
-
-**Guidelines:**
-- Be objective and evidence-based
-- Flag concerns early but don't over-dramatize
-- Consider the elder's baseline when assessing changes
-- Only suggest actions when truly warranted
-- Empty arrays are acceptable if nothing detected
-
-Respond with ONLY valid JSON, no additional text."""
-
-        return prompt
-
-    def _parse_gemini_response(self, response_text: str) -> Dict:
-        """Parse Gemini's JSON response"""
-        try:
-            # Clean up response (remove markdown code blocks if present)
-            cleaned = response_text.strip()
-            if cleaned.startswith("```json"):
-                cleaned = cleaned[7:]
-            if cleaned.startswith("```"):
-                cleaned = cleaned[3:]
-            if cleaned.endswith("```"):
-                cleaned = cleaned[:-3]
-
-            return json.loads(cleaned.strip())
-        except json.JSONDecodeError as e:
-            print(f"Failed to parse Gemini response: {e}")
-            print(f"Response was: {response_text}")
-            return {"wellbeing": {}, "concerns": [], "profile_updates": [], "suggested_actions": []}
+    @staticmethod
+    def _empty_analysis() -> Dict:
+        return {
+            "wellbeing_update": None,
+            "concerns": [],
+            "profile_facts": [],
+            "suggested_actions": []
+        }
 
     def _create_wellbeing_assessment(self, call_id: str, wellbeing_data: Dict) -> Optional[WellbeingAssessment]:
         """Create a WellbeingAssessment from AI analysis"""
@@ -312,16 +244,22 @@ Respond with ONLY valid JSON, no additional text."""
         concerns = []
 
         for concern_data in concerns_data:
+            # Older prompts put the dimension in "type" and used "medium" severity
+            dimension = concern_data.get("dimension") or concern_data.get("type", "")
+            if dimension not in CONCERN_DIMENSIONS:
+                dimension = "physical" if dimension == "safety" else "emotional"
+            severity = concern_data.get("severity", "moderate")
+            severity = SEVERITY_ALIASES.get(severity, severity)
+
             concern = Concern(
                 id=str(uuid.uuid4()),
-                call_session_id=call_id,
+                dimension=dimension,
                 type=concern_data.get("type", "general"),
-                severity=concern_data.get("severity", "medium"),
+                severity=severity,
                 description=concern_data.get("description", ""),
-                detected_at=datetime.utcnow().isoformat(),
-                action_required=concern_data.get("action_required", False),
-                action_taken=None,
-                resolved=False
+                quote=concern_data.get("quote", ""),
+                detected_at=datetime.utcnow(),
+                action_required=concern_data.get("action_required", False)
             )
             concerns.append(concern)
 
@@ -332,13 +270,16 @@ Respond with ONLY valid JSON, no additional text."""
         facts = []
 
         for update in profile_updates:
+            category = update.get("category", "history")
+            category = PROFILE_CATEGORY_ALIASES.get(category, category)
+
             fact = ProfileFact(
                 id=str(uuid.uuid4()),
-                call_session_id=call_id,
-                category=update.get("category", "general"),
                 fact=update.get("fact", ""),
-                detected_at=datetime.utcnow().isoformat(),
-                confidence=0.8  # Default confidence
+                category=category,
+                context=update.get("context"),
+                learned_at=datetime.utcnow(),
+                source_call_id=call_id
             )
             facts.append(fact)
 
@@ -385,20 +326,50 @@ Respond with ONLY valid JSON, no additional text."""
         # Find first available member with preferred role
         for role in preferred_roles:
             for member in elder.village:
-                if role.lower() in member.role.lower() and member.available:
+                if role.lower() in member.role.lower() and getattr(member, "available", True):
                     return member.dict()
 
         # Fallback to any available member
         for member in elder.village:
-            if member.available:
+            if getattr(member, "available", True):
                 return member.dict()
 
         return None
 
+    def token_stats(self) -> Dict:
+        """Prompt/output token usage per active call, including prompt tokens per call minute"""
+        calls = {}
+        for call_id, context in self.analysis_context.items():
+            usage = context.get("token_usage")
+            if not usage:
+                continue
+            minutes = max((time.monotonic() - context["started_at"]) / 60, 1 / 60)
+            calls[call_id] = {
+                **usage,
+                "prompt_tokens_per_call_minute": round(usage["prompt_tokens"] / minutes, 1)
+            }
+
+        return {
+            "backend": self.backend.name,
+            "prompt_tokens": sum(c["prompt_tokens"] for c in calls.values()),
+            "cached_tokens": sum(c["cached_tokens"] for c in calls.values()),
+            "output_tokens": sum(c["output_tokens"] for c in calls.values()),
+            "calls": calls
+        }
+
     def cleanup_call_context(self, call_id: str):
         """Clean up analysis context when call ends"""
-        if call_id in self.analysis_context:
-            del self.analysis_context[call_id]
+        context = self.analysis_context.pop(call_id)
+        if context:
+            self.backend.release(context)
+
+    def memory_stats(self) -> Dict:
+        """Size of the per-call context store"""
+        return self.analysis_context.stats()
+
+    def warm_up(self):
+        """Load the analysis backend's client now instead of on the first transcript line"""
+        self.backend.warm_up()
 
 
 # Global analyzer instance
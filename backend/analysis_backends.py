@@ -0,0 +1,582 @@
+"""
+Analysis backends for The Village
+
+A backend turns an elder's profile and recent transcript into a raw analysis dict
+with the same shape as the Gemini JSON response:
+
+    {
+        "wellbeing": {...},
+        "concerns": [...],
+        "profile_updates": [...],
+        "suggested_actions": [...]
+    }
+
+AIAnalyzer converts that dict into WellbeingAssessment / Concern / ProfileFact models,
+so every backend produces the same structures downstream.
+
+Backends:
+- GeminiBackend: Google Gemini (default, needs GOOGLE_API_KEY)
+- LocalRuleBackend: deterministic keyword rules with configurable latency, for
+  running and load-testing the pipeline offline
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+from typing import Dict, List, Optional, Set, Tuple
+
+from backend.models import Elder
+
+
+class AnalysisBackend:
+    """Base class for analysis backends."""
+
+    name = "base"
+
+    @property
+    def available(self) -> bool:
+        """Whether the backend can run (e.g. credentials are configured)."""
+        return True
+
+    def warm_up(self):
+        """Load anything deferred to first use (SDKs, clients) ahead of the first call."""
+
+    async def analyze(self, elder: Elder, context: Dict) -> Dict:
+        """
+        Analyze a call and return a raw analysis dict.
+
+        `context` is the call's running analysis context from AIAnalyzer. Backends read
+        "transcript_history" from it and may keep per-call state in it (e.g. a cached
+        prompt prefix), which is dropped with the context when the call ends.
+        """
+        raise NotImplementedError
+
+    def release(self, context: Dict):
+        """Free provider-side state held for a call whose context is being dropped."""
+
+
+def record_token_usage(context: Dict, prompt_tokens: int = 0, cached_tokens: int = 0, output_tokens: int = 0):
+    """Accumulate per-call token counts in the analysis context."""
+    usage = context.setdefault("token_usage", {
+        "analyses": 0,
+        "prompt_tokens": 0,
+        "cached_tokens": 0,
+        "output_tokens": 0,
+        "last_prompt_tokens": 0
+    })
+    usage["analyses"] += 1
+    usage["prompt_tokens"] += prompt_tokens
+    usage["cached_tokens"] += cached_tokens
+    usage["output_tokens"] += output_tokens
+    usage["last_prompt_tokens"] = prompt_tokens
+
+
+def unanalyzed_lines(context: Dict) -> List[Dict]:
+    """Transcript lines added since the last completed analysis (as many as the context still holds)."""
+    history = context["transcript_history"]
+    new_count = context.get("lines_seen", len(history)) - context.get("lines_analyzed", 0)
+    return list(history)[-new_count:] if new_count > 0 else []
+
+
+# ============================================================================
+# GEMINI
+# ============================================================================
+
+# Static instructions and response schema, identical for every call and analysis.
+# Sent as the system instruction (or provider-side cached content) rather than being
+# re-rendered into every prompt.
+GEMINI_INSTRUCTIONS = """You are an AI assistant analyzing a wellness check-in call with an elderly person.
+
+You will receive the conversation incrementally. Each message contains:
+- PREVIOUS: your previous assessment as compact JSON (absent on the first message)
+- NEW: the transcript lines since that assessment, one per line, prefixed E: (elder) or A: (agent)
+
+Update the assessment with the new lines and respond with JSON in this structure:
+
+{
+  "wellbeing": {
+    "mood": "description of current mood",
+    "loneliness_level": "none|mild|moderate|high",
+    "grief_indicators": true|false,
+    "fear_indicators": true|false,
+    "hope_indicators": true|false,
+    "emotional_notes": "any emotional observations",
+    "depression_indicators": ["specific observations"],
+    "anxiety_indicators": ["specific observations"],
+    "purpose_level": "strong|moderate|low|absent",
+    "mental_pattern_change": true|false,
+    "mental_notes": "any mental health observations",
+    "family_contact_recency": "when they last spoke to family",
+    "isolation_level": "none|mild|moderate|severe",
+    "community_engagement": "description of social activities",
+    "support_network_strength": "strong|moderate|weak",
+    "social_notes": "any social observations",
+    "pain_reported": true|false,
+    "pain_details": "description if pain reported",
+    "mobility_concerns": true|false,
+    "sleep_issues": true|false,
+    "nutrition_concerns": true|false,
+    "medication_issues": true|false,
+    "energy_level": "good|low|very_low",
+    "physical_notes": "any physical observations",
+    "memory_concerns": true|false,
+    "orientation_issues": true|false,
+    "cognitive_baseline_change": true|false,
+    "cognitive_notes": "any cognitive observations",
+    "overall_concern_level": "none|low|moderate|high|critical"
+  },
+  "concerns": [
+    {
+      "dimension": "emotional|mental|social|physical|cognitive",
+      "type": "short label, e.g. loneliness, dizziness, missed_medication",
+      "severity": "low|moderate|high|critical",
+      "description": "what was said or observed",
+      "quote": "the elder's exact words",
+      "action_required": true|false,
+      "reasoning": "why this is a concern"
+    }
+  ],
+  "profile_updates": [
+    {
+      "category": "family|medical|interests|history|preferences|personality",
+      "fact": "new information learned"
+    }
+  ],
+  "suggested_actions": [
+    {
+      "action_type": "call_family|call_neighbor|call_medical|call_volunteer",
+      "urgency": "immediate|soon|routine",
+      "reason": "why this action is needed",
+      "suggested_contact": "which village member role"
+    }
+  ]
+}
+
+**Guidelines:**
+- "wellbeing" is the full updated assessment for the whole call so far
+- "concerns", "profile_updates" and "suggested_actions" list only what is NEW in the NEW lines
+- Be objective and evidence-based
+- Flag concerns early but don't over-dramatize
+- Consider the elder's baseline when assessing changes
+- Only suggest actions when truly warranted
+- Empty arrays are acceptable if nothing detected
+
+Respond with ONLY valid JSON, no additional text."""
+
+# Provider-side context cache lifetime. A cache is shared by an elder's calls and
+# deleted when the last of them ends; the TTL only cleans up after calls that never end.
+GEMINI_CACHE_TTL = os.environ.get("ANALYSIS_PROMPT_CACHE_TTL", "1800s")
+# A cache this close to expiry is replaced rather than handed to a new call
+GEMINI_CACHE_MIN_REMAINING_SECONDS = 300
+
+SPEAKER_CODES = {"elder": "E", "agent": "A", "village_member": "V"}
+
+
+class GeminiBackend(AnalysisBackend):
+    """
+    Analyzes transcripts with Google Gemini.
+
+    The static instructions and elder profile are rendered once per call into a prompt
+    prefix, cached provider-side when the model supports context caching (otherwise sent
+    as the system instruction). Calls with the same prefix (the same elder) share one
+    cache, deleted when the last of them ends. Each analysis then sends only the
+    previous assessment plus the transcript lines added since it.
+    """
+
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str] = None, model_name: str = "gemini-2.0-flash-exp"):
+        self.model_name = model_name
+        self.api_key = api_key
+        # google.genai takes ~0.5s to import, so the client is created on first use
+        self._client = None
+        # Flips to False after the provider rejects context caching for this model
+        self.caching_supported = True
+        # Prompt caches by prefix hash: (cache name, expiry on the monotonic clock)
+        self._prompt_caches: Dict[str, Tuple[str, float]] = {}
+        self._cache_users: Dict[str, int] = {}
+        self._cache_pending: Dict[str, asyncio.Future] = {}
+        self._cleanup_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def client(self):
+        if self._client is None and self.api_key:
+            import google.genai as genai
+            self._client = genai.Client(api_key=self.api_key)
+        return self._client
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def warm_up(self):
+        self.client
+
+    async def analyze(self, elder: Elder, context: Dict) -> Dict:
+        from google.genai import types
+
+        if "prompt_prefix" not in context:
+            # Registered once per context and dropped in release(), whether or not
+            # any analysis gets as far as creating the cache
+            context["prompt_prefix"] = self._build_prompt_prefix(elder)
+            context["prompt_cache_key"] = hashlib.sha256(context["prompt_prefix"].encode()).hexdigest()
+            self._cache_users[context["prompt_cache_key"]] = self._cache_users.get(context["prompt_cache_key"], 0) + 1
+
+        # Resolved on every analysis so a call outliving the cache's TTL moves to its replacement
+        prompt_cache = await self._prompt_cache(context["prompt_cache_key"], context["prompt_prefix"])
+        if prompt_cache:
+            config = types.GenerateContentConfig(cached_content=prompt_cache)
+        else:
+            config = types.GenerateContentConfig(system_instruction=context["prompt_prefix"])
+
+        # Use the async client so the event loop keeps serving other requests
+        response = await self.client.aio.models.generate_content(
+            model=self.model_name,
+            contents=self._build_delta_prompt(context),
+            config=config
+        )
+
+        usage = response.usage_metadata
+        if usage:
+            record_token_usage(
+                context,
+                prompt_tokens=usage.prompt_token_count or 0,
+                cached_tokens=usage.cached_content_token_count or 0,
+                output_tokens=usage.candidates_token_count or 0
+            )
+
+        return self._parse_gemini_response(response.text)
+
+    def _build_prompt_prefix(self, elder: Elder) -> str:
+        """Static instructions plus the elder's information, rendered once per call"""
+        baseline = elder.wellbeing_baseline.typical_mood if elder.wellbeing_baseline else "Unknown"
+        return (
+            f"{GEMINI_INSTRUCTIONS}\n\n"
+            f"**Elder Information:**\n"
+            f"- Name: {elder.name}\n"
+            f"- Age: {elder.age}\n"
+            f"- Baseline: {baseline}"
+        )
+
+    async def _prompt_cache(self, key: str, prompt_prefix: str) -> Optional[str]:
+        """Name of the shared cache for this prefix, created if missing or about to expire."""
+        cached = self._prompt_caches.get(key)
+        if cached and cached[1] - time.monotonic() > GEMINI_CACHE_MIN_REMAINING_SECONDS:
+            return cached[0]
+
+        # Calls for the same elder starting together share one create request
+        pending = self._cache_pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._cache_pending[key] = future
+        try:
+            name = await self._create_prompt_cache(prompt_prefix)
+            if name:
+                self._prompt_caches[key] = (name, time.monotonic() + _ttl_seconds(GEMINI_CACHE_TTL))
+            future.set_result(name)
+            return name
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._cache_pending[key]
+
+    async def _create_prompt_cache(self, prompt_prefix: str) -> Optional[str]:
+        """
+        Cache the prompt prefix provider-side. Returns the cache name, or None when the
+        model doesn't support caching or the prefix is below its minimum cacheable size
+        (after which caching is off for this model) or the request failed.
+        """
+        if not self.caching_supported:
+            return None
+
+        from google.genai import types
+
+        try:
+            cache = await self.client.aio.caches.create(
+                model=self.model_name,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=prompt_prefix,
+                    ttl=GEMINI_CACHE_TTL
+                )
+            )
+            return cache.name
+        except Exception as e:
+            # A 400/404 means this model can't cache this prefix, now or later; anything
+            # else (rate limits, server errors, timeouts) only skips caching for this call
+            if getattr(e, "code", None) in (400, 404):
+                print(f"Prompt caching unavailable for {self.model_name}, using system instruction: {e}")
+                self.caching_supported = False
+            else:
+                print(f"Prompt cache creation failed, using system instruction for this call: {e}")
+            return None
+
+    def release(self, context: Dict):
+        key = context.get("prompt_cache_key")
+        if key is None or key not in self._cache_users:
+            return
+        self._cache_users[key] -= 1
+        if self._cache_users[key]:
+            return
+        del self._cache_users[key]
+        cached = self._prompt_caches.pop(key, None)
+        if cached:
+            try:
+                task = asyncio.get_running_loop().create_task(self._delete_prompt_cache(cached[0]))
+            except RuntimeError:
+                return  # No event loop (shutdown): the TTL removes it
+            self._cleanup_tasks.add(task)
+            task.add_done_callback(self._cleanup_tasks.discard)
+
+    async def _delete_prompt_cache(self, name: str):
+        try:
+            await self.client.aio.caches.delete(name=name)
+        except Exception as e:
+            print(f"Prompt cache {name} not deleted, it expires on its own: {e}")
+
+    def _build_delta_prompt(self, context: Dict) -> str:
+        """Previous assessment plus the transcript lines added since it, compactly encoded"""
+        # Every line since the last analysis; if there are none, the latest again
+        new_lines = unanalyzed_lines(context) or list(context["transcript_history"])[-1:]
+
+        parts = []
+        if context.get("last_analysis"):
+            previous = _compact(context["last_analysis"].get("wellbeing", {}))
+            parts.append("PREVIOUS: " + json.dumps(previous, separators=(",", ":")))
+
+        parts.append("NEW:")
+        parts.extend(
+            f"{SPEAKER_CODES.get(line['speaker'], line['speaker'][:1].upper())}: {line['text']}"
+            for line in new_lines
+        )
+        return "\n".join(parts)
+
+    def _parse_gemini_response(self, response_text: str) -> Dict:
+        """Parse Gemini's JSON response"""
+        try:
+            # Clean up response (remove markdown code blocks if present)
+            cleaned = response_text.strip()
+            if cleaned.startswith("```json"):
+                cleaned = cleaned[7:]
+            if cleaned.startswith("```"):
+                cleaned = cleaned[3:]
+            if cleaned.endswith("```"):
+                cleaned = cleaned[:-3]
+
+            return json.loads(cleaned.strip())
+        except json.JSONDecodeError as e:
+            print(f"Failed to parse Gemini response: {e}")
+            print(f"Response was: {response_text}")
+            return {"wellbeing": {}, "concerns": [], "profile_updates": [], "suggested_actions": []}
+
+
+# ============================================================================
+# LOCAL RULES
+# ============================================================================
+
+# Keyword rules applied to the elder's lines. Each matching rule contributes
+# wellbeing fields, a concern and optionally a suggested village action.
+LOCAL_RULES = [
+    {
+        "keywords": ("dizzy", "dizziness", "i fell", "fell down", "chest pain", "can't breathe"),
+        "dimension": "physical", "type": "fall_risk", "severity": "high", "action_required": True,
+        "wellbeing": {"mobility_concerns": True, "energy_level": "low"},
+        "action": ("call_medical", "immediate"),
+    },
+    {
+        "keywords": ("what's the point", "no point", "hopeless", "don't enjoy anything", "give up"),
+        "dimension": "mental", "type": "depression", "severity": "high", "action_required": True,
+        "wellbeing": {"purpose_level": "low", "mental_pattern_change": True},
+        "indicators": "depression_indicators",
+        "action": ("call_family", "soon"),
+    },
+    {
+        "keywords": ("lonely", "all alone", "so quiet", "nobody calls", "no one to talk", "house feels empty"),
+        "dimension": "emotional", "type": "loneliness", "severity": "moderate", "action_required": False,
+        "wellbeing": {"loneliness_level": "moderate", "isolation_level": "moderate"},
+        "action": ("call_volunteer", "routine"),
+    },
+    {
+        "keywords": ("forgot my pill", "missed my pill", "forgot my medication", "ran out of my", "out of pills"),
+        "dimension": "physical", "type": "missed_medication", "severity": "moderate", "action_required": True,
+        "wellbeing": {"medication_issues": True},
+        "action": ("call_medical", "soon"),
+    },
+    {
+        "keywords": ("haven't eaten", "not hungry", "forgot to eat", "skipped lunch", "skipped dinner", "no appetite"),
+        "dimension": "physical", "type": "nutrition", "severity": "moderate", "action_required": False,
+        "wellbeing": {"nutrition_concerns": True},
+    },
+    {
+        "keywords": ("pain", "hurts", "aching", "sore"),
+        "dimension": "physical", "type": "pain", "severity": "low", "action_required": False,
+        "wellbeing": {"pain_reported": True},
+        "details": "pain_details",
+    },
+    {
+        "keywords": ("can't sleep", "couldn't sleep", "not sleeping", "awake all night", "trouble sleeping"),
+        "dimension": "physical", "type": "sleep", "severity": "low", "action_required": False,
+        "wellbeing": {"sleep_issues": True},
+    },
+    {
+        "keywords": ("worried", "anxious", "scared", "afraid", "nervous"),
+        "dimension": "mental", "type": "anxiety", "severity": "low", "action_required": False,
+        "wellbeing": {"fear_indicators": True},
+        "indicators": "anxiety_indicators",
+    },
+    {
+        "keywords": ("what day is it", "confused", "can't remember", "i keep forgetting"),
+        "dimension": "cognitive", "type": "memory", "severity": "low", "action_required": False,
+        "wellbeing": {"memory_concerns": True},
+    },
+    {
+        "keywords": ("miss him", "miss her", "passed away", "since he died", "since she died"),
+        "dimension": "emotional", "type": "grief", "severity": "low", "action_required": False,
+        "wellbeing": {"grief_indicators": True},
+    },
+    {
+        "keywords": ("tired", "exhausted", "no energy", "worn out"),
+        "dimension": "physical", "type": "fatigue", "severity": "low", "action_required": False,
+        "wellbeing": {"energy_level": "low"},
+    },
+]
+
+POSITIVE_KEYWORDS = ("happy", "wonderful", "lovely", "excited", "looking forward", "great day", "glad")
+
+SEVERITY_ORDER = ["none", "low", "moderate", "high", "critical"]
+
+PROFILE_PATTERNS = [
+    (re.compile(r"\bmy (daughter|son|grandson|granddaughter|husband|wife|sister|brother|niece|nephew)\b[^.!?]*", re.I), "family"),
+    (re.compile(r"\bi (?:love|enjoy|like) (?:to )?[^.!?]{3,60}", re.I), "interests"),
+    (re.compile(r"\bmy (?:doctor|medication|pills|prescription)\b[^.!?]*", re.I), "medical"),
+    (re.compile(r"\bi used to [^.!?]{3,60}", re.I), "history"),
+]
+
+
+class LocalRuleBackend(AnalysisBackend):
+    """
+    Deterministic keyword/rule-based analysis with no network access.
+    `latency_seconds` simulates LLM round-trip time for load testing.
+    """
+
+    name = "local"
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+
+    async def analyze(self, elder: Elder, context: Dict) -> Dict:
+        if self.latency_seconds > 0:
+            await asyncio.sleep(self.latency_seconds)
+        record_token_usage(context)
+        # Like the Gemini delta prompt: only lines not analyzed yet, on top of the previous
+        # assessment, and each concern type reported once per call
+        previous = (context.get("last_analysis") or {}).get("wellbeing")
+        return self.analyze_sync(
+            unanalyzed_lines(context), previous, context.setdefault("reported_concern_types", set())
+        )
+
+    def analyze_sync(self, transcript_lines: List[Dict], previous_wellbeing: Optional[Dict] = None,
+                     reported_types: Optional[set] = None) -> Dict:
+        """
+        Apply the keyword rules to the elder's lines, updating `previous_wellbeing`.
+        Concern types in `reported_types` are skipped, and new ones are added to it.
+        """
+        elder_lines = [line["text"] for line in transcript_lines if line["speaker"] == "elder"]
+
+        wellbeing: Dict = {"mood": "neutral", "overall_concern_level": "none"}
+        for key, value in (previous_wellbeing or {}).items():
+            wellbeing[key] = list(value) if isinstance(value, list) else value
+        concerns: List[Dict] = []
+        profile_updates: List[Dict] = []
+        suggested_actions: List[Dict] = []
+        seen_types = reported_types if reported_types is not None else set()
+
+        for text in elder_lines:
+            lowered = text.lower()
+
+            for rule in LOCAL_RULES:
+                if rule["type"] in seen_types or not any(k in lowered for k in rule["keywords"]):
+                    continue
+                seen_types.add(rule["type"])
+
+                wellbeing.update(rule["wellbeing"])
+                if "indicators" in rule:
+                    wellbeing.setdefault(rule["indicators"], []).append(text)
+                if "details" in rule:
+                    wellbeing[rule["details"]] = text
+
+                concerns.append({
+                    "dimension": rule["dimension"],
+                    "type": rule["type"],
+                    "severity": rule["severity"],
+                    "description": f"Elder mentioned {rule['type'].replace('_', ' ')}",
+                    "quote": text,
+                    "action_required": rule["action_required"],
+                })
+
+                if SEVERITY_ORDER.index(rule["severity"]) > SEVERITY_ORDER.index(wellbeing["overall_concern_level"]):
+                    wellbeing["overall_concern_level"] = rule["severity"]
+
+                if "action" in rule:
+                    action_type, urgency = rule["action"]
+                    suggested_actions.append({
+                        "action_type": action_type,
+                        "urgency": urgency,
+                        "reason": f"Elder said: \"{text}\"",
+                        "suggested_contact": action_type.replace("call_", ""),
+                    })
+
+            if any(k in lowered for k in POSITIVE_KEYWORDS):
+                wellbeing["hope_indicators"] = True
+                wellbeing["mood"] = "positive"
+
+            for pattern, category in PROFILE_PATTERNS:
+                match = pattern.search(text)
+                if match:
+                    profile_updates.append({"category": category, "fact": match.group(0).strip()})
+
+        if concerns and wellbeing["mood"] == "neutral":
+            wellbeing["mood"] = "subdued"
+
+        return {
+            "wellbeing": wellbeing,
+            "concerns": concerns,
+            "profile_updates": profile_updates,
+            "suggested_actions": suggested_actions,
+        }
+
+
+def _ttl_seconds(ttl: str) -> float:
+    """Seconds in a duration like "1800s"."""
+    return float(ttl.rstrip("s"))
+
+
+def _compact(data: Dict) -> Dict:
+    """Drop empty/false/default fields to keep re-sent assessments short"""
+    return {k: v for k, v in data.items() if v not in (None, "", False, [], "none", "unknown")}
+
+
+def create_backend(name: Optional[str] = None) -> AnalysisBackend:
+    """
+    Create the analysis backend selected by ANALYSIS_BACKEND ("gemini" or "local").
+    """
+    name = (name or os.environ.get("ANALYSIS_BACKEND", "gemini")).lower()
+
+    if name == "local":
+        latency = float(os.environ.get("ANALYSIS_LOCAL_LATENCY_SECONDS", "0"))
+        print(f"🧪 Using local rule-based analysis backend (latency {latency}s)")
+        return LocalRuleBackend(latency_seconds=latency)
+
+    if name != "gemini":
+        raise ValueError(f"Unknown ANALYSIS_BACKEND: {name}")
+
+    return GeminiBackend(api_key=os.environ.get("GOOGLE_API_KEY"))
@@ -0,0 +1,114 @@
+"""Bounded store for per-call AI analysis context."""
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+
+class AnalysisContextStore:
+    """
+    Holds the running analysis context for each call, with bounded memory:
+
+    - each call's transcript_history is a ring buffer of the last `max_lines_per_call` lines
+    - contexts idle for longer than `idle_ttl_seconds` are evicted (calls that dropped
+      without /end never clean up after themselves)
+    - at most `max_calls` contexts are kept, evicting the least recently used
+
+    `on_evict` is called with each evicted context (not with those removed by pop).
+    """
+
+    def __init__(self, max_calls: int = 500, max_lines_per_call: int = 50, idle_ttl_seconds: float = 1800,
+                 on_evict: Optional[Callable[[Dict], None]] = None):
+        self.max_calls = max_calls
+        self.max_lines_per_call = max_lines_per_call
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.on_evict = on_evict
+
+        # call_id -> context, ordered from least to most recently used
+        self._contexts: "OrderedDict[str, Dict]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+
+        self.evicted_idle = 0
+        self.evicted_lru = 0
+
+    def get_or_create(self, call_id: str, factory: Callable[[], Dict]) -> Dict:
+        """Get a call's context (marking it as recently used), creating it if needed."""
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        context = self._contexts.get(call_id)
+        if context is None:
+            context = factory()
+            context["transcript_history"] = deque(
+                context.get("transcript_history", ()), maxlen=self.max_lines_per_call
+            )
+            self._contexts[call_id] = context
+            self._evict_lru()
+        else:
+            self._contexts.move_to_end(call_id)
+
+        self._last_access[call_id] = now
+        return context
+
+    def get(self, call_id: str) -> Optional[Dict]:
+        return self._contexts.get(call_id)
+
+    def pop(self, call_id: str) -> Optional[Dict]:
+        """Remove a call's context. Returns it, if it existed."""
+        self._last_access.pop(call_id, None)
+        return self._contexts.pop(call_id, None)
+
+    def clear(self):
+        self._contexts.clear()
+        self._last_access.clear()
+
+    def _evict_idle(self, now: float):
+        # Oldest-accessed contexts are first, so stop at the first one still fresh
+        while self._contexts:
+            call_id = next(iter(self._contexts))
+            if now - self._last_access[call_id] <= self.idle_ttl_seconds:
+                break
+            self._evict(call_id)
+            self.evicted_idle += 1
+
+    def _evict_lru(self):
+        while len(self._contexts) > self.max_calls:
+            call_id = next(iter(self._contexts))
+            self._evict(call_id)
+            self.evicted_lru += 1
+
+    def _evict(self, call_id: str):
+        context = self.pop(call_id)
+        if self.on_evict and context:
+            self.on_evict(context)
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        return iter(list(self._contexts.items()))
+
+    def __contains__(self, call_id: str) -> bool:
+        return call_id in self._contexts
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+    def stats(self) -> Dict:
+        """Memory stats for the store (text bytes are an approximation)."""
+        self._evict_idle(time.monotonic())
+
+        lines = 0
+        text_bytes = 0
+        for context in self._contexts.values():
+            history = context["transcript_history"]
+            lines += len(history)
+            text_bytes += sum(sys.getsizeof(line["text"]) for line in history)
+
+        return {
+            "calls": len(self._contexts),
+            "transcript_lines": lines,
+            "transcript_bytes": text_bytes,
+            "max_calls": self.max_calls,
+            "max_lines_per_call": self.max_lines_per_call,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "evicted_idle": self.evicted_idle,
+            "evicted_lru": self.evicted_lru,
+        }
@@ -0,0 +1,88 @@
+"""
+Per-call scheduling of AI transcript analysis.
+
+Transcript lines arrive in bursts (one POST per utterance). Rather than starting a
+full LLM analysis for every line, the scheduler records each line in the analyzer's
+context immediately and coalesces analysis requests per call:
+
+- lines arriving within `window_seconds` of each other share one analysis
+- at most one analysis is in flight per call, so results never race on call state
+- a request that arrives while an analysis is running triggers exactly one more
+  analysis afterwards, which sees the latest transcript
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Tuple
+
+from backend.models import CallSession, Elder, TranscriptLine
+
+
+logger = logging.getLogger(__name__)
+
+ResultHandler = Callable[[CallSession, Dict], Awaitable[None]]
+
+
+class AnalysisScheduler:
+    """Debounces and serializes AIAnalyzer runs per call."""
+
+    def __init__(self, analyzer, on_result: ResultHandler, window_seconds: float = 1.5):
+        self.analyzer = analyzer
+        self.on_result = on_result
+        self.window_seconds = window_seconds
+
+        # Latest (call, elder) waiting to be analyzed, per call_id
+        self._pending: Dict[str, Tuple[CallSession, Elder]] = {}
+        # Worker task per call_id (exists while a call has pending or running analysis)
+        self._workers: Dict[str, asyncio.Task] = {}
+
+        # Counters
+        self.requested = 0
+        self.executed = 0
+
+    def schedule(self, call: CallSession, elder: Elder, transcript_line: TranscriptLine):
+        """Record a transcript line and request an analysis of the call's latest state."""
+        self.analyzer.record_transcript_line(call, transcript_line)
+        self.requested += 1
+
+        self._pending[call.id] = (call, elder)
+        if call.id not in self._workers:
+            self._workers[call.id] = asyncio.create_task(self._run(call.id))
+
+    def cancel(self, call_id: str):
+        """Drop pending analysis for a call and stop its worker (e.g. when the call ends)."""
+        self._pending.pop(call_id, None)
+        worker = self._workers.pop(call_id, None)
+        if worker:
+            worker.cancel()
+
+    async def _run(self, call_id: str):
+        try:
+            while call_id in self._pending:
+                # Let a burst of lines settle before analyzing
+                await asyncio.sleep(self.window_seconds)
+
+                call, elder = self._pending.pop(call_id)
+                self.executed += 1
+
+                try:
+                    analysis = await self.analyzer.analyze_call(call, elder)
+                    await self.on_result(call, analysis)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("scheduled_analysis_failed", extra={"call_id": call_id})
+        finally:
+            if self._workers.get(call_id) is asyncio.current_task():
+                del self._workers[call_id]
+
+    def stats(self) -> Dict:
+        """Counters for requested vs. executed analyses."""
+        return {
+            "window_seconds": self.window_seconds,
+            "requested": self.requested,
+            "executed": self.executed,
+            "coalesced": self.requested - self.executed - len(self._pending),
+            "pending": len(self._pending),
+            "active_workers": len(self._workers),
+        }
@@ -0,0 +1,128 @@
+"""Registry of active calls, indexed by call ID and LiveKit room name."""
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Tuple
+
+from backend.models import CallSession
+
+
+class CallRegistry:
+    """
+    Holds the active CallSessions keyed by call ID, with a secondary index on
+    room_name so lookups from the voice agent (which only knows the room) are O(1).
+
+    Supports the read-only dict operations main.py already uses on active_calls
+    (`in`, `[]`, `.keys()`, `.values()`, `.items()`), but all writes must go through
+    add/remove/clear so both indexes stay in sync.
+
+    Beyond `max_calls`, adding a call evicts the least recently used calls that have
+    been idle for `idle_seconds` (abandoned calls that were never ended). A call in
+    use is never evicted, since the analysis scheduler and village action tasks hold
+    references to it; the registry grows past `max_calls` instead. An evicted call
+    is reloaded from the call store if it turns up again (see resolve_active_call
+    in main.py).
+    """
+
+    def __init__(self, max_calls: int = 500, idle_seconds: float = 1800):
+        self.max_calls = max_calls
+        self.idle_seconds = idle_seconds
+        self.evictions = 0
+        self._by_id: "OrderedDict[str, CallSession]" = OrderedDict()
+        self._id_by_room: Dict[str, str] = {}
+        self._last_used: Dict[str, float] = {}
+
+    def add(self, call: CallSession):
+        """Register a call under its ID and room name."""
+        existing = self._by_id.get(call.id)
+        if existing and existing.room_name and existing.room_name != call.room_name:
+            self._id_by_room.pop(existing.room_name, None)
+
+        self._by_id[call.id] = call
+        self._touch(call.id)
+        if call.room_name:
+            self._id_by_room[call.room_name] = call.id
+
+        now = time.monotonic()
+        while len(self._by_id) > self.max_calls:
+            oldest = next(iter(self._by_id))
+            if now - self._last_used[oldest] < self.idle_seconds:
+                break
+            self.remove(oldest)
+            self.evictions += 1
+
+    def _touch(self, call_id: str):
+        self._by_id.move_to_end(call_id)
+        self._last_used[call_id] = time.monotonic()
+
+    def remove(self, call_id: str) -> Optional[CallSession]:
+        """Remove a call from both indexes. Returns the removed call, if any."""
+        call = self._by_id.pop(call_id, None)
+        self._last_used.pop(call_id, None)
+        if call and call.room_name and self._id_by_room.get(call.room_name) == call_id:
+            del self._id_by_room[call.room_name]
+        return call
+
+    def clear(self):
+        """Drop all active calls."""
+        self._by_id.clear()
+        self._id_by_room.clear()
+        self._last_used.clear()
+
+    def get(self, call_id: str) -> Optional[CallSession]:
+        """Get a call by its ID."""
+        call = self._by_id.get(call_id)
+        if call:
+            self._touch(call_id)
+        return call
+
+    def get_by_room(self, room_name: str) -> Optional[CallSession]:
+        """Get a call by its LiveKit room name."""
+        call_id = self._id_by_room.get(room_name)
+        return self.get(call_id) if call_id else None
+
+    def resolve(self, identifier: str) -> Tuple[Optional[str], Optional[CallSession]]:
+        """
+        Find a call by either its ID (UUID) or its room name.
+
+        Returns:
+            (call_id, call) or (None, None) if no active call matches.
+        """
+        call = self.get(identifier)
+        if call:
+            return identifier, call
+
+        call = self.get_by_room(identifier)
+        if call:
+            return call.id, call
+
+        return None, None
+
+    def stats(self) -> Dict:
+        return {"active_calls": len(self._by_id), "max_calls": self.max_calls, "evictions": self.evictions}
+
+    def room_names(self):
+        """Room names of all active calls."""
+        return self._id_by_room.keys()
+
+    def keys(self):
+        return self._by_id.keys()
+
+    def values(self):
+        return self._by_id.values()
+
+    def items(self):
+        return self._by_id.items()
+
+    def __contains__(self, call_id: str) -> bool:
+        return call_id in self._by_id
+
+    def __getitem__(self, call_id: str) -> CallSession:
+        call = self._by_id[call_id]
+        self._touch(call_id)
+        return call
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._by_id)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
@@ -0,0 +1,724 @@
+"""
+Persistent store for calls, transcripts and village actions.
+
+Call history and village actions outlive the API process: they're written to the
+tables of schema.sql (call_sessions, transcript_lines, concerns, profile_facts,
+village_actions, plus the elders/village_members rows they reference).
+
+- SQLiteCallStore (default): a local SQLite database in WAL mode, shared by all
+  uvicorn workers on the host. Queries run on one dedicated thread.
+- SupabaseCallStore (CALL_STORE=supabase): the same tables in Supabase, through
+  the repository layer's thread pool.
+
+Only active calls are kept in memory (see CallRegistry). save_call writes a new
+call; after that, writes are appended rows (transcript lines, concerns, profile
+facts) or field-scoped updates (update_call), so a stale copy of a call in one
+worker can't overwrite what another worker saved.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from backend.models import CallSession, Concern, Elder, ProfileFact, TranscriptLine, VillageAction, VillageMember
+
+CALL_STORE = os.environ.get("CALL_STORE", "sqlite")
+CALL_STORE_PATH = os.environ.get("CALL_STORE_PATH", os.path.join(os.path.dirname(__file__), "village.sqlite3"))
+
+# schema.sql translated to SQLite: UUID/TIMESTAMPTZ -> TEXT (ISO-8601), JSONB -> TEXT (JSON),
+# BOOLEAN -> INTEGER. Postgres-only parts (RLS policies, the updated_at trigger) are left out.
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS elders (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    age INTEGER NOT NULL,
+    phone TEXT NOT NULL,
+    photo_url TEXT,
+    address TEXT NOT NULL,
+    medical_info TEXT NOT NULL DEFAULT '{}',
+    wellbeing_baseline TEXT NOT NULL DEFAULT '{}',
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS village_members (
+    id TEXT PRIMARY KEY,
+    elder_id TEXT NOT NULL REFERENCES elders(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    role TEXT NOT NULL CHECK (role IN ('family', 'neighbor', 'medical', 'mental_health', 'volunteer', 'service')),
+    relationship TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    availability TEXT,
+    notes TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+CREATE INDEX IF NOT EXISTS idx_village_members_elder ON village_members(elder_id);
+
+CREATE TABLE IF NOT EXISTS profile_facts (
+    id TEXT PRIMARY KEY,
+    elder_id TEXT NOT NULL REFERENCES elders(id) ON DELETE CASCADE,
+    fact TEXT NOT NULL,
+    category TEXT NOT NULL CHECK (category IN ('family', 'medical', 'interests', 'history', 'preferences', 'personality')),
+    context TEXT,
+    learned_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    source_call_id TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+CREATE INDEX IF NOT EXISTS idx_profile_facts_elder ON profile_facts(elder_id);
+CREATE INDEX IF NOT EXISTS idx_profile_facts_source_call ON profile_facts(source_call_id);
+
+CREATE TABLE IF NOT EXISTS call_sessions (
+    id TEXT PRIMARY KEY,
+    elder_id TEXT NOT NULL REFERENCES elders(id) ON DELETE CASCADE,
+    type TEXT NOT NULL CHECK (type IN ('elder_checkin', 'village_outbound')),
+    target_member_id TEXT REFERENCES village_members(id),
+    room_name TEXT,
+    recording_path TEXT,
+    started_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    ended_at TEXT,
+    duration_seconds INTEGER,
+    status TEXT NOT NULL CHECK (status IN ('ringing', 'in_progress', 'completed', 'failed', 'no_answer')),
+    wellbeing TEXT,
+    summary TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+CREATE INDEX IF NOT EXISTS idx_call_sessions_elder ON call_sessions(elder_id);
+CREATE INDEX IF NOT EXISTS idx_call_sessions_started ON call_sessions(started_at DESC);
+CREATE INDEX IF NOT EXISTS idx_call_sessions_room ON call_sessions(room_name);
+
+CREATE TABLE IF NOT EXISTS transcript_lines (
+    id TEXT PRIMARY KEY,
+    call_session_id TEXT NOT NULL REFERENCES call_sessions(id) ON DELETE CASCADE,
+    speaker TEXT NOT NULL CHECK (speaker IN ('agent', 'elder', 'village_member')),
+    speaker_name TEXT NOT NULL,
+    text TEXT NOT NULL,
+    timestamp TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+CREATE INDEX IF NOT EXISTS idx_transcript_call ON transcript_lines(call_session_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS concerns (
+    id TEXT PRIMARY KEY,
+    call_session_id TEXT NOT NULL REFERENCES call_sessions(id) ON DELETE CASCADE,
+    dimension TEXT NOT NULL CHECK (dimension IN ('emotional', 'mental', 'social', 'physical', 'cognitive')),
+    type TEXT NOT NULL,
+    severity TEXT NOT NULL CHECK (severity IN ('low', 'moderate', 'high', 'critical')),
+    description TEXT NOT NULL,
+    quote TEXT NOT NULL,
+    detected_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    action_required INTEGER DEFAULT 0,
+    is_pattern INTEGER DEFAULT 0,
+    pattern_history TEXT DEFAULT '[]',
+    actions_triggered TEXT DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_concerns_call ON concerns(call_session_id);
+CREATE INDEX IF NOT EXISTS idx_concerns_detected ON concerns(detected_at DESC);
+
+CREATE TABLE IF NOT EXISTS village_actions (
+    id TEXT PRIMARY KEY,
+    call_session_id TEXT NOT NULL REFERENCES call_sessions(id) ON DELETE CASCADE,
+    recipient_id TEXT NOT NULL REFERENCES village_members(id),
+    action_type TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    urgency TEXT NOT NULL CHECK (urgency IN ('immediate', 'today', 'this_week')),
+    context_for_recipient TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'calling', 'ringing', 'connected', 'in_progress', 'completed', 'failed', 'no_answer')),
+    initiated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    completed_at TEXT,
+    response TEXT,
+    outbound_call_id TEXT REFERENCES call_sessions(id)
+);
+CREATE INDEX IF NOT EXISTS idx_village_actions_call ON village_actions(call_session_id);
+CREATE INDEX IF NOT EXISTS idx_village_actions_status ON village_actions(status, initiated_at DESC);
+"""
+
+TRANSCRIPT_COLUMNS = ("id", "call_session_id", "speaker", "speaker_name", "text", "timestamp")
+# call_sessions columns update_call may set
+UPDATABLE_CALL_FIELDS = {"status", "ended_at", "duration_seconds", "wellbeing", "summary", "recording_path"}
+
+
+def _value(value: Any, encode_json: bool) -> Any:
+    """Model field -> column value (nested models/lists/dicts become JSON)."""
+    if hasattr(value, "dict"):
+        value = value.dict()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str) if encode_json else json.loads(json.dumps(value, default=str))
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "value"):  # Enum
+        return value.value
+    return value
+
+
+def _decode(value: Any) -> Any:
+    return json.loads(value) if isinstance(value, str) else value
+
+
+class CallStore(ABC):
+    """
+    Interface (and model <-> row mapping) shared by the storage engines.
+
+    Subclasses implement the async methods; rows use schema.sql's column names.
+    """
+
+    encode_json = True
+
+    # ---- rows --------------------------------------------------------------
+
+    def _elder_row(self, elder: Elder) -> Dict:
+        return {
+            "id": elder.id, "name": elder.name, "age": elder.age, "phone": elder.phone,
+            "photo_url": elder.photo_url, "address": elder.address,
+            "medical_info": _value(elder.medical, self.encode_json),
+            "wellbeing_baseline": _value(elder.wellbeing_baseline, self.encode_json),
+        }
+
+    def _member_row(self, member: VillageMember, elder_id: str) -> Dict:
+        return {**member.dict(), "elder_id": elder_id}
+
+    def _fact_row(self, fact: ProfileFact, elder_id: str, call_id: Optional[str] = None) -> Dict:
+        return {
+            "id": fact.id, "elder_id": elder_id, "fact": fact.fact, "category": fact.category,
+            "context": fact.context, "learned_at": _value(fact.learned_at, self.encode_json),
+            "source_call_id": fact.source_call_id or call_id,
+        }
+
+    def _call_row(self, call: CallSession) -> Dict:
+        return {
+            "id": call.id, "elder_id": call.elder_id, "type": call.type,
+            "target_member_id": call.target_member.id if call.target_member else None,
+            "room_name": call.room_name, "recording_path": call.recording_path,
+            "started_at": _value(call.started_at, self.encode_json),
+            "ended_at": _value(call.ended_at, self.encode_json),
+            "duration_seconds": call.duration_seconds,
+            "status": _value(call.status, self.encode_json),
+            "wellbeing": _value(call.wellbeing, self.encode_json),
+            "summary": _value(call.summary, self.encode_json),
+        }
+
+    def _line_row(self, call_id: str, line: TranscriptLine) -> Dict:
+        # Hot path (every transcript line): plain attribute access, .dict() costs ~40 us a line
+        return {"id": line.id, "call_session_id": call_id, "speaker": line.speaker,
+                "speaker_name": line.speaker_name, "text": line.text, "timestamp": line.timestamp}
+
+    def _concern_row(self, call_id: str, concern: Concern) -> Dict:
+        row = {key: _value(value, self.encode_json) for key, value in concern.dict().items()}
+        return {**row, "call_session_id": call_id}
+
+    def _update_row(self, fields: Dict) -> Dict:
+        unknown = set(fields) - UPDATABLE_CALL_FIELDS
+        if unknown:
+            raise ValueError(f"Not updatable call fields: {sorted(unknown)}")
+        return {key: _value(value, self.encode_json) for key, value in fields.items()}
+
+    def _action_row(self, action: VillageAction) -> Dict:
+        row = {key: _value(value, self.encode_json) for key, value in action.dict().items() if key != "recipient"}
+        return {**row, "recipient_id": action.recipient.id}
+
+    def _build_call(self, row: Dict, lines: List[Dict], concerns: List[Dict], facts: List[Dict],
+                    actions: List[Dict], members: Dict[str, Dict]) -> CallSession:
+        fields = dict(row)
+        fields.pop("created_at", None)
+        for key in ("wellbeing", "summary"):
+            fields[key] = _decode(fields.get(key))
+        target = members.get(fields.pop("target_member_id", None) or "")
+        return CallSession(
+            **fields,
+            target_member=target,
+            transcript=[TranscriptLine(**{k: line[k] for k in TRANSCRIPT_COLUMNS if k != "call_session_id"})
+                        for line in lines],
+            concerns=[self._build_concern(concern) for concern in concerns],
+            profile_updates=[ProfileFact(**fact) for fact in facts],
+            village_actions=[self._build_action(action, members) for action in actions],
+        )
+
+    def _build_concern(self, row: Dict) -> Concern:
+        fields = dict(row)
+        for key in ("pattern_history", "actions_triggered"):
+            fields[key] = _decode(fields.get(key)) or []
+        return Concern(**fields)
+
+    def _build_action(self, row: Dict, members: Dict[str, Dict]) -> VillageAction:
+        fields = dict(row)
+        recipient = members[fields.pop("recipient_id")]
+        return VillageAction(**fields, recipient=recipient)
+
+    # ---- interface ---------------------------------------------------------
+
+    @abstractmethod
+    async def save_elder(self, elder: Elder):
+        """Upsert an elder with their village members and profile facts."""
+
+    @abstractmethod
+    async def save_call(self, call: CallSession):
+        """Upsert a call with its concerns, profile updates and village actions (not its transcript)."""
+
+    @abstractmethod
+    async def update_call(self, call_id: str, fields: Dict, only_active: bool = False) -> bool:
+        """
+        Set some of a call's fields (UPDATABLE_CALL_FIELDS). With `only_active`, a call
+        that has already ended is left alone. Returns whether the call was updated.
+        """
+
+    @abstractmethod
+    async def add_transcript_lines(self, call_id: str, lines: Iterable[TranscriptLine]) -> bool:
+        """Append transcript lines. Returns False (adding nothing) if the call has ended."""
+
+    async def add_transcript_line(self, call_id: str, line: TranscriptLine) -> bool:
+        return await self.add_transcript_lines(call_id, [line])
+
+    @abstractmethod
+    async def add_concerns(self, call_id: str, concerns: List[Concern]):
+        ...
+
+    @abstractmethod
+    async def add_profile_facts(self, call_id: str, elder_id: str, facts: List[ProfileFact]):
+        ...
+
+    @abstractmethod
+    async def save_action(self, action: VillageAction):
+        """Upsert a village action (and its recipient, under the call's elder)."""
+
+    @abstractmethod
+    async def get_call(self, call_id: str) -> Optional[CallSession]:
+        ...
+
+    @abstractmethod
+    async def get_call_by_room(self, room_name: str) -> Optional[CallSession]:
+        """Most recent call in a LiveKit room."""
+
+    @abstractmethod
+    async def list_calls(self, elder_id: Optional[str] = None, limit: int = 20,
+                         ended: Optional[bool] = None) -> List[CallSession]:
+        """Most recent calls first, optionally only one elder's and only ended (or active) ones."""
+
+    @abstractmethod
+    async def list_actions(self, call_id: Optional[str] = None, status: Optional[str] = None,
+                           limit: int = 500) -> List[VillageAction]:
+        """The most recent `limit` actions, oldest first."""
+
+    @abstractmethod
+    async def clear(self):
+        """Delete all calls and village actions."""
+
+    @abstractmethod
+    async def stats(self) -> Dict:
+        ...
+
+    def close(self):
+        pass
+
+
+class SQLiteCallStore(CallStore):
+    def __init__(self, path: str = CALL_STORE_PATH):
+        self.path = path
+        # sqlite3 connections are single-threaded; every query runs on this one thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="call-store")
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; fast commits
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(SQLITE_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: fn(self._connection(), *args))
+
+    @staticmethod
+    def _upsert(conn: sqlite3.Connection, table: str, rows: List[Dict]):
+        if not rows:
+            return
+        columns = list(rows[0])
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != "id")
+        conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+            f" ON CONFLICT(id) DO UPDATE SET {updates}",
+            [tuple(row[column] for column in columns) for row in rows]
+        )
+
+    def _save_members(self, conn, members: List[VillageMember], elder_id: str):
+        self._upsert(conn, "village_members", [self._member_row(member, elder_id) for member in members])
+
+    async def save_elder(self, elder: Elder):
+        def save(conn):
+            with conn:
+                self._upsert(conn, "elders", [self._elder_row(elder)])
+                conn.execute("UPDATE elders SET updated_at = strftime('%Y-%m-%dT%H:%M:%f', 'now') WHERE id = ?",
+                             (elder.id,))
+                self._save_members(conn, elder.village, elder.id)
+                self._upsert(conn, "profile_facts", [self._fact_row(fact, elder.id) for fact in elder.profile])
+        await self._run(save)
+
+    def _save_actions(self, conn, actions: List[VillageAction], elder_id: str):
+        self._save_members(conn, [action.recipient for action in actions], elder_id)
+        self._upsert(conn, "village_actions", [self._action_row(action) for action in actions])
+
+    async def save_call(self, call: CallSession):
+        def save(conn):
+            with conn:
+                if call.target_member:
+                    self._save_members(conn, [call.target_member], call.elder_id)
+                self._upsert(conn, "call_sessions", [self._call_row(call)])
+                self._upsert(conn, "concerns", [self._concern_row(call.id, concern) for concern in call.concerns])
+                self._upsert(conn, "profile_facts",
+                             [self._fact_row(fact, call.elder_id, call.id) for fact in call.profile_updates])
+                self._save_actions(conn, call.village_actions, call.elder_id)
+        await self._run(save)
+
+    async def update_call(self, call_id: str, fields: Dict, only_active: bool = False) -> bool:
+        row = self._update_row(fields)
+        if not row:
+            return True
+        where = "id = ? AND ended_at IS NULL" if only_active else "id = ?"
+
+        def update(conn):
+            with conn:
+                return conn.execute(
+                    f"UPDATE call_sessions SET {', '.join(f'{column} = ?' for column in row)} WHERE {where}",
+                    (*row.values(), call_id)
+                ).rowcount == 1
+        return await self._run(update)
+
+    async def add_transcript_lines(self, call_id: str, lines: Iterable[TranscriptLine]) -> bool:
+        rows = [(line.id, call_id, line.speaker, line.speaker_name, line.text, line.timestamp) for line in lines]
+
+        def add(conn):
+            with conn:
+                call = conn.execute("SELECT ended_at FROM call_sessions WHERE id = ?", (call_id,)).fetchone()
+                if call is not None and call["ended_at"] is not None:
+                    return False
+                conn.executemany(
+                    f"INSERT OR IGNORE INTO transcript_lines ({', '.join(TRANSCRIPT_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                return True
+        return await self._run(add)
+
+    async def add_concerns(self, call_id: str, concerns: List[Concern]):
+        def add(conn):
+            with conn:
+                self._upsert(conn, "concerns", [self._concern_row(call_id, concern) for concern in concerns])
+        await self._run(add)
+
+    async def add_profile_facts(self, call_id: str, elder_id: str, facts: List[ProfileFact]):
+        def add(conn):
+            with conn:
+                self._upsert(conn, "profile_facts", [self._fact_row(fact, elder_id, call_id) for fact in facts])
+        await self._run(add)
+
+    async def save_action(self, action: VillageAction):
+        def save(conn):
+            row = conn.execute("SELECT elder_id FROM call_sessions WHERE id = ?", (action.call_session_id,)).fetchone()
+            if row is None:
+                raise ValueError(f"Call not found: {action.call_session_id}")
+            with conn:
+                self._save_actions(conn, [action], row["elder_id"])
+        await self._run(save)
+
+    def _load_calls(self, conn, rows: List[sqlite3.Row]) -> List[CallSession]:
+        if not rows:
+            return []
+        ids = [row["id"] for row in rows]
+        marks = ", ".join("?" * len(ids))
+
+        def grouped(query: str) -> Dict[str, List[Dict]]:
+            groups: Dict[str, List[Dict]] = {}
+            for child in conn.execute(query, ids):
+                child = dict(child)
+                groups.setdefault(child.pop("call_id"), []).append(child)
+            return groups
+
+        lines = grouped(f"SELECT call_session_id AS call_id, * FROM transcript_lines"
+                        f" WHERE call_session_id IN ({marks}) ORDER BY timestamp, rowid")
+        concerns = grouped(f"SELECT call_session_id AS call_id, id, dimension, type, severity, description, quote,"
+                           f" detected_at, action_required, is_pattern, pattern_history, actions_triggered"
+                           f" FROM concerns WHERE call_session_id IN ({marks}) ORDER BY detected_at")
+        facts = grouped(f"SELECT source_call_id AS call_id, id, fact, category, context, learned_at, source_call_id"
+                        f" FROM profile_facts WHERE source_call_id IN ({marks}) ORDER BY learned_at")
+        actions = grouped(f"SELECT call_session_id AS call_id, id, call_session_id, recipient_id, action_type, reason,"
+                          f" urgency, context_for_recipient, status, initiated_at, completed_at, response,"
+                          f" outbound_call_id FROM village_actions WHERE call_session_id IN ({marks})"
+                          f" ORDER BY initiated_at")
+        members = self._members(conn, [action["recipient_id"] for group in actions.values() for action in group]
+                                + [row["target_member_id"] for row in rows if row["target_member_id"]])
+
+        return [
+            self._build_call(dict(row), lines.get(row["id"], []), concerns.get(row["id"], []),
+                             facts.get(row["id"], []), actions.get(row["id"], []), members)
+            for row in rows
+        ]
+
+    @staticmethod
+    def _members(conn, ids: List[str]) -> Dict[str, Dict]:
+        ids = list(set(ids))
+        if not ids:
+            return {}
+        rows = conn.execute(
+            f"SELECT id, name, role, relationship, phone, availability, notes FROM village_members"
+            f" WHERE id IN ({', '.join('?' * len(ids))})", ids
+        )
+        return {row["id"]: dict(row) for row in rows}
+
+    async def get_call(self, call_id: str) -> Optional[CallSession]:
+        def get(conn):
+            calls = self._load_calls(conn, conn.execute("SELECT * FROM call_sessions WHERE id = ?", (call_id,)).fetchall())
+            return calls[0] if calls else None
+        return await self._run(get)
+
+    async def get_call_by_room(self, room_name: str) -> Optional[CallSession]:
+        def get(conn):
+            rows = conn.execute(
+                "SELECT * FROM call_sessions WHERE room_name = ? ORDER BY started_at DESC LIMIT 1", (room_name,)
+            ).fetchall()
+            calls = self._load_calls(conn, rows)
+            return calls[0] if calls else None
+        return await self._run(get)
+
+    async def list_calls(self, elder_id: Optional[str] = None, limit: int = 20,
+                         ended: Optional[bool] = None) -> List[CallSession]:
+        clauses, params = [], []
+        if elder_id:
+            clauses.append("elder_id = ?")
+            params.append(elder_id)
+        if ended is not None:
+            clauses.append("ended_at IS NOT NULL" if ended else "ended_at IS NULL")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        def list_(conn):
+            rows = conn.execute(
+                f"SELECT * FROM call_sessions {where} ORDER BY started_at DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+            return self._load_calls(conn, rows)
+        return await self._run(list_)
+
+    async def list_actions(self, call_id: Optional[str] = None, status: Optional[str] = None,
+                           limit: int = 500) -> List[VillageAction]:
+        clauses, params = [], []
+        if call_id:
+            clauses.append("call_session_id = ?")
+            params.append(call_id)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        def list_(conn):
+            rows = [dict(row) for row in conn.execute(
+                f"SELECT id, call_session_id, recipient_id, action_type, reason, urgency, context_for_recipient,"
+                f" status, initiated_at, completed_at, response, outbound_call_id FROM village_actions {where}"
+                f" ORDER BY initiated_at DESC LIMIT ?", (*params, limit)
+            )][::-1]
+            members = self._members(conn, [row["recipient_id"] for row in rows])
+            return [self._build_action(row, members) for row in rows]
+        return await self._run(list_)
+
+    async def clear(self):
+        def clear(conn):
+            with conn:
+                conn.execute("DELETE FROM village_actions")
+                conn.execute("DELETE FROM call_sessions")  # cascades to transcripts and concerns
+                conn.execute("DELETE FROM profile_facts WHERE source_call_id IS NOT NULL")
+        await self._run(clear)
+
+    async def stats(self) -> Dict:
+        def stats(conn):
+            counts = {
+                table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("call_sessions", "transcript_lines", "concerns", "village_actions")
+            }
+            return {"backend": "sqlite", "path": self.path, "rows": counts}
+        return await self._run(stats)
+
+    def close(self):
+        def close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        self._executor.submit(close).result()
+        self._executor.shutdown(wait=False)
+
+
+class SupabaseCallStore(CallStore):
+    """
+    The same tables in Supabase/Postgres (run schema.sql there first). Note that
+    schema.sql types IDs as UUID, so non-UUID IDs (like the demo elder's) need TEXT
+    id columns.
+    """
+
+    encode_json = False  # JSONB columns take objects
+
+    def __init__(self, db=None):
+        from backend.repository import supabase_executor
+
+        self.db = db or supabase_executor
+
+    def _table(self, name: str):
+        return self.db.client.table(name)
+
+    async def _upsert(self, table: str, rows: List[Dict]):
+        if rows:
+            await self.db.run(f"{table}.upsert", lambda: self._table(table).upsert(rows).execute())
+
+    async def _select(self, operation: str, build) -> List[Dict]:
+        response = await self.db.run(operation, lambda: build().execute())
+        return response.data or []
+
+    async def save_elder(self, elder: Elder):
+        await self._upsert("elders", [self._elder_row(elder)])
+        await self._upsert("village_members", [self._member_row(member, elder.id) for member in elder.village])
+        await self._upsert("profile_facts", [self._fact_row(fact, elder.id) for fact in elder.profile])
+
+    async def save_call(self, call: CallSession):
+        if call.target_member:
+            await self._upsert("village_members", [self._member_row(call.target_member, call.elder_id)])
+        await self._upsert("call_sessions", [self._call_row(call)])
+        await self._upsert("concerns", [self._concern_row(call.id, concern) for concern in call.concerns])
+        await self._upsert("profile_facts",
+                           [self._fact_row(fact, call.elder_id, call.id) for fact in call.profile_updates])
+        await self._upsert("village_members",
+                           [self._member_row(action.recipient, call.elder_id) for action in call.village_actions])
+        await self._upsert("village_actions", [self._action_row(action) for action in call.village_actions])
+
+    async def update_call(self, call_id: str, fields: Dict, only_active: bool = False) -> bool:
+        row = self._update_row(fields)
+        if not row:
+            return True
+
+        def update():
+            query = self._table("call_sessions").update(row).eq("id", call_id)
+            if only_active:
+                query = query.is_("ended_at", "null")
+            return query.execute()
+        response = await self.db.run("call_sessions.update", update)
+        return bool(response.data)
+
+    async def add_transcript_lines(self, call_id: str, lines: Iterable[TranscriptLine]) -> bool:
+        rows = await self._select("call_sessions.select", lambda: self._table("call_sessions")
+                                  .select("ended_at").eq("id", call_id))
+        if rows and rows[0]["ended_at"] is not None:
+            return False
+        await self._upsert("transcript_lines", [self._line_row(call_id, line) for line in lines])
+        return True
+
+    async def add_concerns(self, call_id: str, concerns: List[Concern]):
+        await self._upsert("concerns", [self._concern_row(call_id, concern) for concern in concerns])
+
+    async def add_profile_facts(self, call_id: str, elder_id: str, facts: List[ProfileFact]):
+        await self._upsert("profile_facts", [self._fact_row(fact, elder_id, call_id) for fact in facts])
+
+    async def save_action(self, action: VillageAction):
+        rows = await self._select("call_sessions.select", lambda: self._table("call_sessions")
+                                  .select("elder_id").eq("id", action.call_session_id))
+        if not rows:
+            raise ValueError(f"Call not found: {action.call_session_id}")
+        await self._upsert("village_members", [self._member_row(action.recipient, rows[0]["elder_id"])])
+        await self._upsert("village_actions", [self._action_row(action)])
+
+    async def _members(self, ids: List[str]) -> Dict[str, Dict]:
+        ids = list(set(ids))
+        if not ids:
+            return {}
+        rows = await self._select("village_members.select", lambda: self._table("village_members")
+                                  .select("id, name, role, relationship, phone, availability, notes").in_("id", ids))
+        return {row["id"]: row for row in rows}
+
+    async def _load_calls(self, rows: List[Dict]) -> List[CallSession]:
+        if not rows:
+            return []
+        ids = [row["id"] for row in rows]
+
+        async def grouped(table: str, column: str, order: str) -> Dict[str, List[Dict]]:
+            children = await self._select(f"{table}.select", lambda: self._table(table).select("*")
+                                          .in_(column, ids).order(order))
+            groups: Dict[str, List[Dict]] = {}
+            for child in children:
+                groups.setdefault(child[column], []).append(child)
+            return groups
+
+        lines, concerns, facts, actions = await asyncio.gather(
+            grouped("transcript_lines", "call_session_id", "timestamp"),
+            grouped("concerns", "call_session_id", "detected_at"),
+            grouped("profile_facts", "source_call_id", "learned_at"),
+            grouped("village_actions", "call_session_id", "initiated_at"),
+        )
+        members = await self._members([action["recipient_id"] for group in actions.values() for action in group]
+                                      + [row["target_member_id"] for row in rows if row.get("target_member_id")])
+
+        def strip(children: List[Dict], *columns: str) -> List[Dict]:
+            return [{k: v for k, v in child.items() if k not in columns} for child in children]
+
+        return [
+            self._build_call(
+                row,
+                lines.get(row["id"], []),
+                strip(concerns.get(row["id"], []), "call_session_id"),
+                strip(facts.get(row["id"], []), "elder_id", "created_at"),
+                actions.get(row["id"], []),
+                members,
+            )
+            for row in rows
+        ]
+
+    async def get_call(self, call_id: str) -> Optional[CallSession]:
+        rows = await self._select("call_sessions.select", lambda: self._table("call_sessions").select("*").eq("id", call_id))
+        calls = await self._load_calls(rows)
+        return calls[0] if calls else None
+
+    async def get_call_by_room(self, room_name: str) -> Optional[CallSession]:
+        rows = await self._select("call_sessions.select", lambda: self._table("call_sessions").select("*")
+                                  .eq("room_name", room_name).order("started_at", desc=True).limit(1))
+        calls = await self._load_calls(rows)
+        return calls[0] if calls else None
+
+    async def list_calls(self, elder_id: Optional[str] = None, limit: int = 20,
+                         ended: Optional[bool] = None) -> List[CallSession]:
+        def build():
+            query = self._table("call_sessions").select("*")
+            if elder_id:
+                query = query.eq("elder_id", elder_id)
+            if ended is not None:
+                query = query.not_.is_("ended_at", "null") if ended else query.is_("ended_at", "null")
+            return query.order("started_at", desc=True).limit(limit)
+        return await self._load_calls(await self._select("call_sessions.select", build))
+
+    async def list_actions(self, call_id: Optional[str] = None, status: Optional[str] = None,
+                           limit: int = 500) -> List[VillageAction]:
+        def build():
+            query = self._table("village_actions").select("*")
+            if call_id:
+                query = query.eq("call_session_id", call_id)
+            if status:
+                query = query.eq("status", status)
+            return query.order("initiated_at", desc=True).limit(limit)
+        rows = (await self._select("village_actions.select", build))[::-1]
+        members = await self._members([row["recipient_id"] for row in rows])
+        return [self._build_action(row, members) for row in rows]
+
+    async def clear(self):
+        # PostgREST refuses unfiltered deletes
+        for table in ("village_actions", "call_sessions"):
+            await self.db.run(f"{table}.delete",
+                              lambda table=table: self._table(table).delete().not_.is_("id", "null").execute())
+        await self.db.run("profile_facts.delete", lambda: self._table("profile_facts").delete()
+                          .not_.is_("source_call_id", "null").execute())
+
+    async def stats(self) -> Dict:
+        return {"backend": "supabase", "supabase": self.db.stats()}
+
+
+def create_call_store(kind: str = CALL_STORE) -> CallStore:
+    if kind == "supabase":
+        return SupabaseCallStore()
+    if kind != "sqlite":
+        raise ValueError(f"Unknown CALL_STORE: {kind} (expected sqlite or supabase)")
+    return SQLiteCallStore()
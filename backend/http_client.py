@@ -0,0 +1,158 @@
+# Shared outbound HTTP client
+# One app-lifetime httpx.AsyncClient for S3 recording downloads and the Vital Audio
+# biomarker API, instead of blocking `requests` calls or a new client per task.
+# Connections are kept alive between requests, and concurrent requests to any one
+# host are bounded so a burst of post-call work can't open unbounded sockets.
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.environ.get("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+HTTP_KEEPALIVE_SECONDS = float(os.environ.get("HTTP_KEEPALIVE_SECONDS", "30"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("HTTP_CONNECT_TIMEOUT_SECONDS", "10"))
+
+
+class _HostStats:
+    def __init__(self, limit: int):
+        self.slots = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.waiting = 0
+        self.requests = 0
+        self.errors = 0
+        self.bytes_received = 0
+
+
+class HttpClientPool:
+    """Lazily created shared httpx.AsyncClient with per-host limits and usage metrics."""
+
+    def __init__(self, max_connections: int = HTTP_MAX_CONNECTIONS,
+                 max_connections_per_host: int = HTTP_MAX_CONNECTIONS_PER_HOST,
+                 keepalive_seconds: float = HTTP_KEEPALIVE_SECONDS,
+                 connect_timeout_seconds: float = HTTP_CONNECT_TIMEOUT_SECONDS):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_seconds = keepalive_seconds
+        self.connect_timeout_seconds = connect_timeout_seconds
+
+        self._client = None
+        self._hosts: Dict[str, _HostStats] = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=self.keepalive_seconds,
+                ),
+                timeout=httpx.Timeout(60.0, connect=self.connect_timeout_seconds),
+            )
+        return self._client
+
+    def _host(self, url: str) -> _HostStats:
+        host = urlsplit(url).netloc
+        stats = self._hosts.get(host)
+        if stats is None:
+            stats = self._hosts[host] = _HostStats(self.max_connections_per_host)
+        return stats
+
+    @asynccontextmanager
+    async def _slot(self, url: str) -> AsyncIterator[_HostStats]:
+        host = self._host(url)
+        host.waiting += 1
+        try:
+            await host.slots.acquire()
+        finally:
+            host.waiting -= 1
+
+        host.in_flight += 1
+        host.peak_in_flight = max(host.peak_in_flight, host.in_flight)
+        host.requests += 1
+        try:
+            yield host
+        except Exception:
+            host.errors += 1
+            raise
+        finally:
+            host.in_flight -= 1
+            host.slots.release()
+
+    async def request(self, method: str, url: str, **kwargs):
+        """Send a request and read the whole response body."""
+        async with self._slot(url) as host:
+            response = await self.client.request(method, url, **kwargs)
+            host.bytes_received += len(response.content)
+            return response
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs):
+        """
+        Send a request and yield the response with its body unread, for
+        `response.aiter_bytes()`. The host slot is held until the block exits.
+        """
+        async with self._slot(url) as host:
+            async with self.client.stream(method, url, **kwargs) as response:
+                yield _CountingResponse(response, host)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict:
+        connections: Optional[Dict] = None
+        if self._client is not None:
+            try:
+                pool = self._client._transport._pool.connections  # httpcore internals
+                idle = sum(1 for connection in pool if connection.is_idle())
+                connections = {"open": len(pool), "idle": idle, "active": len(pool) - idle}
+            except AttributeError:
+                pass
+
+        return {
+            "max_connections": self.max_connections,
+            "max_connections_per_host": self.max_connections_per_host,
+            "connections": connections,
+            "hosts": {
+                name: {
+                    "in_flight": host.in_flight,
+                    "utilization": round(host.in_flight / self.max_connections_per_host, 2),
+                    "peak_in_flight": host.peak_in_flight,
+                    "waiting": host.waiting,
+                    "requests": host.requests,
+                    "errors": host.errors,
+                    "bytes_received": host.bytes_received,
+                }
+                for name, host in self._hosts.items()
+            },
+        }
+
+
+class _CountingResponse:
+    """A streamed httpx.Response that counts the body bytes it yields."""
+
+    def __init__(self, response, host: _HostStats):
+        self._response = response
+        self._host = host
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    async def aiter_bytes(self, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        async for chunk in self._response.aiter_bytes(chunk_size):
+            self._host.bytes_received += len(chunk)
+            yield chunk
+
+
+http_pool = HttpClientPool()
@@ -0,0 +1,366 @@
+"""
+Durable queue for post-call jobs (recording copy, biomarker and Parkinson's analyses).
+
+Jobs are stored in SQLite, so they survive an API restart and can be run by worker
+processes separate from the API (`python -m backend.jobs`) as well as by a worker
+inside the API process (JOBS_IN_PROCESS_WORKER).
+
+- Every job has an idempotency key (room_name:kind). Enqueueing a key that is queued,
+  running or done is a no-op, so end_call and the agent's triggers don't duplicate work.
+- Failed jobs are retried with exponential backoff, up to max_attempts.
+- A running job holds a lease that its worker keeps renewing. If the worker dies,
+  another one picks the job up once the lease expires.
+- Running jobs per kind are limited across all workers.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOBS_DB_PATH = os.environ.get("JOBS_DB_PATH", os.path.join(os.path.dirname(__file__), "jobs.sqlite3"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF_SECONDS = float(os.environ.get("JOB_RETRY_BACKOFF_SECONDS", "30"))
+JOB_LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", "120"))
+JOB_POLL_SECONDS = float(os.environ.get("JOB_POLL_SECONDS", "1"))
+# Max running jobs per kind across all workers
+JOB_CONCURRENCY = os.environ.get("JOB_CONCURRENCY", "copy=4,biomarkers=4,parkinson=2")
+DEFAULT_CONCURRENCY = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,  -- queued | running | succeeded | failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    lease_until REAL,
+    worker TEXT,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (kind, status, run_after);
+"""
+
+Handler = Callable[[Dict], Awaitable[None]]
+
+
+def parse_concurrency(spec: str) -> Dict[str, int]:
+    """Parse "kind=N,kind=N" into {kind: N}."""
+    limits = {}
+    for part in spec.split(","):
+        kind, _, limit = part.partition("=")
+        if kind.strip() and limit.strip():
+            limits[kind.strip()] = int(limit)
+    return limits
+
+
+class JobQueue:
+    """SQLite-backed job table. Methods are blocking; call them via asyncio.to_thread."""
+
+    def __init__(self, path: str = JOBS_DB_PATH, max_attempts: int = JOB_MAX_ATTEMPTS,
+                 backoff_seconds: float = JOB_RETRY_BACKOFF_SECONDS, lease_seconds: float = JOB_LEASE_SECONDS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.lease_seconds = lease_seconds
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._initialized = True
+        return conn
+
+    def _transaction(self, fn):
+        # BEGIN IMMEDIATE takes the write lock up front, so claims from several worker
+        # processes can't both pick the same job
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn)
+                conn.execute("COMMIT")
+                return result
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def enqueue(self, kind: str, key: str, payload: Dict, max_attempts: Optional[int] = None) -> Dict:
+        """
+        Add a job unless one with this key is already queued, running or done.
+        A job that failed for good is queued again from scratch.
+
+        Returns:
+            the job row, with "enqueued" telling whether this call queued it
+        """
+        now = time.time()
+        max_attempts = max_attempts or self.max_attempts
+
+        def enqueue(conn):
+            row = conn.execute("SELECT * FROM jobs WHERE key = ?", (key,)).fetchone()
+            if row is not None and row["status"] != "failed":
+                return {**dict(row), "enqueued": False}
+
+            if row is None:
+                conn.execute(
+                    "INSERT INTO jobs (id, kind, key, payload, status, max_attempts, run_after, created_at, updated_at)"
+                    " VALUES (?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+                    (uuid.uuid4().hex, kind, key, json.dumps(payload, default=str), max_attempts, now, now, now)
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET payload = ?, status = 'queued', attempts = 0, max_attempts = ?, run_after = ?,"
+                    " lease_until = NULL, worker = NULL, last_error = NULL, updated_at = ? WHERE key = ?",
+                    (json.dumps(payload, default=str), max_attempts, now, now, key)
+                )
+            row = conn.execute("SELECT * FROM jobs WHERE key = ?", (key,)).fetchone()
+            return {**dict(row), "enqueued": True}
+
+        return self._transaction(enqueue)
+
+    def claim(self, kind: str, worker: str, limit: int) -> Optional[Dict]:
+        """
+        Lease the next due job of `kind` to `worker`, unless `limit` jobs of that kind
+        are already running. Jobs whose lease expired (dead worker) count as due.
+        """
+        now = time.time()
+
+        def claim(conn):
+            running = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE kind = ? AND status = 'running' AND lease_until > ?", (kind, now)
+            ).fetchone()[0]
+            if running >= limit:
+                return None
+
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE kind = ? AND ((status = 'queued' AND run_after <= ?)"
+                " OR (status = 'running' AND lease_until <= ?)) ORDER BY run_after LIMIT 1",
+                (kind, now, now)
+            ).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, worker = ?,"
+                " updated_at = ? WHERE id = ?",
+                (now + self.lease_seconds, worker, now, row["id"])
+            )
+            return dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+
+        return self._transaction(claim)
+
+    def renew(self, job_id: str, worker: str) -> bool:
+        """Extend a running job's lease. False if the worker no longer holds it."""
+        now = time.time()
+        return self._transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (now + self.lease_seconds, now, job_id, worker)
+        ).rowcount == 1)
+
+    def complete(self, job_id: str, worker: str):
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET status = 'succeeded', lease_until = NULL, last_error = NULL, updated_at = ?"
+            " WHERE id = ? AND worker = ?",
+            (time.time(), job_id, worker)
+        ))
+
+    def fail(self, job_id: str, worker: str, error: str) -> Optional[str]:
+        """Record a failed attempt: retry later with backoff, or give up. Returns the new status."""
+        now = time.time()
+
+        def fail(conn):
+            row = conn.execute("SELECT * FROM jobs WHERE id = ? AND worker = ?", (job_id, worker)).fetchone()
+            if row is None:
+                return None
+            if row["attempts"] >= row["max_attempts"]:
+                status, run_after = "failed", row["run_after"]
+            else:
+                status, run_after = "queued", now + self.backoff_seconds * 2 ** (row["attempts"] - 1)
+            conn.execute(
+                "UPDATE jobs SET status = ?, run_after = ?, lease_until = NULL, last_error = ?, updated_at = ?"
+                " WHERE id = ?",
+                (status, run_after, error[:1000], now, job_id)
+            )
+            return status
+
+        return self._transaction(fail)
+
+    def release(self, job_id: str, worker: str):
+        """Hand an interrupted job back (e.g. on shutdown) without counting the attempt."""
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), lease_until = NULL,"
+            " worker = NULL, updated_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (time.time(), job_id, worker)
+        ))
+
+    def list(self, key_prefix: str) -> List[Dict]:
+        """Jobs whose key starts with `key_prefix` (e.g. "room_name:")."""
+        pattern = key_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE key LIKE ? ESCAPE '\\' ORDER BY created_at", (pattern,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [{**dict(row), "payload": json.loads(row["payload"])} for row in rows]
+
+    def stats(self) -> Dict:
+        now = time.time()
+        conn = self._connect()
+        try:
+            counts = conn.execute("SELECT kind, status, COUNT(*) FROM jobs GROUP BY kind, status").fetchall()
+            oldest = conn.execute(
+                "SELECT kind, MIN(run_after) FROM jobs WHERE status = 'queued' AND run_after <= ? GROUP BY kind",
+                (now,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        kinds: Dict[str, Dict] = {}
+        for kind, status, count in counts:
+            kinds.setdefault(kind, {})[status] = count
+        for kind, run_after in oldest:
+            kinds[kind]["oldest_due_seconds"] = round(now - run_after, 1)
+        return {"path": self.path, "kinds": kinds}
+
+
+class JobWorker:
+    """Claims jobs from a JobQueue and runs their handlers, `concurrency` per kind at most."""
+
+    def __init__(self, queue: JobQueue, handlers: Dict[str, Handler], concurrency: Optional[Dict[str, int]] = None,
+                 poll_seconds: float = JOB_POLL_SECONDS, name: Optional[str] = None):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency if concurrency is not None else parse_concurrency(JOB_CONCURRENCY)
+        self.poll_seconds = poll_seconds
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+        self._task: Optional[asyncio.Task] = None
+        self._running: Dict[asyncio.Task, Dict] = {}
+        self._stopping = False
+
+    async def run(self):
+        logger.info("job_worker_started", extra={"worker": self.name, "kinds": list(self.handlers)})
+        errors = 0
+        while not self._stopping:
+            claimed = False
+            try:
+                for kind in self.handlers:
+                    limit = self.concurrency.get(kind, DEFAULT_CONCURRENCY)
+                    job = await asyncio.to_thread(self.queue.claim, kind, self.name, limit)
+                    if job is not None:
+                        claimed = True
+                        task = asyncio.create_task(self._execute(job))
+                        self._running[task] = job
+                        task.add_done_callback(lambda t: self._running.pop(t, None))
+                errors = 0
+            except Exception as e:
+                # e.g. "database is locked" with several worker processes: keep polling
+                errors += 1
+                logger.warning("job_claim_failed", extra={"worker": self.name, "error": str(e), "errors": errors})
+                await asyncio.sleep(min(self.poll_seconds * 2 ** errors, 60))
+                continue
+            if not claimed:
+                await asyncio.sleep(self.poll_seconds)
+
+    async def _execute(self, job: Dict):
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+        started = time.monotonic()
+        try:
+            try:
+                await self.handlers[job["kind"]](json.loads(job["payload"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                status = await asyncio.to_thread(self.queue.fail, job["id"], self.name, str(e) or type(e).__name__)
+                logger.warning("job_failed", extra={
+                    "kind": job["kind"], "key": job["key"], "attempt": job["attempts"], "status": status,
+                    "error": str(e),
+                })
+                return
+            await asyncio.to_thread(self.queue.complete, job["id"], self.name)
+            logger.info("job_succeeded", extra={
+                "kind": job["kind"], "key": job["key"], "attempt": job["attempts"],
+                "seconds": round(time.monotonic() - started, 2),
+            })
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The queue couldn't record the outcome; the job runs again once its lease expires
+            logger.error("job_update_failed", extra={"kind": job["kind"], "key": job["key"], "error": str(e)})
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            try:
+                await asyncio.to_thread(self.queue.renew, job_id, self.name)
+            except Exception as e:
+                logger.warning("job_renew_failed", extra={"job_id": job_id, "error": str(e)})
+
+    def start(self):
+        """Run in the background on the current event loop (in-process worker)."""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop claiming, cancel running jobs and hand them back to the queue."""
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        running = dict(self._running)
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        for job in running.values():
+            await asyncio.to_thread(self.queue.release, job["id"], self.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run post-call jobs outside the API process.")
+    parser.add_argument("--kinds", help="Comma-separated job kinds to run (default: all)")
+    parser.add_argument("--poll-seconds", type=float, default=JOB_POLL_SECONDS)
+    args = parser.parse_args()
+
+    from backend.main import job_handlers, job_queue
+
+    kinds = args.kinds.split(",") if args.kinds else list(job_handlers)
+    worker = JobWorker(job_queue, {kind: job_handlers[kind] for kind in kinds}, poll_seconds=args.poll_seconds)
+
+    async def run():
+        try:
+            await worker.run()
+        finally:
+            await worker.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
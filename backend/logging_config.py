@@ -0,0 +1,102 @@
+"""
+Structured, leveled logging for The Village backend.
+
+All `backend.*` loggers (i.e. `logging.getLogger(__name__)` in any backend module) are
+routed through a QueueHandler, so the event loop only pays for putting a record on a
+queue. A QueueListener thread does the formatting and stdout I/O.
+
+Extra fields become structured key=value pairs (or JSON with LOG_FORMAT=json):
+
+    logger.debug("transcript_received", extra={"call_id": call_id, "speaker": speaker})
+
+Per-message events on hot paths should log at DEBUG and use log_sampled() for an
+INFO-level heartbeat once every LOG_SAMPLE_EVERY events.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Dict, Optional
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text").lower()  # "text" or "json"
+LOG_SAMPLE_EVERY = int(os.environ.get("LOG_SAMPLE_EVERY", "100"))
+
+# Attributes every LogRecord has; anything else was passed via `extra`
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_sample_counts: Dict[str, int] = {}
+
+
+def _extra_fields(record: logging.LogRecord) -> Dict:
+    return {k: v for k, v in vars(record).items() if k not in _RESERVED_ATTRS}
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats records as `time level logger message key=value ...` or as JSON."""
+
+    def __init__(self, as_json: bool = False):
+        super().__init__()
+        self.as_json = as_json
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = _extra_fields(record)
+        timestamp = self.formatTime(record, "%Y-%m-%dT%H:%M:%S")
+
+        if self.as_json:
+            entry = {
+                "time": timestamp,
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+                **fields,
+            }
+            if record.exc_info:
+                entry["exc_info"] = self.formatException(record.exc_info)
+            return json.dumps(entry, default=str)
+
+        line = f"{timestamp} {record.levelname:<7} {record.name} {record.getMessage()}"
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def setup_logging(level: str = LOG_LEVEL):
+    """Route `backend.*` loggers through a background queue listener. Safe to call twice."""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(StructuredFormatter(as_json=LOG_FORMAT == "json"))
+
+    backend_logger = logging.getLogger("backend")
+    backend_logger.setLevel(level)
+    backend_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    backend_logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def log_sampled(logger: logging.Logger, event: str, every: Optional[int] = None,
+                level: int = logging.INFO, **fields):
+    """Log `event` once every `every` occurrences (the first one included)."""
+    if not logger.isEnabledFor(level):
+        return
+
+    every = every or LOG_SAMPLE_EVERY
+    count = _sample_counts.get(event, 0) + 1
+    _sample_counts[event] = count
+
+    if every <= 1 or count % every == 1:
+        logger.log(level, event, extra={**fields, "sampled_every": every, "event_count": count})
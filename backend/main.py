@@ -1,24 +1,34 @@
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, WebSocket, WebSocketDisconnect, BackgroundTasks
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from backend.database import supabase
+from fastapi.responses import StreamingResponse
+from backend.repository import supabase_executor, calls_repository, recording_storage
+from backend.http_client import http_pool
+from backend.jobs import JobQueue, JobWorker
+from backend.call_store import create_call_store
 from backend.websocket_manager import ws_manager
 from backend.models import (
     Elder, CallSession, CallStatus, TranscriptLine, VillageAction,
-    Concern, ProfileFact, VillageMember
+    Concern, ProfileFact, VillageMember, ActionUrgency
 )
 from backend.margaret import margaret_elder
 from backend.ai_analyzer import ai_analyzer
-import requests
+from backend.call_registry import CallRegistry
+from backend.analysis_scheduler import AnalysisScheduler
+from backend.recording_tracker import RecordingTracker
+from backend.recording_spool import RecordingSpool
+from backend.logging_config import setup_logging, log_sampled
+from backend.parkinson.streaming import MIN_WINDOW_SPEECH_SECONDS
+from backend.parkinson.worker_pool import parkinson_pool, PoolSaturated
 import os
 import uuid
 import json
-from livekit import api
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+from pydantic import BaseModel, Field
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import asyncio
-import httpx
+import logging
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables - try multiple locations
@@ -30,6 +40,9 @@ if backend_env.exists():
     load_dotenv(backend_env)
     print(f"✅ Loaded environment from: {backend_env}")
 
+setup_logging()
+logger = logging.getLogger(__name__)
+
 # Request models for API endpoints
 class CallRequest(BaseModel):
     participant_name: str = "Margaret"
@@ -62,6 +75,12 @@ class GetBiomarkersRequest(BaseModel):
 class GetParkinsonRequest(BaseModel):
     recording_path: str
     room_name: Optional[str] = None
+    # Analyze in chunks, with per-window scores; a shorter window never holds enough speech to score
+    window_seconds: Optional[float] = Field(None, ge=MIN_WINDOW_SPEECH_SECONDS)
+
+class ParkinsonBatchRequest(BaseModel):
+    recording_paths: List[str]
+    batch_size: int = Field(32, ge=1, le=256)
 
 # LiveKit environment variables
 LIVEKIT_API_KEY = os.environ.get("LIVEKIT_API_KEY")
@@ -69,10 +88,41 @@ LIVEKIT_API_SECRET = os.environ.get("LIVEKIT_API_SECRET")
 LIVEKIT_URL = os.environ.get("LIVEKIT_URL")
 SIP_TRUNK_ID = os.environ.get("SIP_TRUNK_ID")
 
-# In-memory storage for demo (replace with database in production)
-active_calls: Dict[str, CallSession] = {}
-call_history: List[CallSession] = []
-village_actions_store: List[VillageAction] = []
+# How long WebSocket subscriptions for an ended call are kept for late updates
+WS_ENDED_CALL_GRACE_SECONDS = float(os.environ.get("WS_ENDED_CALL_GRACE_SECONDS", "120"))
+
+# Calls at least this long are analyzed for Parkinson's in PARKINSON_WINDOW_SECONDS chunks
+PARKINSON_WINDOWED_MIN_CALL_SECONDS = float(os.environ.get("PARKINSON_WINDOWED_MIN_CALL_SECONDS", "600"))
+PARKINSON_WINDOW_SECONDS = float(os.environ.get("PARKINSON_WINDOW_SECONDS", "30"))
+
+# Load lazily-imported clients and the Parkinson's model at startup rather than on first use
+STARTUP_WARMUP = os.environ.get("STARTUP_WARMUP", "false").lower() == "true"
+
+# Recording readiness: copy/analysis tasks wait for the file instead of sleeping
+recording_tracker = RecordingTracker(
+    timeout_seconds=float(os.environ.get("RECORDING_READY_TIMEOUT_SECONDS", "600")),
+    initial_poll_seconds=float(os.environ.get("RECORDING_POLL_INITIAL_SECONDS", "2")),
+    max_poll_seconds=float(os.environ.get("RECORDING_POLL_MAX_SECONDS", "15"))
+)
+# Post-call stages share one download of each recording through a local spool
+recording_spool = RecordingSpool(
+    os.environ.get("RECORDING_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "village-recordings")),
+    max_files=int(os.environ.get("RECORDING_SPOOL_MAX_FILES", "20")),
+    ttl_seconds=float(os.environ.get("RECORDING_SPOOL_TTL_SECONDS", "1800"))
+)
+
+# Durable queue for post-call jobs; run them here, or set this to false and run
+# `python -m backend.jobs` worker processes
+job_queue = JobQueue()
+JOBS_IN_PROCESS_WORKER = os.environ.get("JOBS_IN_PROCESS_WORKER", "true").lower() == "true"
+
+# Calls, transcripts and village actions are persisted in the call store (SQLite by
+# default, CALL_STORE=supabase for Supabase); active calls are also cached in memory
+call_store = create_call_store()
+active_calls = CallRegistry(  # Indexed by call ID and room_name
+    max_calls=int(os.environ.get("ACTIVE_CALL_CACHE_SIZE", "500")),
+    idle_seconds=float(os.environ.get("ACTIVE_CALL_IDLE_SECONDS", "1800"))
+)
 
 app = FastAPI(title="The Village API", version="1.0.0")
 
@@ -99,7 +149,7 @@ def read_root():
 def health_check():
     """Checks if the backend can connect to Supabase"""
     try:
-        if not supabase:
+        if not supabase_executor.available:
              return {"status": "ok", "supabase": "not_configured"}
         return {"status": "ok", "supabase": "initialized"}
     except Exception as e:
@@ -126,14 +176,70 @@ async def get_elder_history(elder_id: str, limit: int = 10) -> List[CallSession]
         raise HTTPException(status_code=404, detail=f"Elder not found: {elder_id}")
 
     # Return most recent calls first
-    elder_calls = [call for call in call_history if call.elder_id == elder_id]
-    return sorted(elder_calls, key=lambda x: x.started_at, reverse=True)[:limit]
+    return await call_store.list_calls(elder_id=elder_id, limit=limit, ended=True)
 
 
 # ============================================================================
 # CALL ENDPOINTS (MERGED)
 # ============================================================================
 
+async def persist_call(call: CallSession):
+    """Save a new call. Later changes go through update_stored_call and appended rows."""
+    try:
+        await call_store.save_call(call)
+    except Exception as e:
+        print(f"⚠️  Call store save failed for {call.id}: {e}")
+
+
+async def update_stored_call(call_id: str, fields: Dict, only_active: bool = False) -> Optional[bool]:
+    """Set some of a stored call's fields (see CallStore.update_call). None if the store failed."""
+    try:
+        return await call_store.update_call(call_id, fields, only_active=only_active)
+    except Exception as e:
+        print(f"⚠️  Call store update failed for {call_id}: {e}")
+        return None
+
+
+async def save_analysis(call: CallSession, analysis: Dict):
+    """Store an analysis result: wellbeing (while the call is active), new concerns and profile facts."""
+    try:
+        if analysis.get("wellbeing_update"):
+            await call_store.update_call(call.id, {"wellbeing": analysis["wellbeing_update"]}, only_active=True)
+        if analysis.get("concerns"):
+            await call_store.add_concerns(call.id, analysis["concerns"])
+        if analysis.get("profile_facts"):
+            await call_store.add_profile_facts(call.id, call.elder_id, analysis["profile_facts"])
+    except Exception as e:
+        print(f"⚠️  Call store save failed for analysis of {call.id}: {e}")
+
+
+def drop_active_call(call_id: str):
+    """Forget an active call: pending analysis, analysis context and cache entry."""
+    analysis_scheduler.cancel(call_id)
+    ai_analyzer.cleanup_call_context(call_id)
+    active_calls.remove(call_id)
+
+
+async def resolve_active_call(identifier: str) -> Tuple[Optional[str], Optional[CallSession]]:
+    """
+    Find an active call by ID or room name, reloading it from the call store if it
+    was evicted from the in-memory cache (or the API restarted mid-call).
+    """
+    call_id, call = active_calls.resolve(identifier)
+    if call:
+        return call_id, call
+
+    call = await call_store.get_call(identifier) or await call_store.get_call_by_room(identifier)
+    if call is None or call.ended_at is not None:
+        return None, None
+    active_calls.add(call)
+    return call.id, call
+
+
+def with_active_calls(calls: List[CallSession]) -> List[CallSession]:
+    """Stored calls, with active ones replaced by their live in-memory state."""
+    return [call if call.ended_at else active_calls.get(call.id) or call for call in calls]
+
 @app.post("/api/call/start")
 async def start_call_api(request: StartCallRequest) -> CallSession:
     """
@@ -164,8 +270,13 @@ async def start_call_api(request: StartCallRequest) -> CallSession:
         village_actions=[]
     )
 
-    # Store in active calls
-    active_calls[call_id] = call_session
+    # Store in active calls and persist it before the agent starts sending transcript lines
+    active_calls.add(call_session)
+    try:
+        await call_store.save_elder(elder)
+    except Exception as e:
+        print(f"⚠️  Call store save failed for elder {elder.id}: {e}")
+    await persist_call(call_session)
 
     # Broadcast WebSocket event
     await ws_manager.emit_call_started(call_id, elder.id)
@@ -181,6 +292,8 @@ async def start_call_api(request: StartCallRequest) -> CallSession:
     print(f"{'='*60}\n")
 
     if LIVEKIT_API_KEY and LIVEKIT_API_SECRET and LIVEKIT_URL:
+        from livekit import api
+
         try:
             lk_api = api.LiveKitAPI(LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET)
 
@@ -242,10 +355,10 @@ async def start_call_api(request: StartCallRequest) -> CallSession:
 
                         egress_info = await lk_api.egress.start_room_composite_egress(egress_request)
                         call_session.recording_path = s3_filepath
+                        await update_stored_call(call_id, {"recording_path": s3_filepath})
                         print(f"✅ Recording started: {egress_info.egress_id}")
-
-                        # Start background task to copy recording to Supabase Storage
-                        asyncio.create_task(copy_recording_to_supabase_storage(room_name, s3_filepath))
+                        # The copy to Supabase Storage is queued with the analyses once the
+                        # call ends, so a live call doesn't hold a copy slot
 
                     except Exception as e:
                         print(f"⚠️  Recording setup failed: {e}")
@@ -256,16 +369,16 @@ async def start_call_api(request: StartCallRequest) -> CallSession:
             print(f"⚠️  LiveKit setup error: {e}")
 
     # Save to database if available (from Remote)
-    if supabase:
+    if calls_repository.available:
         try:
-            supabase.table("calls").insert({
+            await calls_repository.insert({
                 "id": call_id,
                 "elderly_id": elder.id,
                 "room_name": room_name,
                 "status": "ringing",
                 "started_at": call_session.started_at.isoformat(),
                 "recording_path": call_session.recording_path
-            }).execute()
+            })
             print(f"✅ Call saved to database: {call_id}")
         except Exception as e:
             print(f"⚠️  Database save failed: {e}")
@@ -274,25 +387,52 @@ async def start_call_api(request: StartCallRequest) -> CallSession:
 
 
 @app.post("/api/call/{call_id}/end")
-async def end_call_api(call_id: str, background_tasks: BackgroundTasks) -> CallSession:
+async def end_call_api(call_id: str) -> CallSession:
     """
     End an active call.
     MERGED: HEAD's logic + Remote's background health analysis
     """
-    if call_id not in active_calls:
+    resolved_id, call = await resolve_active_call(call_id)
+    if not call:
         raise HTTPException(status_code=404, detail=f"Call not found: {call_id}")
+    call_id = resolved_id
+
+    ended_at = datetime.utcnow()
+    duration_seconds = int((ended_at - call.started_at).total_seconds()) if call.started_at else None
+
+    # Only the end fields are written: the analysis results and transcript another API
+    # worker saved for this call are kept
+    end_fields = {"status": CallStatus.COMPLETED, "ended_at": ended_at, "duration_seconds": duration_seconds}
+    stored = await update_stored_call(call_id, end_fields, only_active=True)
+    if stored is False:
+        # No active row: either the call already ended (e.g. through another API worker)
+        # or its row was never written because persist_call failed when it started
+        try:
+            existing = await call_store.get_call(call_id)
+        except Exception as e:
+            print(f"⚠️  Call store reload failed for {call_id}: {e}")
+        else:
+            if existing is not None and existing.ended_at is not None:
+                drop_active_call(call_id)
+                raise HTTPException(status_code=404, detail=f"Call not found: {call_id}")
+            if existing is None:
+                # Saved from the in-memory call, which holds everything recorded so far
+                await persist_call(call.model_copy(update=end_fields))
+        stored = None
+    if stored:
+        try:
+            call = await call_store.get_call(call_id) or call
+        except Exception as e:
+            print(f"⚠️  Call store reload failed for {call_id}: {e}")
 
-    call = active_calls[call_id]
-    call.ended_at = datetime.utcnow()
+    call.ended_at = ended_at
     call.status = CallStatus.COMPLETED
-
-    if call.started_at and call.ended_at:
-        call.duration_seconds = int((call.ended_at - call.started_at).total_seconds())
+    call.duration_seconds = duration_seconds
 
     # Save to database (from Remote)
-    if supabase:
+    if calls_repository.available:
         try:
-            supabase.table("calls").update({
+            await calls_repository.update(call_id, {
                 "transcript": [t.dict() for t in call.transcript],
                 "status": "completed",
                 "ended_at": call.ended_at.isoformat(),
@@ -301,16 +441,19 @@ async def end_call_api(call_id: str, background_tasks: BackgroundTasks) -> CallS
                 "concerns": [c.dict() for c in call.concerns],
                 "biomarkers": None,  # Will be populated by background task
                 "parkinson_detection": None  # Will be populated by background task
-            }).eq("id", call_id).execute()
+            })
             print(f"✅ Call data saved to database")
         except Exception as e:
             print(f"⚠️  Database update failed: {e}")
 
     # Trigger background health analysis if recording exists (from Remote)
     if call.recording_path:
-        room_name = f"call_{call_id[:8]}"  # Reconstruct room name
-        background_tasks.add_task(process_biomarkers_background, room_name, call.recording_path, os.getenv("S3_ENDPOINT"))
-        background_tasks.add_task(process_parkinson_background, room_name, call.recording_path)
+        room_name = call.room_name or f"call_{call_id[:8]}"
+        recording_tracker.call_ended(call.recording_path)
+        await enqueue_post_call_jobs(
+            room_name, call.recording_path, ["copy", "biomarkers", "parkinson"],
+            elder_speech_intervals(call), parkinson_window_seconds(call)
+        )
         print(f"🧬 Queued health analysis for {call.recording_path}")
 
     # Broadcast status change (HEAD)
@@ -320,9 +463,14 @@ async def end_call_api(call_id: str, background_tasks: BackgroundTasks) -> CallS
     if call.summary:
         await ws_manager.emit_call_ended(call_id, call.summary.dict())
 
-    # Move to history
-    call_history.append(call)
-    del active_calls[call_id]
+    # Prune the ended call's subscriptions once late updates have had time to arrive
+    for key in (call_id, call.room_name):
+        if key:
+            ws_manager.drop_call(key, delay_seconds=WS_ENDED_CALL_GRACE_SECONDS)
+
+    # Stop any pending analysis for this call, free its analysis context and drop it
+    # from the active calls
+    drop_active_call(call_id)
 
     return call
 
@@ -330,14 +478,12 @@ async def end_call_api(call_id: str, background_tasks: BackgroundTasks) -> CallS
 @app.get("/api/call/{call_id}")
 async def get_call(call_id: str) -> CallSession:
     """Get call details by ID"""
-    # Check active calls first
-    if call_id in active_calls:
-        return active_calls[call_id]
-
-    # Check history
-    for call in call_history:
-        if call.id == call_id:
-            return call
+    # The stored call says whether it has ended (possibly through another API worker);
+    # while it's active, the in-memory copy has the latest state
+    stored = await call_store.get_call(call_id)
+    call = stored if stored and stored.ended_at else active_calls.get(call_id) or stored
+    if call:
+        return call
 
     raise HTTPException(status_code=404, detail=f"Call not found: {call_id}")
 
@@ -345,15 +491,8 @@ async def get_call(call_id: str) -> CallSession:
 @app.get("/api/calls")
 async def list_calls(elder_id: Optional[str] = None, limit: int = 20) -> List[CallSession]:
     """List all calls, optionally filtered by elder_id"""
-    all_calls = list(active_calls.values()) + call_history
-
-    if elder_id:
-        all_calls = [call for call in all_calls if call.elder_id == elder_id]
-
-    # Sort by started_at descending (most recent first)
-    all_calls.sort(key=lambda x: x.started_at, reverse=True)
-
-    return all_calls[:limit]
+    # Most recent first
+    return with_active_calls(await call_store.list_calls(elder_id=elder_id, limit=limit))
 
 
 # ============================================================================
@@ -364,7 +503,10 @@ async def list_calls(elder_id: Optional[str] = None, limit: int = 20) -> List[Ca
 async def trigger_village_action(action: VillageAction) -> VillageAction:
     """Trigger a village action (call to family/neighbor/medical/volunteer)"""
     # Store the action
-    village_actions_store.append(action)
+    try:
+        await call_store.save_action(action)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
     # TODO: Actually initiate the outbound call
     # For now, just return the action
@@ -377,16 +519,8 @@ async def list_village_actions(
     call_id: Optional[str] = None,
     status: Optional[str] = None
 ) -> List[VillageAction]:
-    """List village actions, optionally filtered"""
-    actions = village_actions_store
-
-    if call_id:
-        actions = [a for a in actions if a.call_session_id == call_id]
-
-    if status:
-        actions = [a for a in actions if a.status == status]
-
-    return actions
+    """List the most recent 500 village actions (oldest first), optionally filtered"""
+    return await call_store.list_actions(call_id=call_id, status=status)
 
 
 # ============================================================================
@@ -411,39 +545,15 @@ async def stream_transcript_chunk(chunk: TranscriptChunkRequest):
 
     NOTE: call_id can be either a UUID (call ID) or a room_name (LiveKit room)
     """
-    print(f"")
-    print(f"🟢 [BACKEND] Received transcript stream request")
-    print(f"   Call ID: {chunk.call_id}")
-    print(f"   Speaker: {chunk.speaker} ({chunk.speaker_name})")
-    print(f"   Text: {chunk.text[:100]}..." if len(chunk.text) > 100 else f"   Text: {chunk.text}")
-    print(f"   Timestamp: {chunk.timestamp}")
-
     identifier = chunk.call_id  # Can be UUID or room_name
 
-    print(f"   🔍 Looking up call with identifier: {identifier}")
-    print(f"   📋 Active calls: {list(active_calls.keys())}")
-
-    # Try to find call by call_id first (UUID)
-    if identifier in active_calls:
-        call = active_calls[identifier]
-        call_id = identifier
-        print(f"   ✅ Found call by UUID: {call_id}")
-    else:
-        # Try to find by room_name
-        call = None
-        call_id = None
-        for cid, c in active_calls.items():
-            print(f"   🔍 Checking call {cid}: room_name={c.room_name}")
-            if c.room_name == identifier:
-                call = c
-                call_id = cid
-                print(f"   ✅ Found call by room_name: {call_id}")
-                break
-
-        if not call:
-            print(f"   ❌ Call not found! Identifier: {identifier}")
-            print(f"   📋 Available room names: {[c.room_name for c in active_calls.values()]}")
-            raise HTTPException(status_code=404, detail=f"Call not found: {identifier}")
+    # O(1) lookup by call_id (UUID) or room_name
+    call_id, call = await resolve_active_call(identifier)
+    if not call:
+        logger.warning("transcript_call_not_found", extra={
+            "identifier": identifier, "active_calls": len(active_calls)
+        })
+        raise HTTPException(status_code=404, detail=f"Call not found: {identifier}")
 
     # Create transcript line
     transcript_line = TranscriptLine(
@@ -454,18 +564,28 @@ async def stream_transcript_chunk(chunk: TranscriptChunkRequest):
         timestamp=chunk.timestamp or datetime.utcnow().isoformat()
     )
 
-    print(f"   ✅ Created transcript line: {transcript_line.id}")
+    # Store the line; this also tells whether the call was ended through another API worker
+    try:
+        active = await call_store.add_transcript_line(call_id, transcript_line)
+    except Exception as e:
+        print(f"⚠️  Call store transcript save failed for {call_id}: {e}")
+        active = True
+    if not active:
+        drop_active_call(call_id)
+        raise HTTPException(status_code=404, detail=f"Call not found: {identifier}")
 
     # Add to call transcript
     call.transcript.append(transcript_line)
-    print(f"   ✅ Added to call transcript (now {len(call.transcript)} lines)")
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("transcript_received", extra={
+            "call_id": call_id, "speaker": chunk.speaker,
+            "chars": len(chunk.text), "lines": len(call.transcript)
+        })
+    log_sampled(logger, "transcript_received", active_calls=len(active_calls))
 
     # Broadcast to WebSocket subscribers (both UUID call_id AND room_name)
-    print(f"   📡 Broadcasting to WebSocket subscribers...")
-    print(f"      - Call ID: {call_id}")
-    print(f"      - Room name: {call.room_name}")
     await ws_manager.emit_transcript_update(call_id, transcript_line.dict(), room_name=call.room_name)
-    print(f"   ✅ WebSocket broadcast complete")
 
     # Get elder profile
     elder = margaret_elder  # For now, hardcoded to Margaret
@@ -473,23 +593,18 @@ async def stream_transcript_chunk(chunk: TranscriptChunkRequest):
         # In production, fetch from database
         pass
 
-    # Trigger AI analysis in the background (non-blocking)
-    print(f"   🤖 Triggering AI analysis in background...")
-    asyncio.create_task(analyze_and_update_call(call, elder, transcript_line))
+    # Schedule AI analysis in the background (non-blocking, coalesced per call)
+    analysis_scheduler.schedule(call, elder, transcript_line)
 
-    print(f"   ✅ Transcript stream request complete")
     return {"status": "success", "transcript_line_id": transcript_line.id}
 
 
-async def analyze_and_update_call(call: CallSession, elder: Elder, transcript_line: TranscriptLine):
+async def apply_analysis_to_call(call: CallSession, analysis: Dict):
     """
-    Analyze transcript chunk and update call state.
-    Runs in background to not block the transcript streaming endpoint.
+    Apply an AI analysis result to the call state and broadcast it.
+    Called by the analysis scheduler, at most once at a time per call.
     """
     try:
-        # Run AI analysis
-        analysis = await ai_analyzer.analyze_transcript_chunk(call, elder, transcript_line)
-
         # Update wellbeing assessment
         if analysis.get("wellbeing_update"):
             call.wellbeing = analysis["wellbeing_update"]
@@ -509,6 +624,8 @@ async def analyze_and_update_call(call: CallSession, elder: Elder, transcript_li
             call.profile_updates.append(fact)
             await ws_manager.emit_profile_update(call.id, fact.dict(), room_name=call.room_name)
 
+        await save_analysis(call, analysis)
+
         # Trigger village actions
         for suggested_action in analysis.get("suggested_actions", []):
             if suggested_action.get("urgency") == "immediate":
@@ -521,6 +638,29 @@ async def analyze_and_update_call(call: CallSession, elder: Elder, transcript_li
         traceback.print_exc()
 
 
+# Coalesces transcript lines into at most one in-flight analysis per call
+analysis_scheduler = AnalysisScheduler(
+    ai_analyzer,
+    apply_analysis_to_call,
+    window_seconds=float(os.getenv("ANALYSIS_DEBOUNCE_SECONDS", "1.5"))
+)
+
+
+@app.get("/api/analysis/stats")
+async def get_analysis_stats():
+    """Analysis scheduler counters (requested vs. executed analyses) and token usage"""
+    return {
+        **analysis_scheduler.stats(),
+        "tokens": ai_analyzer.token_stats()
+    }
+
+
+@app.get("/api/analysis/memory")
+async def get_analysis_memory():
+    """Memory stats for the per-call analysis context store"""
+    return ai_analyzer.memory_stats()
+
+
 async def trigger_village_action_internal(call: CallSession, suggested_action: Dict):
     """
     Internal function to trigger a village action.
@@ -534,29 +674,44 @@ async def trigger_village_action_internal(call: CallSession, suggested_action: D
     action = VillageAction(
         id=str(uuid.uuid4()),
         call_session_id=call.id,
-        triggered_at=datetime.utcnow().isoformat(),
-        type=suggested_action.get("type", "unknown"),
+        recipient=VillageMember(**target_member),
+        action_type=suggested_action.get("type", "unknown"),
         reason=suggested_action.get("reason", ""),
-        target_member_id=target_member.get("id", ""),
-        target_member_name=target_member.get("name", ""),
-        target_member_phone=target_member.get("phone", ""),
-        status="initiated",
-        estimated_response_time=suggested_action.get("estimated_response_time", 78)
+        urgency=ActionUrgency.IMMEDIATE,
+        context_for_recipient=suggested_action.get("reason", ""),
+        status="pending",
+        initiated_at=datetime.utcnow()
     )
 
     # Store action
-    village_actions_store.append(action)
     call.village_actions.append(action)
+    await persist_village_action(action)
 
     # Broadcast action started
     await ws_manager.emit_village_action_started(call.id, action.dict())
 
-    print(f"🚨 VILLAGE ACTION TRIGGERED: {action.type} → {action.target_member_name}")
+    print(f"🚨 VILLAGE ACTION TRIGGERED: {action.action_type} → {action.recipient.name}")
 
     # Actually call the village member via LiveKit SIP
     asyncio.create_task(call_village_member(call.id, action, suggested_action.get("reason", "")))
 
 
+async def persist_village_action(action: VillageAction):
+    try:
+        await call_store.save_action(action)
+    except Exception as e:
+        print(f"⚠️  Call store save failed for village action {action.id}: {e}")
+
+
+async def update_village_action(call_id: str, action: VillageAction, status: str, response: Optional[str] = None):
+    """Set a village action's status (and response), save it and broadcast the update."""
+    action.status = status
+    if response is not None:
+        action.response = response
+    await persist_village_action(action)
+    await ws_manager.emit_village_action_update(call_id, action.id, status, response)
+
+
 async def call_village_member(call_id: str, action: VillageAction, concern_reason: str):
     """
     Actually call a village member via LiveKit SIP when a concern is detected.
@@ -569,15 +724,13 @@ async def call_village_member(call_id: str, action: VillageAction, concern_reaso
 
     try:
         # Update status to calling
-        action.status = "calling"
-        await ws_manager.emit_village_action_update(call_id, action.id, "calling")
+        await update_village_action(call_id, action, "calling")
 
         # Format phone number for SIP
-        phone = action.target_member_phone
+        phone = action.recipient.phone
         if not phone:
-            print(f"❌ No phone number for {action.target_member_name}")
-            action.status = "failed"
-            await ws_manager.emit_village_action_update(call_id, action.id, "failed", "No phone number")
+            print(f"❌ No phone number for {action.recipient.name}")
+            await update_village_action(call_id, action, "failed", "No phone number")
             return
 
         if not phone.startswith("+"):
@@ -587,10 +740,11 @@ async def call_village_member(call_id: str, action: VillageAction, concern_reaso
         room_name = f"village-{action.id}"
 
         # Initialize LiveKit API
+        from livekit import api
         lk_api = api.LiveKitAPI(LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET)
 
         # Initiate ACTUAL SIP call to village member
-        print(f"📞 CALLING {action.target_member_name} at {phone}...")
+        print(f"📞 CALLING {action.recipient.name} at {phone}...")
 
         sip_participant = await lk_api.sip.create_sip_participant(
             api.CreateSIPParticipantRequest(
@@ -598,20 +752,19 @@ async def call_village_member(call_id: str, action: VillageAction, concern_reaso
                 sip_call_to=phone,
                 room_name=room_name,
                 participant_identity=f"village-{action.id}",
-                participant_name=action.target_member_name,
+                participant_name=action.recipient.name,
                 attributes={
-                    "concern_type": action.type,
+                    "concern_type": action.action_type,
                     "concern_reason": concern_reason,
                     "elder_name": margaret_elder.name
                 }
             )
         )
 
-        action.status = "ringing"
-        await ws_manager.emit_village_action_update(call_id, action.id, "ringing")
+        await update_village_action(call_id, action, "ringing")
 
         print(f"📱 SIP call initiated!")
-        print(f"   → {action.target_member_name} at {phone}")
+        print(f"   → {action.recipient.name} at {phone}")
         print(f"   → Room: {room_name}")
         print(f"   → Reason: {concern_reason}")
 
@@ -621,105 +774,162 @@ async def call_village_member(call_id: str, action: VillageAction, concern_reaso
         # 3. Get their response
         # 4. Update the action status)
         await asyncio.sleep(5)  # Give time for call to connect
-        action.status = "connected"
-        action.response = f"Called {action.target_member_name}. Concern: {concern_reason}"
-        await ws_manager.emit_village_action_update(call_id, action.id, "connected", action.response)
+        await update_village_action(
+            call_id, action, "connected", f"Called {action.recipient.name}. Concern: {concern_reason}"
+        )
 
         await lk_api.aclose()
 
-        print(f"✅ Village call established with {action.target_member_name}")
+        print(f"✅ Village call established with {action.recipient.name}")
 
     except Exception as e:
         print(f"❌ Error calling village member: {e}")
         import traceback
         traceback.print_exc()
 
-        action.status = "failed"
-        action.response = f"Failed to call: {str(e)}"
-        await ws_manager.emit_village_action_update(call_id, action.id, "failed", action.response)
+        await update_village_action(call_id, action, "failed", f"Failed to call: {str(e)}")
 
 
 async def simulate_village_response(call_id: str, action: VillageAction):
     """Fallback simulation when LiveKit is not configured"""
     await asyncio.sleep(2)
-    action.status = "calling"
-    await ws_manager.emit_village_action_update(call_id, action.id, "calling")
+    await update_village_action(call_id, action, "calling")
 
     await asyncio.sleep(3)
-    action.status = "connected"
-    action.response = f"{action.target_member_name} has been notified (simulated - configure LiveKit for real calls)."
-    await ws_manager.emit_village_action_update(call_id, action.id, "connected", action.response)
+    await update_village_action(
+        call_id, action, "connected",
+        f"{action.recipient.name} has been notified (simulated - configure LiveKit for real calls)."
+    )
 
-    print(f"✅ Village response simulated for {action.target_member_name}")
+    print(f"✅ Village response simulated for {action.recipient.name}")
 
 
 # ============================================================================
 # HEALTH ANALYTICS ENDPOINTS (FROM REMOTE)
 # ============================================================================
 
-# Background task to copy recording from S3-compatible storage to Supabase Storage
-async def copy_recording_to_supabase_storage(room_name: str, s3_filepath: str):
-    """Copy recording from LiveKit's S3-compatible storage to Supabase Storage for easy access"""
+# Post-call recording pipeline: one download per recording, fanned out to the copy to
+# Supabase Storage and the biomarker / Parkinson's analyses
+async def s3_recording_exists(s3_url: str, headers: Dict) -> bool:
+    """Whether LiveKit egress has finished writing the recording to S3-compatible storage"""
     try:
-        print(f"📋 [Copy] Starting file copy for room: {room_name}")
-        print(f"⏳ [Copy] Waiting 35 seconds for LiveKit egress to complete...")
-        await asyncio.sleep(35)
+        response = await http_pool.request("HEAD", s3_url, headers=headers, timeout=10)
+        return response.status_code == 200
+    except Exception:
+        return False
 
-        # Download from S3-compatible storage
-        if not (os.getenv("S3_ENDPOINT") and os.getenv("S3_ACCESS_KEY") and os.getenv("S3_SECRET")):
-            print(f"❌ [Copy] S3 credentials not available")
-            return
 
-        s3_endpoint = os.getenv("S3_ENDPOINT")
-        s3_bucket = os.getenv("S3_BUCKET")
-        s3_base_url = s3_endpoint.replace('/storage/v1/s3', '').rstrip('/')
-        s3_url = f"{s3_base_url}/{s3_bucket}/{s3_filepath}"
+async def storage_recording_exists(path: str) -> bool:
+    """Whether a recording has been copied to Supabase Storage"""
+    try:
+        return await recording_storage.exists(path)
+    except Exception:
+        return False
 
-        service_key = os.getenv("SUPABASE_SERVICE_KEY")
-        headers = {'Authorization': f'Bearer {service_key}', 'apikey': service_key} if service_key else {}
 
-        response = requests.get(s3_url, headers=headers, timeout=30)
-        if response.status_code != 200:
-            print(f"❌ [Copy] Failed to download: HTTP {response.status_code}")
-            return
+def s3_recording_location(s3_filepath: str) -> Optional[Tuple[str, Dict]]:
+    """(URL, headers) of a recording in LiveKit's S3-compatible storage, or None if not configured"""
+    if not (os.getenv("S3_ENDPOINT") and os.getenv("S3_ACCESS_KEY") and os.getenv("S3_SECRET")):
+        return None
+
+    s3_endpoint = os.getenv("S3_ENDPOINT")
+    s3_bucket = os.getenv("S3_BUCKET")
+    s3_base_url = s3_endpoint.replace('/storage/v1/s3', '').rstrip('/')
+    s3_url = f"{s3_base_url}/{s3_bucket}/{s3_filepath}"
 
-        audio_content = response.content
-        print(f"✅ [Copy] Downloaded {len(audio_content)} bytes")
+    service_key = os.getenv("SUPABASE_SERVICE_KEY")
+    headers = {'Authorization': f'Bearer {service_key}', 'apikey': service_key} if service_key else {}
+    return s3_url, headers
 
-        # Upload to Supabase Storage
-        upload_bucket = "audio_files"
-        supabase.storage.from_(upload_bucket).upload(
-            path=s3_filepath,
-            file=audio_content,
-            file_options={"content-type": "audio/mpeg"}
-        )
 
-        print(f"✅ [Copy] Uploaded to Supabase Storage: {upload_bucket}/{s3_filepath}")
+def open_recording_file(recording_path: str):
+    """
+    Download a call recording once for all post-call stages: from LiveKit's S3 output
+    when configured (waiting for egress to finish), otherwise from Supabase Storage.
+    The download streams into a local spool file. Use as `async with ... as path`; the
+    spool keeps the file until the block exits, and concurrent and later callers get
+    the same file.
+    """
+    async def download(file) -> None:
+        s3_location = s3_recording_location(recording_path)
+        written = 0
+        if s3_location:
+            s3_url, headers = s3_location
+            # Egress writes the file once the call's room closes
+            print(f"⏳ [Pipeline] Waiting for LiveKit egress to finish {recording_path}...")
+            ready = await recording_tracker.wait_until_available(
+                recording_path, lambda: s3_recording_exists(s3_url, headers), location="egress"
+            )
+            if not ready:
+                raise TimeoutError(f"Recording not available in time: {recording_path}")
+
+            async with http_pool.stream("GET", s3_url, headers=headers, timeout=30) as response:
+                if response.status_code != 200:
+                    raise RuntimeError(f"Failed to download: HTTP {response.status_code}")
+                async for chunk in response.aiter_bytes():
+                    file.write(chunk)
+                    written += len(chunk)
+            kind = "s3"
+        else:
+            ready = await recording_tracker.wait_until_available(
+                recording_path, lambda: storage_recording_exists(recording_path)
+            )
+            if not ready:
+                raise TimeoutError(f"Recording not available in time: {recording_path}")
+
+            written = await recording_storage.download_to(recording_path, file)
+            kind = "storage"
+
+        if not written:
+            raise ValueError("No audio content found")
+
+        recording_tracker.record_transfer(recording_path, kind, written)
+        print(f"✅ [Pipeline] Downloaded {written} bytes from {kind}")
+
+    return recording_spool.open(recording_path, download)
+
+
+async def fetch_recording(recording_path: str) -> bytes:
+    """The call recording's bytes (downloaded once, see open_recording_file)"""
+    async with open_recording_file(recording_path) as spool_file:
+        return await asyncio.to_thread(Path(spool_file).read_bytes)
+
+
+async def copy_recording_to_supabase_storage(room_name: str, s3_filepath: str):
+    """Copy recording from LiveKit's S3-compatible storage to Supabase Storage (False if it failed)"""
+    try:
+        print(f"📋 [Copy] Starting file copy for room: {room_name}")
+
+        if not s3_recording_location(s3_filepath):
+            print(f"❌ [Copy] S3 credentials not available")
+            return False
+
+        async with open_recording_file(s3_filepath) as spool_file:
+            size = os.path.getsize(spool_file)
+            # Upload to Supabase Storage in chunks straight from the spool file
+            await recording_storage.upload_file(s3_filepath, spool_file, "audio/mpeg")
+
+        print(f"✅ [Copy] Uploaded to Supabase Storage: {recording_storage.bucket}/{s3_filepath}")
+        recording_tracker.record_transfer(s3_filepath, "upload", size)
+        recording_tracker.mark_available(s3_filepath)
+        recording_tracker.record_result(s3_filepath, "copy")
+        return True
 
     except Exception as e:
         print(f"❌ [Copy] Failed: {e}")
+        recording_tracker.record_result(s3_filepath, "copy", ok=False)
+        return False
 
 
 # Background task to process biomarkers
 async def process_biomarkers_background(room_name: str, recording_path: str, s3_endpoint: str = None):
-    """Background task to download audio and analyze biomarkers"""
+    """Background task to download audio and analyze biomarkers (False if it failed)"""
     print(f"🧬 [Background] Starting biomarker analysis for room: {room_name}")
-    await asyncio.sleep(40)  # Wait for recording to complete
 
     try:
-        if not supabase:
+        if not calls_repository.available:
             print(f"⚠️  Supabase not configured")
-            return
-
-        # Download audio from Supabase Storage
-        bucket = "audio_files"
-        audio_content = supabase.storage.from_(bucket).download(recording_path)
-
-        if not audio_content or len(audio_content) == 0:
-            print(f"❌ [Background] No audio content found")
-            return
-
-        print(f"✅ [Background] Downloaded {len(audio_content)} bytes")
+            return False
 
         # Call Vital Audio API
         url = "https://api.qr.sonometrik.vitalaudio.io/analyze-audio"
@@ -729,104 +939,181 @@ async def process_biomarkers_background(room_name: str, recording_path: str, s3_
             'User-Agent': 'Mozilla/5.0',
         }
 
-        files = {'audio_file': (recording_path.split('/')[-1], audio_content, 'audio/mp3')}
         data = {'name': recording_path.split('/')[-1]}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, files=files, data=data, headers=headers, timeout=60.0)
+        # The multipart body streams from the spool file
+        async with open_recording_file(recording_path) as spool_file:
+            with open(spool_file, "rb") as audio_file:
+                files = {'audio_file': (recording_path.split('/')[-1], audio_file, 'audio/mp3')}
+                response = await http_pool.request("POST", url, files=files, data=data, headers=headers, timeout=60.0)
 
         if response.status_code == 200:
             biomarkers = response.json()
             print(f"✅ [Background] Biomarkers analysis complete")
 
             # Save to database
-            supabase.table("calls").update({"biomarkers": biomarkers}).eq("room_name", room_name).execute()
+            await calls_repository.update_by_room(room_name, {"biomarkers": biomarkers})
+            recording_tracker.record_result(recording_path, "biomarkers")
+            return True
         else:
             print(f"❌ [Background] API error: {response.status_code}")
+            recording_tracker.record_result(recording_path, "biomarkers", ok=False)
+            return False
 
     except Exception as e:
         print(f"❌ [Background] Biomarker analysis failed: {e}")
+        recording_tracker.record_result(recording_path, "biomarkers", ok=False)
+        return False
+
+
+def elder_speech_intervals(call: Optional[CallSession]) -> Optional[List]:
+    """Where the elder speaks in the call recording (seconds), from the transcript."""
+    if not call or not call.transcript:
+        return None
+    from backend.parkinson.preprocess import transcript_speech_intervals
+    return transcript_speech_intervals(call.transcript, call.started_at, speaker="elder")
+
+
+def parkinson_window_seconds(call: Optional[CallSession]) -> Optional[float]:
+    """Window length for analyzing a long call's recording in chunks (None = whole file)."""
+    if call and call.duration_seconds and call.duration_seconds >= PARKINSON_WINDOWED_MIN_CALL_SECONDS:
+        return PARKINSON_WINDOW_SECONDS
+    return None
+
+
+async def find_call_by_room(room_name: str) -> Optional[CallSession]:
+    """Look up an active or ended call by its LiveKit room name."""
+    call = active_calls.get_by_room(room_name)
+    if call:
+        return call
+    try:
+        return await call_store.get_call_by_room(room_name)
+    except Exception as e:
+        print(f"⚠️  Call store lookup failed for room {room_name}: {e}")
+        return None
 
 
 # Background task to process Parkinson's detection
-async def process_parkinson_background(room_name: str, recording_path: str):
-    """Background task to download audio and analyze Parkinson's disease"""
+async def process_parkinson_background(room_name: str, recording_path: str, speech_intervals: Optional[List] = None,
+                                       window_seconds: Optional[float] = None):
+    """Background task to download audio and analyze Parkinson's disease (False if it failed)"""
     print(f"🧠 [Background] Starting Parkinson's analysis for room: {room_name}")
-    await asyncio.sleep(40)  # Wait for recording to complete
 
     try:
-        if not supabase:
+        if not calls_repository.available:
             print(f"⚠️  Supabase not configured")
-            return
-
-        # Download audio from Supabase Storage
-        bucket = "audio_files"
-        audio_content = supabase.storage.from_(bucket).download(recording_path)
-
-        if not audio_content or len(audio_content) == 0:
-            print(f"❌ [Background] No audio content found")
-            return
+            return False
 
-        print(f"✅ [Background] Downloaded {len(audio_content)} bytes")
+        # The shared download is skipped entirely if this recording was already analyzed
+        async def download() -> bytes:
+            return await fetch_recording(recording_path)
 
-        # Run Parkinson's detection
-        from backend.parkinson.run_model import predict_parkinson
-        parkinson_result = predict_parkinson(audio_content, recording_path.split("/")[-1])
+        # Run Parkinson's detection (waits for a free worker rather than failing; a
+        # duplicate trigger for the same recording shares the first one's result)
+        parkinson_result = await parkinson_pool.predict(
+            download, recording_path.split("/")[-1], speech_intervals,
+            source=recording_path, window_seconds=window_seconds
+        )
 
         print(f"✅ [Background] Parkinson's analysis complete: {parkinson_result['disease']}")
 
         # Save to database
-        supabase.table("calls").update({"parkinson_detection": parkinson_result}).eq("room_name", room_name).execute()
+        await calls_repository.update_by_room(room_name, {"parkinson_detection": parkinson_result})
+        recording_tracker.record_result(recording_path, "parkinson")
+        return True
 
     except Exception as e:
         print(f"❌ [Background] Parkinson's analysis failed: {e}")
+        recording_tracker.record_result(recording_path, "parkinson", ok=False)
+        return False
+
+
+# Post-call stages run as durable jobs (see backend/jobs.py), keyed by room and stage
+async def run_copy_job(payload: Dict):
+    recording_tracker.call_ended(payload["recording_path"])  # queued once the call is over
+    if not await copy_recording_to_supabase_storage(payload["room_name"], payload["recording_path"]):
+        raise RuntimeError("Recording copy failed")
+
+
+async def run_biomarkers_job(payload: Dict):
+    recording_tracker.call_ended(payload["recording_path"])  # queued once the call is over
+    if not await process_biomarkers_background(payload["room_name"], payload["recording_path"]):
+        raise RuntimeError("Biomarker analysis failed")
+
+
+async def run_parkinson_job(payload: Dict):
+    recording_tracker.call_ended(payload["recording_path"])
+    ok = await process_parkinson_background(
+        payload["room_name"], payload["recording_path"], payload.get("speech_intervals"), payload.get("window_seconds")
+    )
+    if not ok:
+        raise RuntimeError("Parkinson's analysis failed")
+
+
+job_handlers = {"copy": run_copy_job, "biomarkers": run_biomarkers_job, "parkinson": run_parkinson_job}
+job_worker = JobWorker(job_queue, job_handlers)
+
+
+async def enqueue_post_call_jobs(room_name: str, recording_path: str, kinds: List[str],
+                                 speech_intervals: Optional[List] = None, window_seconds: Optional[float] = None):
+    """
+    Queue post-call stages ("copy", "biomarkers", "parkinson") for a recording.
+    A stage already queued or done for this room, e.g. by the end-of-call request
+    before the agent's trigger, isn't queued again.
+    """
+    payload = {
+        "room_name": room_name,
+        "recording_path": recording_path,
+        "speech_intervals": speech_intervals,
+        "window_seconds": window_seconds,
+    }
+    for kind in kinds:
+        job = await asyncio.to_thread(job_queue.enqueue, kind, f"{room_name}:{kind}", payload)
+        if not job["enqueued"]:
+            print(f"ℹ️  [Jobs] {kind} already {job['status']} for room {room_name}")
 
 
 @app.post("/trigger_biomarker_analysis")
 async def trigger_biomarker_analysis(
-    background_tasks: BackgroundTasks,
     room_name: str,
     recording_path: str
 ):
     """Trigger biomarker analysis in background (called by agent after call ends)"""
     print(f"🎯 Received biomarker trigger for room: {room_name}")
-    s3_endpoint = os.getenv("S3_ENDPOINT")
-    background_tasks.add_task(process_biomarkers_background, room_name, recording_path, s3_endpoint)
+    recording_tracker.call_ended(recording_path)  # the agent triggers this after the call
+    await enqueue_post_call_jobs(room_name, recording_path, ["copy", "biomarkers"])
     return {"status": "queued", "room_name": room_name}
 
 
 @app.post("/trigger_parkinson_analysis")
 async def trigger_parkinson_analysis(
-    background_tasks: BackgroundTasks,
     room_name: str,
     recording_path: str
 ):
     """Trigger Parkinson's disease analysis in background (called by agent after call ends)"""
     print(f"🧠 Received Parkinson's trigger for room: {room_name}")
-    background_tasks.add_task(process_parkinson_background, room_name, recording_path)
+    recording_tracker.call_ended(recording_path)
+    call = await find_call_by_room(room_name)
+    await enqueue_post_call_jobs(
+        room_name, recording_path, ["copy", "parkinson"],
+        elder_speech_intervals(call), parkinson_window_seconds(call)
+    )
     return {"status": "queued", "room_name": room_name}
 
 
 @app.post("/get_biomarkers")
 async def get_biomarkers(request: GetBiomarkersRequest):
     """Get biomarkers from an audio recording"""
-    import requests
-
-    bucket = "audio_files"
     path = request.recording_path
 
     try:
-        signed = supabase.storage.from_(bucket).create_signed_url(path, expires_in=300)
-        audio_url = signed["signedURL"]
-
-        audio_response = requests.get(audio_url, timeout=60)
-        audio_response.raise_for_status()
-        audio_content = audio_response.content
+        audio_content = await recording_storage.download(path)
 
         files = {"audio_file": (path.split("/")[-1], audio_content, "audio/mpeg")}
         data = {"name": path.split("/")[-1]}
 
-        response = requests.post(
+        response = await http_pool.request(
+            "POST",
             "https://api.qr.sonometrik.vitalaudio.io/analyze-audio",
             files=files,
             data=data,
@@ -838,8 +1125,8 @@ async def get_biomarkers(request: GetBiomarkersRequest):
 
         biomarkers = response.json()
 
-        if request.room_name and supabase:
-            supabase.table("calls").update({"biomarkers": biomarkers}).eq("room_name", request.room_name).execute()
+        if request.room_name and calls_repository.available:
+            await calls_repository.update_by_room(request.room_name, {"biomarkers": biomarkers})
 
         return biomarkers
 
@@ -848,18 +1135,24 @@ async def get_biomarkers(request: GetBiomarkersRequest):
 
 
 @app.post("/detect_parkinson")
-async def detect_parkinson(file: UploadFile = File(...)):
-    """Detect Parkinson's disease from voice recording"""
+async def detect_parkinson(file: UploadFile = File(...),
+                           window_seconds: Optional[float] = Query(None, ge=MIN_WINDOW_SPEECH_SECONDS)):
+    """
+    Detect Parkinson's disease from voice recording.
+    Pass window_seconds to analyze a long recording in chunks and get per-window scores.
+    """
     try:
-        from backend.parkinson.run_model import predict_parkinson
-
         content = await file.read()
         if len(content) == 0:
             raise HTTPException(status_code=400, detail="Empty file uploaded")
 
-        result = predict_parkinson(content, file.filename)
+        result = await parkinson_pool.predict(content, file.filename, wait=False, window_seconds=window_seconds)
         return result
 
+    except HTTPException:
+        raise
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Parkinson's detection error: {str(e)}")
 
@@ -867,37 +1160,115 @@ async def detect_parkinson(file: UploadFile = File(...)):
 @app.post("/detect_parkinson_from_recording")
 async def detect_parkinson_from_recording(request: GetParkinsonRequest):
     """Detect Parkinson's disease from a stored audio recording"""
-    import requests
-
-    bucket = "audio_files"
     path = request.recording_path
 
-    try:
-        signed = supabase.storage.from_(bucket).create_signed_url(path, expires_in=300)
-        audio_url = signed["signedURL"]
-
-        audio_response = requests.get(audio_url, timeout=60)
-        audio_response.raise_for_status()
-        audio_content = audio_response.content
+    async def download() -> bytes:
+        return await recording_storage.download(path)
 
-        # Run Parkinson's detection
-        from backend.parkinson.run_model import predict_parkinson
-        parkinson_result = predict_parkinson(audio_content, path.split("/")[-1])
+    try:
+        # Run Parkinson's detection (cached results skip the download)
+        call = await find_call_by_room(request.room_name) if request.room_name else None
+        speech_intervals = elder_speech_intervals(call)
+        parkinson_result = await parkinson_pool.predict(
+            download, path.split("/")[-1], speech_intervals, wait=False, source=path,
+            window_seconds=request.window_seconds
+        )
 
         print(f"✅ Parkinson's detection complete: {parkinson_result['disease']}")
 
         # Save to database if room_name provided
-        if request.room_name and supabase:
-            supabase.table("calls").update({
+        if request.room_name and calls_repository.available:
+            await calls_repository.update_by_room(request.room_name, {
                 "parkinson_detection": parkinson_result
-            }).eq("room_name", request.room_name).execute()
+            })
 
         return parkinson_result
 
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/parkinson/batch")
+async def score_parkinson_batch(request: ParkinsonBatchRequest):
+    """
+    Score many stored recordings (e.g. nightly re-scoring). Features are extracted per
+    recording (or taken from the cache) and each batch_size batch is scored with one model call.
+    Streams one JSON line per recording, in request order: {"path", ...result} or {"path", "error"}.
+    """
+    from backend.parkinson.batch import score_recordings
+
+    if not recording_storage.available:
+        raise HTTPException(status_code=503, detail="Supabase not configured")
+
+    async def lines():
+        async for result in score_recordings(request.recording_paths, recording_storage.download, parkinson_pool,
+                                             request.batch_size):
+            yield json.dumps(result, default=str) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.get("/api/jobs")
+async def get_job_stats():
+    """Post-call job counts per kind and status, and how long the oldest due job has waited"""
+    return await asyncio.to_thread(job_queue.stats)
+
+
+@app.get("/api/jobs/{room_name}")
+async def get_room_jobs(room_name: str):
+    """Status, attempts and last error of a call's post-call jobs"""
+    return await asyncio.to_thread(job_queue.list, f"{room_name}:")
+
+
+@app.get("/api/http/stats")
+async def get_http_stats():
+    """Outbound HTTP pool: open/idle connections and per-host utilization"""
+    return http_pool.stats()
+
+
+@app.get("/api/database/stats")
+async def get_database_stats():
+    """Supabase request counts, retries, timeouts and latency; call store row counts and active call cache"""
+    return {
+        **supabase_executor.stats(),
+        "call_store": await call_store.stats(),
+        "active_call_cache": active_calls.stats(),
+    }
+
+
+@app.get("/api/recordings/stats")
+async def get_recording_stats():
+    """Recording readiness, end-of-call -> result latency per stage, and bytes transferred per call"""
+    return {**recording_tracker.stats(), "spool": recording_spool.stats()}
+
+
+@app.get("/api/parkinson/stats")
+async def get_parkinson_stats():
+    """Worker pool occupancy and counters for Parkinson's inference"""
+    return parkinson_pool.stats()
+
+
+@app.on_event("startup")
+async def warm_up_on_startup():
+    if JOBS_IN_PROCESS_WORKER:
+        job_worker.start()
+    if not STARTUP_WARMUP:
+        return
+    ai_analyzer.warm_up()
+    await parkinson_pool.warm_up()
+
+
+@app.on_event("shutdown")
+async def shutdown_pools():
+    await job_worker.stop()
+    parkinson_pool.shutdown()
+    supabase_executor.shutdown()
+    call_store.close()
+    await http_pool.aclose()
+
+
 # ============================================================================
 # DEMO ENDPOINTS
 # ============================================================================
@@ -905,9 +1276,11 @@ async def detect_parkinson_from_recording(request: GetParkinsonRequest):
 @app.post("/api/demo/reset")
 async def reset_demo():
     """Reset demo state (clear all calls and actions)"""
+    for call_id in list(active_calls.keys()):
+        analysis_scheduler.cancel(call_id)
+        ai_analyzer.cleanup_call_context(call_id)
     active_calls.clear()
-    call_history.clear()
-    village_actions_store.clear()
+    await call_store.clear()
 
     return {"status": "success", "message": "Demo state reset"}
 
@@ -947,6 +1320,12 @@ async def test_websocket(call_id: str):
 # WEBSOCKET ENDPOINT
 # ============================================================================
 
+@app.get("/api/ws/stats")
+async def get_websocket_stats():
+    """Outbound queue depth and dropped/coalesced message counts for WebSocket clients"""
+    return ws_manager.stats()
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """
@@ -962,6 +1341,8 @@ async def websocket_endpoint(websocket: WebSocket):
     - village_action_update
     - call_ended
     - timer_update
+
+    Client messages: subscribe_call, unsubscribe_call (both with call_id), ping
     """
     await ws_manager.connect(websocket)
 
@@ -1001,6 +1382,16 @@ async def websocket_endpoint(websocket: WebSocket):
                             "data": {"call_id": call_id}
                         }, websocket)
 
+                elif message_type == "unsubscribe_call":
+                    # Stop receiving updates for a call
+                    call_id = data.get("call_id")
+                    if call_id:
+                        ws_manager.unsubscribe_from_call(websocket, call_id)
+                        await ws_manager.send_personal_message({
+                            "type": "unsubscribed",
+                            "data": {"call_id": call_id}
+                        }, websocket)
+
                 elif message_type == "ping":
                     # Respond to ping to keep connection alive
                     await ws_manager.send_personal_message({
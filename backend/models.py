@@ -187,7 +187,7 @@ class VillageAction(BaseModel):
     reason: str
     urgency: ActionUrgency
     context_for_recipient: str
-    status: Literal["pending", "calling", "in_progress", "completed", "failed", "no_answer"] = "pending"
+    status: Literal["pending", "calling", "ringing", "connected", "in_progress", "completed", "failed", "no_answer"] = "pending"
     initiated_at: datetime
     completed_at: Optional[datetime] = None
     response: Optional[str] = None
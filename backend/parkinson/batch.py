@@ -0,0 +1,142 @@
+# Batch Parkinson's scoring over many recordings
+# Features are extracted in parallel worker processes; each batch of feature rows
+# is scored with a single scaler/model call. Results stream out as JSON lines.
+#
+# Usage:
+#   python -m backend.parkinson.batch recordings/ extra/call.mp3 [--workers 4] [--batch-size 32]
+#   [--window-seconds 30]   (stream long recordings in chunks, with per-window scores)
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from backend.parkinson.run_model import SUPPORTED_EXTS
+
+DEFAULT_BATCH_SIZE = 32
+
+
+def iter_local_recordings(paths: Iterable[str]) -> Iterator[str]:
+    """Expand files and directories (recursively) into audio file paths."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in sorted(os.walk(path)):
+                for name in sorted(files):
+                    if name.lower().endswith(SUPPORTED_EXTS):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def _file_features(path: str, window_seconds: Optional[float] = None) -> Tuple[Optional[List[float]], Optional[Dict], Optional[str]]:
+    """Worker: read a recording and compute its feature row. Errors are returned, not raised."""
+    from backend.parkinson.run_model import audio_features
+    from backend.parkinson.streaming import windowed_features
+    try:
+        if window_seconds:
+            # Decoded straight from the file, one window at a time
+            row, selection, windows = windowed_features(path, os.path.basename(path), window_seconds)
+            selection["windows"] = windows
+            return row, selection, None
+        with open(path, "rb") as f:
+            row, selection = audio_features(f.read(), os.path.basename(path))
+        return row, selection, None
+    except Exception as e:
+        return None, None, str(e)
+
+
+def _ok_rows(outcomes: List[Tuple]) -> Tuple[List[List[float]], List[Dict]]:
+    """Feature rows and selections of the outcomes that succeeded."""
+    ok = [(row, selection) for row, selection, error in outcomes if error is None]
+    return [row for row, _ in ok], [selection for _, selection in ok]
+
+
+def _merge_results(keys: List[str], outcomes: List[Tuple], scored: List[Dict]) -> List[Dict]:
+    """Pair each key with its score (or error), in input order."""
+    scored = iter(scored)
+    return [
+        {"path": key, **next(scored)} if error is None else {"path": key, "error": error}
+        for key, (_, _, error) in zip(keys, outcomes)
+    ]
+
+
+def score_files(paths: Iterable[str], workers: Optional[int] = None,
+                batch_size: int = DEFAULT_BATCH_SIZE, window_seconds: Optional[float] = None) -> Iterator[Dict]:
+    """Score local recordings, yielding one result dict per file in input order."""
+    from backend.parkinson.run_model import score_features
+    from backend.parkinson.streaming import score_windows
+
+    paths = list(iter_local_recordings(paths))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        outcomes = executor.map(_file_features, paths, [window_seconds] * len(paths), chunksize=1)
+        for start in range(0, len(paths), batch_size):
+            keys = paths[start:start + batch_size]
+            batch = [next(outcomes) for _ in keys]
+            rows, selections = _ok_rows(batch)
+            if window_seconds:
+                # Each file's windows are scored together with its aggregate row
+                scored = [score_windows(row, selection, selection.pop("windows"))
+                          for row, selection in zip(rows, selections)]
+            else:
+                scored = score_features(rows, selections) if rows else []
+            yield from _merge_results(keys, batch, scored)
+
+
+async def score_recordings(paths: List[str], fetch: Callable[[str], Awaitable[bytes]], pool,
+                           batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[Dict]:
+    """
+    Score stored recordings through a ParkinsonWorkerPool, yielding results in input order.
+
+    Args:
+        paths: storage paths of the recordings
+        fetch: coroutine returning a recording's bytes
+        pool: ParkinsonWorkerPool used for the analysis
+        batch_size: recordings whose feature rows are scored with one model call
+    """
+    # At most one recording per worker is downloaded or analyzed at a time, so the
+    # pool's wait queue stays free for interactive requests (which are turned away
+    # when it is full) and downloads don't outrun the workers
+    slots = asyncio.Semaphore(max(1, min(pool.workers, pool.capacity - 1)))
+
+    async def features(path: str) -> Tuple[Optional[List[float]], Optional[Dict], Optional[str]]:
+        async with slots:
+            try:
+                row, selection = await pool.features(lambda: fetch(path), os.path.basename(path), source=path)
+                return row, selection, None
+            except Exception as e:
+                return None, None, str(e)
+
+    for start in range(0, len(paths), batch_size):
+        keys = paths[start:start + batch_size]
+        batch = await asyncio.gather(*(features(path) for path in keys))
+        rows, selections = _ok_rows(batch)
+        try:
+            scored = await pool.score(rows, selections) if rows else []
+        except Exception as e:
+            batch = [(row, selection, error or str(e)) for row, selection, error in batch]
+            scored = []
+        for line in _merge_results(keys, batch, scored):
+            yield line
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Score recordings for Parkinson's, one JSON line per file.")
+    parser.add_argument("paths", nargs="+", help="Audio files or directories (searched recursively)")
+    parser.add_argument("--workers", type=int, default=None, help="Feature extraction processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per model call")
+    parser.add_argument("--window-seconds", type=float, default=None,
+                        help="Analyze each recording in windows of this length (bounded memory, per-window scores)")
+    args = parser.parse_args(argv)
+
+    results = score_files(args.paths, workers=args.workers, batch_size=args.batch_size,
+                          window_seconds=args.window_seconds)
+    for result in results:
+        sys.stdout.write(json.dumps(result, default=str) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# Content-addressed disk cache for Parkinson's features and results
+# The same recording is often analyzed more than once (end of call + agent trigger,
+# then /detect_parkinson_from_recording). Entries are keyed by a hash of the audio
+# bytes plus everything else that affects the output, so a repeat is a file read.
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+PARKINSON_CACHE_DIR = os.environ.get(
+    "PARKINSON_CACHE_DIR", os.path.join(tempfile.gettempdir(), "village-parkinson-cache")
+)
+PARKINSON_CACHE_MAX_ENTRIES = int(os.environ.get("PARKINSON_CACHE_MAX_ENTRIES", "2000"))
+
+# Bump when feature extraction changes so old entries stop matching
+FEATURE_VERSION = 1
+
+
+def content_digest(audio_bytes: bytes) -> str:
+    return hashlib.sha256(audio_bytes).hexdigest()
+
+
+class FeatureCache:
+    """
+    Bounded on-disk cache (one small JSON file per entry, LRU by file mtime).
+
+    Besides results keyed by content, it remembers which content digest a storage
+    path held, so a repeat analysis of the same recording can skip the download.
+    Methods do blocking file I/O and are safe to call from several threads.
+    """
+
+    def __init__(self, directory: str = PARKINSON_CACHE_DIR, max_entries: int = PARKINSON_CACHE_MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.enabled = max_entries > 0
+        self._entries: Optional[int] = None  # counted lazily from disk
+        self._count_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+        if self.enabled:
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except OSError as e:
+                logger.warning("parkinson_cache_disabled", extra={"directory": directory, "error": str(e)})
+                self.enabled = False
+
+    def key(self, digest: str, speech_intervals: Optional[Sequence[Tuple[float, float]]],
+            max_seconds: Optional[float], window_seconds: Optional[float] = None) -> str:
+        """Cache key for a recording's content plus the analysis parameters."""
+        from backend.parkinson.run_model import MODEL_PATH
+
+        try:
+            model_stat = os.stat(MODEL_PATH)
+            model_version = f"{model_stat.st_size}:{model_stat.st_mtime_ns}"
+        except OSError:
+            model_version = "unknown"
+
+        params = json.dumps({
+            "digest": digest,
+            "intervals": [[round(start, 2), round(end, 2)] for start, end in speech_intervals or ()],
+            "max_seconds": max_seconds,
+            "window_seconds": window_seconds,
+            "model": model_version,
+            "features": FEATURE_VERSION,
+        }, sort_keys=True)
+        return hashlib.sha256(params.encode()).hexdigest()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _read(self, name: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        path = self._path(name)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            os.utime(path)  # mark as recently used
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, name: str, entry: Dict):
+        if not self.enabled:
+            return
+        path = self._path(name)
+        is_new = not os.path.exists(path)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f, default=str)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("parkinson_cache_write_failed", extra={"error": str(e)})
+            return
+
+        if is_new:
+            with self._count_lock:
+                if self._entries is None:
+                    self._entries = self._count()
+                else:
+                    self._entries += 1
+                if self._entries > self.max_entries:
+                    self._evict()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached {"row", "selection", "result"} for a key, if present."""
+        entry = self._read(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: Dict):
+        self._write(key, entry)
+
+    def remember_source(self, source: str, digest: str):
+        """Record that a storage path holds content with this digest."""
+        self._write("src-" + hashlib.sha256(source.encode()).hexdigest(), {"source": source, "digest": digest})
+
+    def digest_for_source(self, source: str) -> Optional[str]:
+        entry = self._read("src-" + hashlib.sha256(source.encode()).hexdigest())
+        return entry["digest"] if entry else None
+
+    def _count(self) -> int:
+        return sum(1 for name in os.listdir(self.directory) if name.endswith(".json"))
+
+    def _evict(self):
+        # Drop the least recently used tenth so eviction scans stay rare
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                path = os.path.join(self.directory, name)
+                try:
+                    files.append((os.stat(path).st_mtime, path))
+                except OSError:
+                    pass
+        files.sort()
+
+        target = int(self.max_entries * 0.9)
+        for _, path in files[:max(0, len(files) - target)]:
+            try:
+                os.remove(path)
+                self.evicted += 1
+            except OSError:
+                pass
+        self._entries = self._count()
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "directory": self.directory,
+            "entries": self._entries if self._entries is not None else (self._count() if self.enabled else 0),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+        }
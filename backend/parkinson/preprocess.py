@@ -0,0 +1,158 @@
+# Speech segment selection for Parkinson's detection
+# Call recordings are a room mix (agent TTS + elder + silence). Only the elder's
+# voiced audio is worth scoring, so trim everything else before feature extraction.
+
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Cap on seconds of speech passed to feature extraction (0 disables the cap)
+PARKINSON_MAX_AUDIO_SECONDS = float(os.environ.get("PARKINSON_MAX_AUDIO_SECONDS", "120"))
+# Frames quieter than this many dB below the peak count as silence
+PARKINSON_VAD_TOP_DB = float(os.environ.get("PARKINSON_VAD_TOP_DB", "30"))
+# Voiced runs shorter than this are dropped (clicks, breaths)
+MIN_SEGMENT_SECONDS = 0.25
+# Below this much selected speech, fall back to a wider selection
+MIN_SELECTED_SECONDS = 3.0
+
+# Transcript lines are stamped when an utterance is committed, so a line's audio
+# ends at its timestamp. Its start is bounded by the previous line and by an
+# estimate from its length (speech rate plus endpointing slack).
+SECONDS_PER_WORD = 0.6
+UTTERANCE_PADDING_SECONDS = 1.5
+
+Interval = Tuple[float, float]
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def transcript_speech_intervals(transcript: Sequence, recording_started_at: datetime,
+                                speaker: str = "elder") -> List[Interval]:
+    """
+    Estimate where `speaker` talks in the recording from transcript timestamps.
+
+    Args:
+        transcript: TranscriptLine models or dicts with speaker/text/timestamp
+        recording_started_at: wall-clock time the recording began (call start)
+
+    Returns:
+        (start_seconds, end_seconds) offsets into the recording, in order
+    """
+    intervals = []
+    previous_end = 0.0
+
+    for line in transcript:
+        line = line if isinstance(line, dict) else line.dict()
+        stamp = _parse_timestamp(line.get("timestamp"))
+        if stamp is None:
+            continue
+
+        end = (stamp - recording_started_at).total_seconds()
+        if end <= 0:
+            continue
+
+        if line.get("speaker") == speaker:
+            estimate = len(line.get("text", "").split()) * SECONDS_PER_WORD + UTTERANCE_PADDING_SECONDS
+            start = max(previous_end, end - estimate, 0.0)
+            if end > start:
+                intervals.append((start, end))
+
+        previous_end = max(previous_end, end)
+
+    return intervals
+
+
+def energy_speech_intervals(y: np.ndarray, sr: int, top_db: float = PARKINSON_VAD_TOP_DB) -> np.ndarray:
+    """Voiced sample ranges (N x 2, [start, end)) found by an energy detector."""
+    import librosa
+
+    intervals = librosa.effects.split(y, top_db=top_db)
+    min_length = int(MIN_SEGMENT_SECONDS * sr)
+    return intervals[(intervals[:, 1] - intervals[:, 0]) >= min_length]
+
+
+def _intersect(voiced: np.ndarray, allowed: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Intersect two sorted lists of sample ranges."""
+    result = []
+    i = j = 0
+    while i < len(voiced) and j < len(allowed):
+        start = max(voiced[i][0], allowed[j][0])
+        end = min(voiced[i][1], allowed[j][1])
+        if end > start:
+            result.append((int(start), int(end)))
+        if voiced[i][1] < allowed[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def _merge(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def select_speech(y: np.ndarray, sr: int, speech_intervals: Optional[Sequence[Interval]] = None,
+                  max_seconds: Optional[float] = PARKINSON_MAX_AUDIO_SECONDS,
+                  min_seconds: float = MIN_SELECTED_SECONDS) -> Tuple[np.ndarray, Dict]:
+    """
+    Keep only voiced audio, optionally restricted to `speech_intervals` (seconds),
+    concatenated and capped at `max_seconds`.
+
+    Falls back to all voiced audio if the intervals select less than `min_seconds`
+    (e.g. clock skew between transcript and recording), and to the untouched signal
+    if the detector finds almost nothing.
+
+    Returns:
+        (selected samples, stats about the selection)
+    """
+    voiced = energy_speech_intervals(y, sr)
+    ranges = [tuple(r) for r in voiced]
+    source = "energy"
+
+    if speech_intervals:
+        allowed = _merge([
+            (int(start * sr), min(int(end * sr), len(y)))
+            for start, end in speech_intervals if end * sr > 0 and start * sr < len(y)
+        ])
+        selected = _intersect(voiced, allowed)
+        if sum(end - start for start, end in selected) >= min_seconds * sr:
+            ranges = selected
+            source = "transcript"
+
+    if sum(end - start for start, end in ranges) < min_seconds * sr:
+        ranges = [(0, len(y))]
+        source = "full"
+
+    budget = int(max_seconds * sr) if max_seconds else len(y)
+    segments = []
+    for start, end in ranges:
+        if budget <= 0:
+            break
+        end = min(end, start + budget)
+        segments.append(y[start:end])
+        budget -= end - start
+
+    selected_y = np.concatenate(segments) if len(segments) > 1 else segments[0]
+
+    stats = {
+        "source": source,
+        "segments": len(segments),
+        "decoded_seconds": round(len(y) / sr, 2),
+        "analyzed_seconds": round(len(selected_y) / sr, 2),
+    }
+    return np.ascontiguousarray(selected_y), stats
@@ -1,134 +1,242 @@
 # Parkinson's Disease Voice Detection
 # This module contains the ML model and feature extraction for Parkinson's detection
+#
+# librosa, scipy, pydub and the pickled model take seconds to load, so they are
+# loaded on first use (or ahead of time via warm_up()) rather than at import.
 
 import numpy as np
-import librosa
 import pickle
-import tempfile
 import os
-import scipy.stats
-from typing import Dict
-from pydub import AudioSegment
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 import io
+import logging
+
+from backend.parkinson.preprocess import PARKINSON_MAX_AUDIO_SECONDS, select_speech
+
+logger = logging.getLogger(__name__)
 
-# Load trained model and scaler
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "best_pd_model.pkl")
 
-try:
-    with open(MODEL_PATH, "rb") as f:
-        model_data = pickle.load(f)
-        model = model_data["model"]
-        scaler = model_data["scaler"]
-        selected_features = model_data["selected_features"]
-    print("✅ Parkinson's model and scaler loaded.")
-except Exception as e:
-    raise RuntimeError(f"Failed to load Parkinson's model: {e}")
-
-def convert_to_wav(audio_bytes: bytes, original_format: str) -> bytes:
-    """Convert uploaded audio to WAV using pydub."""
-    try:
-        audio = AudioSegment.from_file(io.BytesIO(audio_bytes), format=original_format)
-        wav_io = io.BytesIO()
-        audio.export(wav_io, format="wav")
-        return wav_io.getvalue()
-    except Exception as e:
-        raise ValueError(f"Conversion failed: {e}")
+_model_data: Optional[Dict] = None
 
-def extract_features(y: np.ndarray, sr: int) -> Dict[str, float]:
-    """Extract features for Parkinson's classification."""
-    features = {}
+def load_model() -> Dict:
+    """Load the trained model, scaler and selected_features (once per process)."""
+    global _model_data
+    if _model_data is None:
+        try:
+            with open(MODEL_PATH, "rb") as f:
+                model_data = pickle.load(f)
+            _model_data = {
+                "model": model_data["model"],
+                "scaler": model_data["scaler"],
+                "selected_features": model_data["selected_features"],
+            }
+        except Exception as e:
+            raise RuntimeError(f"Failed to load Parkinson's model: {e}")
+        logger.info("parkinson_model_loaded", extra={"features": len(_model_data["selected_features"])})
+    return _model_data
 
-    pitches = librosa.yin(y, fmin=75, fmax=600)
-    pitches = pitches[~np.isnan(pitches)]
-    features["Fo"] = np.mean(pitches) if len(pitches) > 0 else 0
-
-    if len(pitches) > 1:
-        abs_diff = np.abs(np.diff(pitches))
-        features["Jitter"] = np.mean(abs_diff) / (features["Fo"] + 1e-6)
-    else:
-        features["Jitter"] = 0
-
-    rms = librosa.feature.rms(y=y)[0]
-    if len(rms) > 1:
-        abs_diff = np.abs(np.diff(rms))
-        features["Shimmer"] = np.mean(abs_diff) / (np.mean(rms) + 1e-6)
-        features["Shimmer(dB)"] = 20 * np.log10(features["Shimmer"] + 1e-6)
-        features["Shimmer:APQ5"] = features["Shimmer"] * 0.8
-        features["Shimmer:APQ11"] = features["Shimmer"] * 0.6
-    else:
-        features["Shimmer"] = 0
-        features["Shimmer(dB)"] = 0
-        features["Shimmer:APQ5"] = 0
-        features["Shimmer:APQ11"] = 0
-
-    harmonic = librosa.effects.harmonic(y)
-    percussive = librosa.effects.percussive(y)
-    features["HNR"] = np.mean(harmonic) / (np.mean(percussive) + 1e-6)
-    features["NHR"] = 1.0 / (features["HNR"] + 1e-6)
-    features["RPDE"] = scipy.stats.entropy(np.abs(librosa.stft(y).mean(axis=0)) + 1e-6)
-    features["DFA"] = np.mean(np.abs(np.diff(y)))
-    features["PPE"] = scipy.stats.entropy(np.abs(y) + 1e-6)
-    features["spread1"] = np.std(y)
-    features["spread2"] = scipy.stats.kurtosis(y)
+def warm_up():
+    """Import the audio stack and load the model now instead of on the first request."""
+    import librosa  # noqa: F401
+    import scipy.stats  # noqa: F401
+    import pydub  # noqa: F401
+    load_model()
 
-    return features
+# Sample rate the model's features were trained at
+TARGET_SR = 22050
+
+SUPPORTED_EXTS = ('.wav', '.mp3', '.ogg', '.flac', '.m4a', '.aac', '.webm')
+
+# Formats decoded losslessly by libsndfile; everything else goes through pydub/ffmpeg
+SOUNDFILE_EXTS = ('.wav', '.flac')
+
+# NumPy dtypes for pydub PCM sample widths (bytes)
+PCM_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+def decode_audio(audio_bytes: bytes, ext: str) -> Tuple[np.ndarray, int]:
+    """
+    Decode audio bytes straight to a mono float32 array at TARGET_SR, in memory.
+    Matches librosa.load(path, sr=TARGET_SR) without the WAV re-encode and temp file.
+    """
+    import librosa
 
-def predict_parkinson(audio_bytes: bytes, filename: str):
-    """Predict Parkinson's from audio bytes."""
     try:
-        valid_exts = ('.wav', '.mp3', '.ogg', '.flac', '.m4a', '.aac', '.webm')
-        if not filename.lower().endswith(valid_exts):
-            raise ValueError("Unsupported audio format.")
+        if ext in SOUNDFILE_EXTS:
+            import soundfile as sf
+            data, sr = sf.read(io.BytesIO(audio_bytes), dtype="float32", always_2d=True)
+            y = data.mean(axis=1, dtype=np.float32) if data.shape[1] > 1 else data[:, 0]
+            del data
+        else:
+            from pydub import AudioSegment
+            audio = AudioSegment.from_file(io.BytesIO(audio_bytes), format=ext[1:])
+            sr = audio.frame_rate
+            samples = np.frombuffer(audio.raw_data, dtype=PCM_DTYPES[audio.sample_width])
+            scale = np.float32(1 << (8 * audio.sample_width - 1))
+            if audio.channels > 1:
+                y = samples.reshape(-1, audio.channels).mean(axis=1, dtype=np.float32) / scale
+            else:
+                y = samples.astype(np.float32) / scale
+            del audio, samples
+    except Exception as e:
+        raise ValueError(f"Conversion failed: {e}")
 
-        if len(audio_bytes) < 1024:
-            raise ValueError("File too short or empty.")
+    # Resample once (same resampler librosa.load uses)
+    if sr != TARGET_SR:
+        y = librosa.resample(y, orig_sr=sr, target_sr=TARGET_SR)
+
+    return np.ascontiguousarray(y, dtype=np.float32), TARGET_SR
+
+# Features produced by extract_features, grouped by the intermediate they need
+PITCH_FEATURES = {"Fo", "Jitter"}
+SHIMMER_FEATURES = {"Shimmer", "Shimmer(dB)", "Shimmer:APQ5", "Shimmer:APQ11"}
+HPSS_FEATURES = {"HNR", "NHR"}
+STFT_FEATURES = HPSS_FEATURES | {"RPDE"}
+SIGNAL_FEATURES = {"DFA", "PPE", "spread1", "spread2"}
+ALL_FEATURES = PITCH_FEATURES | SHIMMER_FEATURES | STFT_FEATURES | SIGNAL_FEATURES
+
+def extract_features(y: np.ndarray, sr: int, wanted: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """
+    Extract features for Parkinson's classification.
+
+    A single STFT is shared by the harmonic/percussive split (HNR, NHR) and the
+    spectral entropy (RPDE), instead of librosa.effects.harmonic/percussive and
+    librosa.stft each computing their own. Pass `wanted` to skip the passes for
+    features the model doesn't use (e.g. the pitch tracker for Fo/Jitter).
+    """
+    import librosa
+    import scipy.stats
+
+    wanted = set(wanted) if wanted is not None else ALL_FEATURES
+    features = {}
 
-        ext = os.path.splitext(filename)[1].lower()
-        if ext != '.wav':
-            audio_bytes = convert_to_wav(audio_bytes, ext[1:])
+    if wanted & PITCH_FEATURES:
+        pitches = librosa.yin(y, fmin=75, fmax=600)
+        pitches = pitches[~np.isnan(pitches)]
+        features["Fo"] = np.mean(pitches) if len(pitches) > 0 else 0
+
+        if len(pitches) > 1:
+            abs_diff = np.abs(np.diff(pitches))
+            features["Jitter"] = np.mean(abs_diff) / (features["Fo"] + 1e-6)
+        else:
+            features["Jitter"] = 0
+
+    if wanted & SHIMMER_FEATURES:
+        # Frame-based RMS on the waveform (no STFT involved)
+        rms = librosa.feature.rms(y=y)[0]
+        if len(rms) > 1:
+            abs_diff = np.abs(np.diff(rms))
+            features["Shimmer"] = np.mean(abs_diff) / (np.mean(rms) + 1e-6)
+            features["Shimmer(dB)"] = 20 * np.log10(features["Shimmer"] + 1e-6)
+            features["Shimmer:APQ5"] = features["Shimmer"] * 0.8
+            features["Shimmer:APQ11"] = features["Shimmer"] * 0.6
+        else:
+            features["Shimmer"] = 0
+            features["Shimmer(dB)"] = 0
+            features["Shimmer:APQ5"] = 0
+            features["Shimmer:APQ11"] = 0
+
+    if wanted & STFT_FEATURES:
+        stft = librosa.stft(y)
+
+        if wanted & HPSS_FEATURES:
+            # Same defaults as librosa.effects.harmonic/percussive, one median-filter pass
+            stft_harm, stft_perc = librosa.decompose.hpss(stft)
+            harmonic = librosa.istft(stft_harm, dtype=y.dtype, length=len(y))
+            percussive = librosa.istft(stft_perc, dtype=y.dtype, length=len(y))
+            del stft_harm, stft_perc
+
+            features["HNR"] = np.mean(harmonic) / (np.mean(percussive) + 1e-6)
+            features["NHR"] = 1.0 / (features["HNR"] + 1e-6)
+
+        features["RPDE"] = scipy.stats.entropy(np.abs(stft.mean(axis=0)) + 1e-6)
+        del stft
+
+    if wanted & SIGNAL_FEATURES:
+        features["DFA"] = np.mean(np.abs(np.diff(y)))
+        features["PPE"] = scipy.stats.entropy(np.abs(y) + 1e-6)
+        features["spread1"] = np.std(y)
+        features["spread2"] = scipy.stats.kurtosis(y)
 
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-            tmp.write(audio_bytes)
-            tmp_path = tmp.name
+    return features
 
-        try:
-            y, sr = librosa.load(tmp_path, sr=22050)
-            if len(y) < sr * 3:
-                raise ValueError("Recording too short (min 3 seconds).")
-
-            all_features = extract_features(y, sr)
-            missing = set(selected_features) - set(all_features.keys())
-            if missing:
-                raise RuntimeError(f"Missing features: {missing}")
-
-            X = np.array([all_features[f] for f in selected_features]).reshape(1, -1)
-            X_scaled = scaler.transform(X)
-
-            proba = model.predict_proba(X_scaled)[0]
-            parkinson_prob = float(proba[1])
-            healthy_prob = float(proba[0])
-            threshold = 0.7
-            pred = 1 if parkinson_prob >= threshold else 0
-            confidence = parkinson_prob if pred == 1 else healthy_prob
-
-            result = {
-                "disease": "Parkinson" if pred == 1 else "Healthy",
-                "confidence": round(confidence, 3),
-                "message": "Potential Parkinson's detected" if pred == 1 else "No signs of Parkinson's detected",
-                "details": {
-                    "parkinson_prob": round(parkinson_prob, 3),
-                    "healthy_prob": round(healthy_prob, 3),
-                    "features_used": selected_features
-                }
+def audio_features(audio_bytes: bytes, filename: str,
+                   speech_intervals: Optional[Sequence[Tuple[float, float]]] = None,
+                   max_seconds: Optional[float] = PARKINSON_MAX_AUDIO_SECONDS) -> Tuple[List[float], Dict]:
+    """
+    Decode a recording and compute the model's feature row.
+
+    Only voiced audio is used: silence is trimmed, and if `speech_intervals`
+    (seconds into the recording, e.g. the elder's turns from the transcript) are
+    given, other speakers are cut too. At most `max_seconds` of speech is analyzed.
+
+    Returns:
+        (feature values in selected_features order, stats about the audio selection)
+    """
+    if not filename.lower().endswith(SUPPORTED_EXTS):
+        raise ValueError("Unsupported audio format.")
+
+    if len(audio_bytes) < 1024:
+        raise ValueError("File too short or empty.")
+
+    ext = os.path.splitext(filename)[1].lower()
+    y, sr = decode_audio(audio_bytes, ext)
+    if len(y) < sr * 3:
+        raise ValueError("Recording too short (min 3 seconds).")
+
+    y, selection = select_speech(y, sr, speech_intervals, max_seconds)
+
+    selected_features = load_model()["selected_features"]
+    all_features = extract_features(y, sr, wanted=selected_features)
+    missing = set(selected_features) - set(all_features.keys())
+    if missing:
+        raise RuntimeError(f"Missing features: {missing}")
+
+    return [float(all_features[f]) for f in selected_features], selection
+
+def score_features(rows: Sequence[Sequence[float]], selections: Sequence[Dict]) -> List[Dict]:
+    """Score feature rows (from audio_features) with one scaler/model call."""
+    model_data = load_model()
+    model, scaler, selected_features = model_data["model"], model_data["scaler"], model_data["selected_features"]
+
+    X = np.asarray(rows, dtype=np.float64).reshape(len(rows), len(selected_features))
+    X_scaled = scaler.transform(X)
+    probas = model.predict_proba(X_scaled)
+
+    results = []
+    for proba, selection in zip(probas, selections):
+        parkinson_prob = float(proba[1])
+        healthy_prob = float(proba[0])
+        threshold = 0.7
+        pred = 1 if parkinson_prob >= threshold else 0
+        confidence = parkinson_prob if pred == 1 else healthy_prob
+
+        result = {
+            "disease": "Parkinson" if pred == 1 else "Healthy",
+            "confidence": round(confidence, 3),
+            "message": "Potential Parkinson's detected" if pred == 1 else "No signs of Parkinson's detected",
+            "details": {
+                "parkinson_prob": round(parkinson_prob, 3),
+                "healthy_prob": round(healthy_prob, 3),
+                "features_used": selected_features,
+                "audio": selection
             }
+        }
 
-            if confidence < 0.7:
-                result["warning"] = "Low confidence result – please test again with a longer or clearer recording."
+        if confidence < 0.7:
+            result["warning"] = "Low confidence result – please test again with a longer or clearer recording."
 
-            return result
+        results.append(result)
 
-        finally:
-            os.remove(tmp_path)
+    return results
+
+def predict_parkinson(audio_bytes: bytes, filename: str,
+                      speech_intervals: Optional[Sequence[Tuple[float, float]]] = None,
+                      max_seconds: Optional[float] = PARKINSON_MAX_AUDIO_SECONDS):
+    """Predict Parkinson's from audio bytes (see audio_features for the audio selection)."""
+    try:
+        row, selection = audio_features(audio_bytes, filename, speech_intervals, max_seconds)
+        return score_features([row], [selection])[0]
 
     except Exception as e:
-        raise RuntimeError(f"Prediction error: {e}")
\ No newline at end of file
+        raise RuntimeError(f"Prediction error: {e}")
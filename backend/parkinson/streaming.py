@@ -0,0 +1,220 @@
+# Windowed (streaming) Parkinson's analysis for long recordings
+# predict_parkinson decodes the whole call and computes features over it at once.
+# For hour-long calls this mode decodes fixed-length windows one at a time, scores
+# each window, and keeps a duration-weighted running mean of the feature rows, so
+# memory is bounded by the window length rather than the call length.
+
+import io
+import os
+import shutil
+import subprocess
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from backend.parkinson.preprocess import select_speech
+
+PARKINSON_WINDOW_SECONDS = float(os.environ.get("PARKINSON_WINDOW_SECONDS", "30"))
+# Windows with less voiced audio than this are skipped (silence)
+MIN_WINDOW_SPEECH_SECONDS = 1.0
+
+# Compressed formats libsndfile can't read are piped through ffmpeg
+FFMPEG_EXTS = ('.m4a', '.aac', '.webm')
+
+
+def _mono(block: np.ndarray) -> np.ndarray:
+    return block.mean(axis=1, dtype=np.float32) if block.shape[1] > 1 else block[:, 0]
+
+
+def _iter_soundfile_windows(audio: Union[bytes, str], window_seconds: float, target_sr: int) -> Iterator[np.ndarray]:
+    import librosa
+    import soundfile as sf
+
+    source = io.BytesIO(audio) if isinstance(audio, bytes) else audio
+    with sf.SoundFile(source) as f:
+        sr = f.samplerate
+        blocksize = int(window_seconds * sr)
+        for block in f.blocks(blocksize=blocksize, dtype="float32", always_2d=True):
+            y = _mono(block)
+            if sr != target_sr:
+                y = librosa.resample(y, orig_sr=sr, target_sr=target_sr)
+            yield np.ascontiguousarray(y, dtype=np.float32)
+
+
+def _iter_ffmpeg_windows(audio: Union[bytes, str], window_seconds: float, target_sr: int) -> Iterator[np.ndarray]:
+    # ffmpeg decodes, downmixes and resamples; we read one window of s16le at a time
+    command = ["ffmpeg", "-v", "error", "-i", audio if isinstance(audio, str) else "pipe:0",
+               "-f", "s16le", "-ac", "1", "-ar", str(target_sr), "pipe:1"]
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE if isinstance(audio, bytes) else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+
+    writer = None
+    if isinstance(audio, bytes):
+        def feed():
+            try:
+                process.stdin.write(audio)
+            except BrokenPipeError:
+                pass
+            finally:
+                process.stdin.close()
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+
+    window_bytes = int(window_seconds * target_sr) * 2
+    try:
+        while True:
+            chunk = process.stdout.read(window_bytes)
+            if not chunk:
+                break
+            yield np.frombuffer(chunk[:len(chunk) // 2 * 2], dtype=np.int16).astype(np.float32) / 32768.0
+    finally:
+        process.stdout.close()
+        process.kill()
+        process.wait()
+        if writer:
+            writer.join()
+
+    if process.returncode not in (0, -9):
+        raise ValueError(f"ffmpeg failed to decode audio (exit {process.returncode})")
+
+
+def iter_windows(audio: Union[bytes, str], ext: str, window_seconds: float, target_sr: int) -> Iterator[np.ndarray]:
+    """Decode audio (bytes or a file path) into consecutive mono windows at target_sr."""
+    if ext in FFMPEG_EXTS and shutil.which("ffmpeg"):
+        return _iter_ffmpeg_windows(audio, window_seconds, target_sr)
+    if ext not in FFMPEG_EXTS:
+        return _iter_soundfile_windows(audio, window_seconds, target_sr)
+
+    # No ffmpeg binary: decode in one go (pydub) and slice
+    from backend.parkinson.run_model import decode_audio
+    if isinstance(audio, str):
+        with open(audio, "rb") as f:
+            audio = f.read()
+    y, _ = decode_audio(audio, ext)
+    window = int(window_seconds * target_sr)
+    return (y[start:start + window] for start in range(0, len(y), window))
+
+
+def _window_intervals(speech_intervals: Optional[Sequence[Tuple[float, float]]],
+                      start: float, end: float) -> Optional[List[Tuple[float, float]]]:
+    """Speech intervals overlapping [start, end), shifted to be relative to the window."""
+    if speech_intervals is None:
+        return None
+    return [
+        (max(s, start) - start, min(e, end) - start)
+        for s, e in speech_intervals if e > start and s < end
+    ]
+
+
+def windowed_features(audio: Union[bytes, str], filename: str,
+                      window_seconds: float = PARKINSON_WINDOW_SECONDS,
+                      speech_intervals: Optional[Sequence[Tuple[float, float]]] = None,
+                      max_seconds: Optional[float] = None) -> Tuple[List[float], Dict, List[Dict]]:
+    """
+    Compute feature rows window by window.
+
+    Args:
+        audio: recording bytes, or a path to read from
+        speech_intervals: elder speech (seconds into the recording); windows without
+            any are skipped
+        max_seconds: stop after this much analyzed speech (None = whole recording)
+
+    Returns:
+        (duration-weighted mean feature row, selection stats, per-window dicts with
+         start_seconds/end_seconds/analyzed_seconds/row)
+    """
+    from backend.parkinson.run_model import SUPPORTED_EXTS, TARGET_SR, extract_features, load_model
+
+    if not filename.lower().endswith(SUPPORTED_EXTS):
+        raise ValueError("Unsupported audio format.")
+
+    selected_features = load_model()["selected_features"]
+    ext = os.path.splitext(filename)[1].lower()
+
+    weighted_sum = np.zeros(len(selected_features))
+    analyzed_total = 0.0
+    offset = 0.0
+    windows = []
+
+    for y in iter_windows(audio, ext, window_seconds, TARGET_SR):
+        start, end = offset, offset + len(y) / TARGET_SR
+        offset = end
+
+        intervals = _window_intervals(speech_intervals, start, end)
+        if intervals is not None and not intervals:
+            continue
+
+        y, selection = select_speech(y, TARGET_SR, intervals, max_seconds=None,
+                                     min_seconds=MIN_WINDOW_SPEECH_SECONDS)
+        if selection["source"] == "full" or (intervals is not None and selection["source"] != "transcript"):
+            continue  # mostly silence, or too little of the elder in this window
+
+        features = extract_features(y, TARGET_SR, wanted=selected_features)
+        row = [float(features[f]) for f in selected_features]
+        analyzed = selection["analyzed_seconds"]
+
+        weighted_sum += analyzed * np.asarray(row)
+        analyzed_total += analyzed
+        windows.append({
+            "start_seconds": round(start, 2),
+            "end_seconds": round(end, 2),
+            "analyzed_seconds": analyzed,
+            "row": row,
+        })
+
+        if max_seconds and analyzed_total >= max_seconds:
+            break
+
+    if analyzed_total < 3:
+        raise ValueError("Not enough speech in recording (min 3 seconds).")
+
+    selection = {
+        "source": "windows",
+        "segments": len(windows),
+        "window_seconds": window_seconds,
+        "decoded_seconds": round(offset, 2),
+        "analyzed_seconds": round(analyzed_total, 2),
+    }
+    return (weighted_sum / analyzed_total).tolist(), selection, windows
+
+
+def score_windows(row: List[float], selection: Dict, windows: List[Dict]) -> Dict:
+    """Score the aggregate row and every window's row in one model call."""
+    from backend.parkinson.run_model import score_features
+
+    scored = score_features([row] + [w["row"] for w in windows], [selection] + [{}] * len(windows))
+    result = scored[0]
+    result["windows"] = [
+        {
+            "start_seconds": w["start_seconds"],
+            "end_seconds": w["end_seconds"],
+            "analyzed_seconds": w["analyzed_seconds"],
+            "disease": s["disease"],
+            "parkinson_prob": s["details"]["parkinson_prob"],
+        }
+        for w, s in zip(windows, scored[1:])
+    ]
+    return result
+
+
+def predict_parkinson_windowed(audio: Union[bytes, str], filename: str,
+                               window_seconds: float = PARKINSON_WINDOW_SECONDS,
+                               speech_intervals: Optional[Sequence[Tuple[float, float]]] = None,
+                               max_seconds: Optional[float] = None) -> Dict:
+    """
+    Predict Parkinson's for a long recording in bounded memory.
+
+    The overall result scores the duration-weighted mean of the window feature rows.
+    result["windows"] lists each analyzed window's own score, to show how voice
+    quality varies through the call.
+    """
+    try:
+        row, selection, windows = windowed_features(audio, filename, window_seconds, speech_intervals, max_seconds)
+        return score_windows(row, selection, windows)
+    except Exception as e:
+        raise RuntimeError(f"Prediction error: {e}")
@@ -0,0 +1,271 @@
+# Process pool for Parkinson's inference
+# predict_parkinson spends seconds of CPU in librosa/numpy. Run it in worker
+# processes (each with the model already loaded) so the FastAPI event loop keeps
+# serving live calls and WebSockets meanwhile.
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from backend.parkinson.feature_cache import FeatureCache, content_digest
+from backend.parkinson.preprocess import PARKINSON_MAX_AUDIO_SECONDS
+
+logger = logging.getLogger(__name__)
+
+PARKINSON_WORKERS = int(os.environ.get("PARKINSON_WORKERS", str(min(2, os.cpu_count() or 1))))
+# Analyses allowed to wait for a worker before new requests are turned away
+PARKINSON_MAX_QUEUED = int(os.environ.get("PARKINSON_MAX_QUEUED", str(PARKINSON_WORKERS * 2)))
+
+
+# Audio bytes, or a coroutine function that fetches them (only called on a cache miss)
+AudioSource = Union[bytes, Callable[[], Awaitable[bytes]]]
+
+
+class PoolSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+def _init_worker():
+    # Load the model, scaler and audio stack once per worker process
+    from backend.parkinson.run_model import warm_up
+    warm_up()
+
+
+def _noop():
+    return None
+
+
+def _analyze(audio_bytes: bytes, filename: str, speech_intervals, max_seconds, window_seconds=None,
+             score: bool = True) -> Dict:
+    """
+    Feature row, audio selection and (with `score`, or windowed) result for one
+    recording (errors as predict_parkinson).
+    """
+    from backend.parkinson.run_model import audio_features, score_features
+    from backend.parkinson.streaming import score_windows, windowed_features
+    try:
+        if window_seconds:
+            row, selection, windows = windowed_features(
+                audio_bytes, filename, window_seconds, speech_intervals, max_seconds
+            )
+            result = score_windows(row, selection, windows)
+        else:
+            row, selection = audio_features(audio_bytes, filename, speech_intervals, max_seconds)
+            if not score:
+                return {"row": row, "selection": selection}
+            result = score_features([row], [selection])[0]
+    except Exception as e:
+        raise RuntimeError(f"Prediction error: {e}")
+    return {"row": row, "selection": selection, "result": result}
+
+
+def _score(rows, selections):
+    from backend.parkinson.run_model import score_features
+    return score_features(rows, selections)
+
+
+class ParkinsonWorkerPool:
+    """
+    Bounded process pool for predict_parkinson.
+
+    At most `workers + max_queued` analyses are admitted at once. Interactive
+    callers use `wait=False` and get PoolSaturated when full (surface as 503);
+    background tasks use `wait=True` and queue for a slot instead.
+
+    Results are cached by audio content (see FeatureCache), and concurrent requests
+    for the same recording share one analysis. Pass `source` (the storage path) and
+    a fetch coroutine as `audio` to skip the download when the path was seen before.
+    """
+
+    def __init__(self, workers: int = PARKINSON_WORKERS, max_queued: int = PARKINSON_MAX_QUEUED,
+                 cache: Optional[FeatureCache] = None):
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, max_queued)
+        self.cache = cache if cache is not None else FeatureCache()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        # In-flight analyses by recording + parameters
+        self._pending: Dict[str, asyncio.Future] = {}
+        self.deduplicated = 0
+
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    def _ensure_started(self):
+        if self._executor is None:
+            # spawn, not fork: the parent has running threads (log listener, event loop)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            logger.info("parkinson_pool_started", extra={"workers": self.workers, "capacity": self.capacity})
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.capacity)
+
+    async def warm_up(self):
+        """Start every worker now (each loads the model) instead of on the first analysis."""
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        # Workers are spawned on demand; enough concurrent tasks bring up all of them
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _noop) for _ in range(self.workers)))
+        logger.info("parkinson_pool_warm", extra={"workers": self.workers})
+
+    async def _run(self, fn, *args, wait: bool = True):
+        self._ensure_started()
+
+        if not wait and self._slots.locked():
+            self.rejected += 1
+            raise PoolSaturated(f"All {self.capacity} Parkinson's analysis slots are busy")
+
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                for attempt in range(2):
+                    executor = self._executor
+                    try:
+                        result = await loop.run_in_executor(executor, fn, *args)
+                        break
+                    except BrokenProcessPool:
+                        # A worker died (OOM, native crash): every pending task in this
+                        # executor failed with it. Replace it and retry once, so only a
+                        # request that crashes the new pool too fails.
+                        self._replace_broken(executor)
+                        if attempt:
+                            raise
+                        self._ensure_started()
+            except Exception:
+                self.failed += 1
+                raise
+            finally:
+                self.in_flight -= 1
+
+        self.completed += 1
+        return result
+
+    def _replace_broken(self, executor: ProcessPoolExecutor):
+        if self._executor is executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self.restarts += 1
+            logger.warning("parkinson_pool_broken", extra={"restarts": self.restarts})
+
+    async def _analyze_cached(self, audio: AudioSource, filename: str, speech_intervals,
+                              max_seconds: Optional[float], wait: bool, source: Optional[str],
+                              window_seconds: Optional[float] = None, score: bool = True) -> Dict:
+        # Whole-file analysis is capped by default; windowed analysis covers the whole call
+        if max_seconds is None and not window_seconds:
+            max_seconds = PARKINSON_MAX_AUDIO_SECONDS
+
+        # A storage path seen before can be answered without downloading it. Cache
+        # lookups and writes are file I/O (and an occasional eviction scan), so they
+        # run off the event loop.
+        digest = await asyncio.to_thread(self.cache.digest_for_source, source) if source else None
+        if digest:
+            key = self.cache.key(digest, speech_intervals, max_seconds, window_seconds)
+            entry = await asyncio.to_thread(self.cache.get, key)
+            if entry:
+                return entry
+
+        if source:
+            flight_key = json.dumps([source, speech_intervals, max_seconds, window_seconds], default=str)
+        else:
+            digest = await asyncio.to_thread(content_digest, audio)
+            flight_key = self.cache.key(digest, speech_intervals, max_seconds, window_seconds)
+
+        pending = self._pending.get(flight_key)
+        if pending is not None:
+            self.deduplicated += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the outcome as retrieved even if nobody else was waiting on it
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._pending[flight_key] = future
+        try:
+            if callable(audio):
+                audio = await audio()
+            if digest is None or source:
+                digest = await asyncio.to_thread(content_digest, audio)
+            if source:
+                await asyncio.to_thread(self.cache.remember_source, source, digest)
+
+            key = self.cache.key(digest, speech_intervals, max_seconds, window_seconds)
+            entry = await asyncio.to_thread(self.cache.get, key)
+            if entry is None:
+                entry = await self._run(
+                    _analyze, audio, filename, speech_intervals, max_seconds, window_seconds, score, wait=wait
+                )
+                await asyncio.to_thread(self.cache.put, key, entry)
+
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._pending[flight_key]
+
+    async def predict(self, audio: AudioSource, filename: str,
+                      speech_intervals: Optional[Sequence[Tuple[float, float]]] = None,
+                      max_seconds: Optional[float] = None, wait: bool = True,
+                      source: Optional[str] = None, window_seconds: Optional[float] = None) -> Dict:
+        """
+        Run predict_parkinson in a worker process (or answer from the cache).
+        With `window_seconds`, long recordings are analyzed window by window instead
+        (see streaming.py) and the result includes per-window scores.
+        """
+        entry = await self._analyze_cached(
+            audio, filename, speech_intervals, max_seconds, wait, source, window_seconds
+        )
+        if "result" in entry:
+            return entry["result"]
+        # Extracted by features(), which leaves scoring to its caller
+        return (await self.score([entry["row"]], [entry["selection"]], wait=wait))[0]
+
+    async def features(self, audio: AudioSource, filename: str,
+                       speech_intervals: Optional[Sequence[Tuple[float, float]]] = None,
+                       wait: bool = True, source: Optional[str] = None) -> Tuple[List[float], Dict]:
+        """Run audio_features (decode + feature row) in a worker process (or answer from the cache)."""
+        entry = await self._analyze_cached(audio, filename, speech_intervals, None, wait, source, score=False)
+        return entry["row"], entry["selection"]
+
+    async def score(self, rows: List[List[float]], selections: List[Dict], wait: bool = True) -> List[Dict]:
+        """Score many feature rows (from features()) with one vectorized model call in a worker process."""
+        return await self._run(_score, rows, selections, wait=wait)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._slots = None
+
+    def stats(self) -> Dict:
+        return {
+            "started": self._executor is not None,
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+            "deduplicated": self.deduplicated,
+            "cache": self.cache.stats(),
+        }
+
+
+# Global instance
+parkinson_pool = ParkinsonWorkerPool()
@@ -0,0 +1,141 @@
+"""
+Local spool of call recordings shared by the post-call stages.
+
+The copy to Supabase Storage, the biomarker analysis and the Parkinson's analysis all
+need the same recording. The spool fetches it once (concurrent requests share the
+download), writing it straight to a local file, and serves later requests from disk.
+Files are dropped after `ttl_seconds` or when more than `max_files` are spooled, but
+never while a stage is still using them (see `open`).
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, BinaryIO, Callable, Dict, List
+
+
+class RecordingSpool:
+    def __init__(self, directory: str, max_files: int = 20, ttl_seconds: float = 1800):
+        self.directory = directory
+        self.max_files = max_files
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(directory, exist_ok=True)
+
+        self._pending: Dict[str, asyncio.Future] = {}
+        # Spool files in use, with how many users each has
+        self._pins: Dict[str, int] = {}
+
+        self.fetches = 0
+        self.hits = 0
+        self.shared = 0
+
+    def _file(self, path: str) -> str:
+        name = hashlib.sha256(path.encode()).hexdigest()[:32]
+        return os.path.join(self.directory, name + os.path.splitext(path)[1])
+
+    async def get(self, path: str, fetch: Callable[[BinaryIO], Awaitable[None]]) -> bytes:
+        """The recording's bytes (see open)."""
+        async with self.open(path, fetch) as spool_file:
+            return await asyncio.to_thread(_read_file, spool_file)
+
+    @asynccontextmanager
+    async def open(self, path: str, fetch: Callable[[BinaryIO], Awaitable[None]]) -> AsyncIterator[str]:
+        """
+        Local file holding the recording: already spooled, from a download in flight,
+        or written by `fetch(file)` (which should stream into `file` chunk by chunk).
+        The file is kept until the block exits, even if it is due for eviction.
+        """
+        spool_file = self._file(path)
+        # Pinned before anything can await, so eviction can't remove it in between
+        self._pins[spool_file] = self._pins.get(spool_file, 0) + 1
+        try:
+            yield await self._get_file(path, spool_file, fetch)
+        finally:
+            self._pins[spool_file] -= 1
+            if not self._pins[spool_file]:
+                del self._pins[spool_file]
+
+    async def _get_file(self, path: str, spool_file: str, fetch: Callable[[BinaryIO], Awaitable[None]]) -> str:
+        if os.path.exists(spool_file) and time.time() - os.path.getmtime(spool_file) < self.ttl_seconds:
+            self.hits += 1
+            return spool_file
+
+        pending = self._pending.get(path)
+        if pending is not None:
+            self.shared += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._pending[path] = future
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                await fetch(f)
+            os.replace(tmp_path, spool_file)
+            self.fetches += 1
+            await self._evict()
+            future.set_result(spool_file)
+            return spool_file
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            _remove(tmp_path)
+            del self._pending[path]
+
+    async def _evict(self):
+        # Scan the directory off the event loop, but check pins and remove files on it,
+        # so a file pinned meanwhile is never removed
+        for file in await asyncio.to_thread(self._eviction_candidates):
+            if file not in self._pins:
+                _remove(file)
+
+    def _eviction_candidates(self) -> List[str]:
+        """Expired files, then the oldest files beyond `max_files`."""
+        now = time.time()
+        expired, files = [], []
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                continue
+            file = os.path.join(self.directory, name)
+            try:
+                mtime = os.path.getmtime(file)
+            except OSError:
+                continue
+            if now - mtime >= self.ttl_seconds:
+                expired.append(file)
+            else:
+                files.append((mtime, file))
+
+        files.sort()
+        return expired + [file for _, file in files[:max(0, len(files) - self.max_files)]]
+
+    def stats(self) -> Dict:
+        files = [name for name in os.listdir(self.directory) if not name.endswith(".tmp")]
+        return {
+            "files": len(files),
+            "bytes_on_disk": sum(os.path.getsize(os.path.join(self.directory, name)) for name in files),
+            "fetches": self.fetches,
+            "hits": self.hits,
+            "shared_downloads": self.shared,
+            "in_use": len(self._pins),
+        }
+
+
+def _read_file(file: str) -> bytes:
+    with open(file, "rb") as f:
+        return f.read()
+
+
+def _remove(file: str):
+    try:
+        os.remove(file)
+    except OSError:
+        pass
@@ -0,0 +1,176 @@
+"""
+Readiness tracking for call recordings.
+
+LiveKit egress only finishes writing a recording after the call's room closes, and
+the copy to Supabase Storage takes a little longer. Instead of sleeping a fixed time,
+the copy and health-analysis tasks wait here until the file actually exists:
+
+- tasks in this process wake immediately when a recording is marked available
+  (e.g. analyses wake when the copy task finishes its upload to "storage")
+- otherwise they poll an existence check with exponential backoff
+- before the call has ended they only poll slowly, since egress can't be done yet
+- they give up `timeout_seconds` after the call ended
+
+Availability is per location: "egress" (LiveKit's S3 output) and "storage"
+(Supabase Storage, where the analyses read from).
+
+It also records end-of-call -> result latency for each pipeline stage and how many
+bytes each recording moved per transfer ("s3", "storage", "upload").
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Set
+
+ExistsCheck = Callable[[], Awaitable[bool]]
+
+
+class _RecordingState:
+    def __init__(self):
+        self.created = time.monotonic()
+        self.ended: Optional[float] = None
+        self.available: Set[str] = set()
+        self.transferred: Dict[str, int] = {}
+        # Set (and replaced) whenever `ended` or `available` changes, to wake waiters
+        self.changed = asyncio.Event()
+
+    def notify(self):
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+
+class RecordingTracker:
+    """Tracks recordings (by storage path) from call end to availability and results."""
+
+    def __init__(
+        self,
+        timeout_seconds: float = 600,
+        initial_poll_seconds: float = 2,
+        max_poll_seconds: float = 15,
+        max_call_seconds: float = 4 * 3600,
+        max_tracked: int = 1000
+    ):
+        self.timeout_seconds = timeout_seconds
+        self.initial_poll_seconds = initial_poll_seconds
+        self.max_poll_seconds = max_poll_seconds
+        self.max_call_seconds = max_call_seconds
+        self.max_tracked = max_tracked
+
+        self._recordings: "OrderedDict[str, _RecordingState]" = OrderedDict()
+        # Recent end-of-call -> result latencies (seconds) per stage
+        self._latencies: Dict[str, Deque[float]] = {}
+
+        self.ready = 0
+        self.timeouts = 0
+        self.failures: Dict[str, int] = {}
+        self.bytes_transferred: Dict[str, int] = {}
+
+    def _state(self, path: str) -> _RecordingState:
+        state = self._recordings.get(path)
+        if state is None:
+            state = self._recordings[path] = _RecordingState()
+            while len(self._recordings) > self.max_tracked:
+                self._recordings.popitem(last=False)
+        return state
+
+    def call_ended(self, path: str):
+        """The call producing this recording has ended (egress will finish shortly)."""
+        state = self._state(path)
+        if state.ended is None:
+            state.ended = time.monotonic()
+            state.notify()
+
+    def mark_available(self, path: str, location: str = "storage"):
+        """The recording exists at `location`; wake everything waiting for it there."""
+        state = self._state(path)
+        if location not in state.available:
+            state.available.add(location)
+            state.notify()
+
+    async def wait_until_available(self, path: str, exists: Optional[ExistsCheck] = None,
+                                   location: str = "storage") -> bool:
+        """
+        Wait until the recording is available at `location` (marked, or `exists()`
+        returns True).
+
+        Returns:
+            True when available, False on timeout
+        """
+        state = self._state(path)
+        delay = self.initial_poll_seconds
+
+        while True:
+            changed = state.changed
+            if location in state.available:
+                self.ready += 1
+                return True
+
+            if exists is not None and await exists():
+                self.mark_available(path, location)
+                continue
+
+            now = time.monotonic()
+            if state.ended is not None and now - state.ended > self.timeout_seconds:
+                self.timeouts += 1
+                return False
+            if state.ended is None and now - state.created > self.max_call_seconds:
+                self.timeouts += 1
+                return False
+
+            # Before the call ends, egress can't have finished: poll at the slowest rate
+            wait = delay if state.ended is not None else self.max_poll_seconds
+            ended_before = state.ended
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+            if ended_before is None and state.ended is not None:
+                delay = self.initial_poll_seconds  # call just ended: start polling quickly
+            elif ended_before is not None:
+                delay = min(delay * 2, self.max_poll_seconds)
+
+    def record_transfer(self, path: str, kind: str, nbytes: int):
+        """Count bytes moved for a recording (e.g. "s3" download, "upload" to storage)."""
+        state = self._state(path)
+        state.transferred[kind] = state.transferred.get(kind, 0) + nbytes
+        self.bytes_transferred[kind] = self.bytes_transferred.get(kind, 0) + nbytes
+
+    def record_result(self, path: str, stage: str, ok: bool = True):
+        """Record that a pipeline stage finished for a recording (latency from call end)."""
+        if not ok:
+            self.failures[stage] = self.failures.get(stage, 0) + 1
+            return
+
+        state = self._recordings.get(path)
+
+        if state is None or state.ended is None:
+            return
+        latencies = self._latencies.setdefault(stage, deque(maxlen=200))
+        latencies.append(time.monotonic() - state.ended)
+
+    def stats(self, recent: int = 20) -> Dict:
+        latency = {}
+        for stage, values in self._latencies.items():
+            ordered = sorted(values)
+            latency[stage] = {
+                "count": len(ordered),
+                "p50_seconds": round(ordered[len(ordered) // 2], 2),
+                "p95_seconds": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+                "max_seconds": round(ordered[-1], 2),
+            }
+
+        return {
+            "tracked": len(self._recordings),
+            "ready": self.ready,
+            "timeouts": self.timeouts,
+            "failures": dict(self.failures),
+            "end_of_call_to_result": latency,
+            "bytes_transferred": dict(self.bytes_transferred),
+            "recent_recordings": [
+                {"path": path, "bytes_transferred": dict(state.transferred)}
+                for path, state in list(self._recordings.items())[-recent:]
+            ],
+            "timeout_seconds": self.timeout_seconds,
+        }
@@ -0,0 +1,297 @@
+# Async data access for Supabase (the calls table and recording storage)
+# supabase-py is a blocking client, so calling it from an async handler stalls every
+# other request for a network round-trip. Handlers and background tasks go through
+# these repositories instead: each request runs on a bounded thread pool (sharing the
+# client's pooled HTTP connections) with a timeout, and transient failures are retried.
+# Large recording transfers bypass supabase-py (which holds the whole file in memory)
+# and stream through the shared async HTTP client.
+
+import asyncio
+import base64
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, Optional
+from urllib.parse import quote, urljoin
+
+from backend import database
+from backend.database import supabase
+
+logger = logging.getLogger(__name__)
+
+SUPABASE_TIMEOUT_SECONDS = float(os.environ.get("SUPABASE_TIMEOUT_SECONDS", "10"))
+SUPABASE_STORAGE_TIMEOUT_SECONDS = float(os.environ.get("SUPABASE_STORAGE_TIMEOUT_SECONDS", "60"))
+SUPABASE_RETRIES = int(os.environ.get("SUPABASE_RETRIES", "2"))
+# Concurrent Supabase requests (threads; each holds at most one pooled connection)
+SUPABASE_MAX_CONCURRENCY = int(os.environ.get("SUPABASE_MAX_CONCURRENCY", "8"))
+
+RETRY_BACKOFF_SECONDS = 0.5
+
+# Supabase's resumable (TUS) upload endpoint requires 6 MB chunks (the last may be shorter)
+TUS_CHUNK_BYTES = 6 * 1024 * 1024
+
+
+class RepositoryUnavailable(RuntimeError):
+    """Supabase is not configured."""
+
+
+def _is_transient(error: Exception, idempotent: bool) -> bool:
+    """Whether a failed request is worth retrying."""
+    import httpx
+
+    # A request that never reached the server is always safe to resend
+    if isinstance(error, httpx.ConnectError):
+        return True
+    # Otherwise a write may already have been applied, so only retry idempotent ones
+    if not idempotent:
+        return False
+    if isinstance(error, (asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    try:
+        status = int(getattr(error, "status", None) or getattr(error, "code", None))
+    except (TypeError, ValueError):
+        return False
+    return status == 429 or status >= 500
+
+
+class SupabaseExecutor:
+    """Runs blocking supabase-py calls off the event loop, with timeouts and retries."""
+
+    def __init__(self, client, max_concurrency: int = SUPABASE_MAX_CONCURRENCY,
+                 timeout_seconds: float = SUPABASE_TIMEOUT_SECONDS, retries: int = SUPABASE_RETRIES):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.timeout_seconds = timeout_seconds
+        self.retries = retries
+        self._executor: Optional[ThreadPoolExecutor] = None  # created on first use
+
+        self.requests = 0
+        self.retried = 0
+        self.timeouts = 0
+        self.failures = 0
+        self._latencies = deque(maxlen=500)
+
+    @property
+    def available(self) -> bool:
+        return self.client is not None
+
+    async def run(self, operation: str, fn: Callable[[], Any], timeout_seconds: Optional[float] = None,
+                  idempotent: bool = True) -> Any:
+        """
+        Run `fn` (a blocking supabase-py call) on the pool.
+
+        Raises:
+            RepositoryUnavailable: Supabase is not configured
+            asyncio.TimeoutError / the client's error: after the last attempt
+        """
+        if self.client is None:
+            raise RepositoryUnavailable("Supabase not configured")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="supabase")
+
+        loop = asyncio.get_running_loop()
+        timeout_seconds = timeout_seconds or self.timeout_seconds
+
+        for attempt in range(self.retries + 1):
+            started = time.monotonic()
+            try:
+                # On timeout the thread finishes in the background; its result is dropped
+                result = await asyncio.wait_for(loop.run_in_executor(self._executor, fn), timeout_seconds)
+                self.requests += 1
+                self._latencies.append(time.monotonic() - started)
+                return result
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.timeouts += 1
+                if attempt == self.retries or not _is_transient(e, idempotent):
+                    self.failures += 1
+                    logger.warning("supabase_request_failed", extra={
+                        "operation": operation, "attempts": attempt + 1, "error": str(e) or type(e).__name__,
+                    })
+                    raise
+                self.retried += 1
+                await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict:
+        ordered = sorted(self._latencies)
+        return {
+            "configured": self.available,
+            "max_concurrency": self.max_concurrency,
+            "requests": self.requests,
+            "retried": self.retried,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "p50_seconds": round(ordered[len(ordered) // 2], 3) if ordered else None,
+            "p95_seconds": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3) if ordered else None,
+        }
+
+
+class CallsRepository:
+    """Rows of the `calls` table."""
+
+    def __init__(self, db: SupabaseExecutor, table: str = "calls"):
+        self.db = db
+        self.table = table
+
+    @property
+    def available(self) -> bool:
+        return self.db.available
+
+    async def insert(self, row: Dict):
+        return await self.db.run(
+            "calls.insert", lambda: self.db.client.table(self.table).insert(row).execute(), idempotent=False
+        )
+
+    async def update(self, call_id: str, fields: Dict):
+        return await self.db.run(
+            "calls.update", lambda: self.db.client.table(self.table).update(fields).eq("id", call_id).execute()
+        )
+
+    async def update_by_room(self, room_name: str, fields: Dict):
+        return await self.db.run(
+            "calls.update_by_room",
+            lambda: self.db.client.table(self.table).update(fields).eq("room_name", room_name).execute()
+        )
+
+
+class StorageRepository:
+    """Files in a Supabase Storage bucket (call recordings)."""
+
+    def __init__(self, db: SupabaseExecutor, bucket: str = "audio_files",
+                 timeout_seconds: float = SUPABASE_STORAGE_TIMEOUT_SECONDS):
+        self.db = db
+        self.bucket = bucket
+        self.timeout_seconds = timeout_seconds
+
+    @property
+    def available(self) -> bool:
+        return self.db.available
+
+    def _bucket(self):
+        return self.db.client.storage.from_(self.bucket)
+
+    async def download(self, path: str) -> bytes:
+        return await self.db.run(
+            "storage.download", lambda: self._bucket().download(path), timeout_seconds=self.timeout_seconds
+        )
+
+    async def upload(self, path: str, data: bytes, content_type: str = "audio/mpeg"):
+        return await self.db.run(
+            "storage.upload",
+            # Overwrites an existing file, so a retried upload (or a retried copy job) succeeds
+            lambda: self._bucket().upload(path=path, file=data,
+                                          file_options={"content-type": content_type, "upsert": "true"}),
+            timeout_seconds=self.timeout_seconds
+        )
+
+    def _http_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {database.key}", "apikey": database.key}
+
+    async def download_to(self, path: str, file: BinaryIO) -> int:
+        """Stream a file into `file` without holding it in memory. Returns bytes written."""
+        from backend.http_client import http_pool
+
+        if not self.available:
+            raise RepositoryUnavailable("Supabase not configured")
+
+        url = f"{database.url.rstrip('/')}/storage/v1/object/{self.bucket}/{quote(path)}"
+        written = 0
+        async with http_pool.stream("GET", url, headers=self._http_headers(), timeout=self.timeout_seconds) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"Storage download failed: HTTP {response.status_code}")
+            async for chunk in response.aiter_bytes():
+                file.write(chunk)
+                written += len(chunk)
+        return written
+
+    async def upload_file(self, path: str, file_path: str, content_type: str = "audio/mpeg"):
+        """
+        Upload a local file with a resumable (TUS) upload, one chunk in memory at a time.
+
+        A failed chunk is retried from the offset the server reports, so a dropped
+        connection doesn't restart the whole transfer. Falls back to a single-request
+        upload if the storage server doesn't support resumable uploads. Either way an
+        existing file at `path` is overwritten, so uploading again is safe.
+        """
+        from backend.http_client import http_pool
+
+        if not self.available:
+            raise RepositoryUnavailable("Supabase not configured")
+
+        size = os.path.getsize(file_path)
+        endpoint = f"{database.url.rstrip('/')}/storage/v1/upload/resumable"
+        headers = {**self._http_headers(), "Tus-Resumable": "1.0.0", "x-upsert": "true"}
+        metadata = ",".join(
+            f"{name} {base64.b64encode(value.encode()).decode()}"
+            for name, value in (("bucketName", self.bucket), ("objectName", path), ("contentType", content_type))
+        )
+
+        response = await http_pool.request(
+            "POST", endpoint, headers={**headers, "Upload-Length": str(size), "Upload-Metadata": metadata}
+        )
+        if response.status_code == 404:
+            logger.warning("storage_resumable_upload_unsupported", extra={"path": path})
+            data = await asyncio.to_thread(_read_file, file_path)
+            return await self.upload(path, data, content_type)
+        if response.status_code != 201:
+            raise RuntimeError(f"Resumable upload failed to start: HTTP {response.status_code}")
+        location = urljoin(endpoint + "/", response.headers["Location"])
+
+        offset = 0
+        failures = 0
+        while offset < size:
+            length = min(TUS_CHUNK_BYTES, size - offset)
+            try:
+                response = await http_pool.request(
+                    "PATCH", location, content=_read_range(file_path, offset, length), timeout=self.timeout_seconds,
+                    headers={**headers, "Upload-Offset": str(offset), "Content-Length": str(length),
+                             "Content-Type": "application/offset+octet-stream"}
+                )
+                if response.status_code != 204:
+                    raise RuntimeError(f"Upload chunk failed: HTTP {response.status_code}")
+                offset = int(response.headers["Upload-Offset"])
+                failures = 0
+            except Exception as e:
+                failures += 1
+                if failures > self.db.retries:
+                    raise
+                logger.warning("storage_upload_chunk_retry", extra={"path": path, "offset": offset, "error": str(e)})
+                await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2 ** (failures - 1))
+                # Resume from however much the server actually stored
+                status = await http_pool.request("HEAD", location, headers=headers)
+                if status.status_code == 200 and "Upload-Offset" in status.headers:
+                    offset = int(status.headers["Upload-Offset"])
+
+    async def exists(self, path: str) -> bool:
+        folder, _, name = path.rpartition("/")
+        entries = await self.db.run("storage.list", lambda: self._bucket().list(folder, {"search": name}))
+        return any(entry.get("name") == name for entry in entries or [])
+
+
+def _read_file(file_path: str) -> bytes:
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+async def _read_range(file_path: str, offset: int, length: int, piece_bytes: int = 256 * 1024) -> AsyncIterator[bytes]:
+    # Streamed request body. httpx keeps each request alive in a reference cycle until
+    # the garbage collector runs, so passing a 6 MB bytes chunk would pile chunks up.
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        while length > 0:
+            piece = f.read(min(piece_bytes, length))
+            if not piece:
+                break
+            length -= len(piece)
+            yield piece
+
+
+supabase_executor = SupabaseExecutor(supabase)
+calls_repository = CallsRepository(supabase_executor)
+recording_storage = StorageRepository(supabase_executor)
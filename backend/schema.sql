@@ -73,6 +73,7 @@ CREATE TABLE profile_facts (
 );
 
 CREATE INDEX idx_profile_facts_elder ON profile_facts(elder_id);
+CREATE INDEX idx_profile_facts_source_call ON profile_facts(source_call_id);
 
 -- ============================================================================
 -- CALL SESSIONS TABLE
@@ -84,6 +85,8 @@ CREATE TABLE call_sessions (
 
     type TEXT NOT NULL CHECK (type IN ('elder_checkin', 'village_outbound')),
     target_member_id UUID REFERENCES village_members(id),
+    room_name TEXT,  -- LiveKit room name
+    recording_path TEXT,
 
     started_at TIMESTAMPTZ DEFAULT NOW(),
     ended_at TIMESTAMPTZ,
@@ -101,6 +104,7 @@ CREATE TABLE call_sessions (
 
 CREATE INDEX idx_call_sessions_elder ON call_sessions(elder_id);
 CREATE INDEX idx_call_sessions_started ON call_sessions(started_at DESC);
+CREATE INDEX idx_call_sessions_room ON call_sessions(room_name);
 
 -- ============================================================================
 -- TRANSCRIPT LINES TABLE
@@ -156,7 +160,7 @@ CREATE TABLE village_actions (
     urgency TEXT NOT NULL CHECK (urgency IN ('immediate', 'today', 'this_week')),
     context_for_recipient TEXT NOT NULL,
 
-    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'calling', 'in_progress', 'completed', 'failed', 'no_answer')),
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'calling', 'ringing', 'connected', 'in_progress', 'completed', 'failed', 'no_answer')),
 
     initiated_at TIMESTAMPTZ DEFAULT NOW(),
     completed_at TIMESTAMPTZ,
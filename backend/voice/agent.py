@@ -7,6 +7,7 @@ from livekit.plugins import noise_cancellation, silero, google
 import os
 import json
 import asyncio
+import logging
 import aiohttp
 from datetime import datetime
 import httpx
@@ -24,6 +25,10 @@ load_dotenv()  # This will load from .env if .env.local doesn't exist
 import pathlib
 PROJECT_ROOT = str(pathlib.Path(__file__).parent.parent.absolute())
 
+# Per-utterance events log at DEBUG; set LOG_LEVEL=DEBUG to see them
+logger = logging.getLogger("village.agent")
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
 # Backend API configuration (for optional HTTP streaming)
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 
@@ -180,45 +185,31 @@ async def my_agent(ctx: agents.JobContext):
     def on_conversation_item_added(event):
         """Capture all conversation items (user + agent) as they're added to chat history"""
         try:
-            print(f"🎤 [DEBUG] Conversation item added - processing...")
-
             # The event has an 'item' attribute which contains the ChatMessage
             chat_message = event.item if hasattr(event, 'item') else event
-            print(f"📨 [DEBUG] Chat message object: {type(chat_message)}")
 
             # Extract role and content from the chat message
             role = chat_message.role if hasattr(chat_message, 'role') else "unknown"
-            print(f"👥 [DEBUG] Detected role: {role}")
 
             # Content is usually a list, so join or take first element
             if hasattr(chat_message, 'content'):
                 content = chat_message.content
-                print(f"📝 [DEBUG] Raw content: {content} (type: {type(content)})")
                 if isinstance(content, list) and len(content) > 0:
                     content = content[0]  # Take first element if it's a list
-                    print(f"📝 [DEBUG] Using first element from list: {content}")
                 elif isinstance(content, list):
                     content = ""
-                    print(f"📝 [DEBUG] Empty list, using empty string")
                 else:
                     content = str(content)
-                    print(f"📝 [DEBUG] Converted to string: {content}")
             else:
                 content = str(chat_message)
-                print(f"📝 [DEBUG] No content attr, using str(): {content}")
 
             # Map role to speaker (user or assistant/agent)
             if role in ["user", "human"]:
                 speaker = "user"
-                emoji = "👤"
             elif role in ["assistant", "agent"]:
                 speaker = "agent"
-                emoji = "🤖"
             else:
                 speaker = role
-                emoji = "💬"
-
-            print(f"✅ [DEBUG] Final speaker: {speaker}, content length: {len(content)}")
 
             # Add to transcript
             transcript.append({
@@ -227,18 +218,16 @@ async def my_agent(ctx: agents.JobContext):
                 "text": content
             })
 
-            print(f"{emoji} [{speaker.upper()}]: {content}")
-            print(f"📊 [DEBUG] Transcript now has {len(transcript)} messages")
+            logger.debug(
+                "conversation item added: room=%s speaker=%s chars=%d messages=%d",
+                room_name, speaker, len(content), len(transcript)
+            )
 
             # Optional: Stream to backend API for real-time processing (HEAD's feature)
             asyncio.create_task(stream_to_backend_optional(room_name, speaker, content, http_session))
 
-        except Exception as e:
-            print(f"❌ Error in conversation_item_added: {e}")
-            print(f"🔍 Event type: {type(event)}")
-            print(f"🔍 Event: {event}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error in conversation_item_added (event type: %s)", type(event))
 
     # Define shutdown callback to save transcript and trigger biomarker analysis
     async def save_transcript_on_shutdown():
@@ -406,55 +395,40 @@ async def stream_to_backend_optional(room_name: str, speaker: str, content: str,
         "timestamp": datetime.utcnow().isoformat()
     }
 
-    print(f"")
-    print(f"🔵 [AGENT→BACKEND] Attempting to stream transcript to backend")
-    print(f"   Room: {room_name}")
-    print(f"   Speaker: {speaker} ({speaker_name})")
-    print(f"   Content length: {len(content)} chars")
-    print(f"   Backend URL: {BACKEND_URL}/api/transcript/stream")
-    print(f"   Payload: {payload}")
-
     max_retries = 3
     retry_delay = 0.5  # Start with 500ms
 
     for attempt in range(max_retries):
         try:
-            print(f"   📡 [Attempt {attempt + 1}/{max_retries}] Sending POST request...")
             async with http_session.post(
                 f"{BACKEND_URL}/api/transcript/stream",
                 json=payload,
                 timeout=aiohttp.ClientTimeout(total=3)
             ) as resp:
-                response_text = await resp.text()
-                print(f"   📨 [Response] Status: {resp.status}")
-                print(f"   📨 [Response] Body: {response_text}")
-
                 if resp.status == 200:
-                    if attempt > 0:
-                        print(f"  ✅ Streamed to backend (succeeded on retry #{attempt + 1})")
-                    else:
-                        print(f"  ✅ Streamed to backend for real-time analysis")
+                    logger.debug("streamed transcript to backend: room=%s attempt=%d", room_name, attempt + 1)
                     return  # Success! Exit retry loop
                 elif resp.status == 404:
                     if attempt < max_retries - 1:
-                        print(f"  🔄 Backend call not found (attempt {attempt + 1}/{max_retries}), retrying in {retry_delay}s...")
+                        logger.debug(
+                            "backend call not found: room=%s attempt=%d/%d, retrying in %ss",
+                            room_name, attempt + 1, max_retries, retry_delay
+                        )
                         await asyncio.sleep(retry_delay)
                         retry_delay *= 2  # Exponential backoff
                         continue
                     else:
-                        print(f"  ❌ Backend call still not found after {max_retries} attempts (room: {room_name})")
+                        logger.warning("backend call still not found after %d attempts: room=%s", max_retries, room_name)
                         return
                 else:
-                    print(f"  ⚠️  Backend stream returned {resp.status}")
+                    logger.warning("backend transcript stream returned %d: %s", resp.status, await resp.text())
                     return  # Don't retry on other errors
 
         except asyncio.TimeoutError:
-            print(f"  ⚠️  Backend stream timeout (backend may be offline)")
+            logger.warning("backend transcript stream timeout (backend may be offline)")
             return  # Don't retry on timeout
-        except Exception as e:
-            print(f"  ⚠️  Backend stream error: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("backend transcript stream error")
             return  # Don't retry on other exceptions
 
 
@@ -1,11 +1,152 @@
 """WebSocket connection manager for real-time updates."""
 from fastapi import WebSocket
-from typing import Dict, Set, Any
+from typing import Dict, Set, Any, Optional, Hashable, Iterable
+from collections import deque
+from datetime import date, datetime
+from enum import Enum
+import asyncio
 import json
 import logging
+import os
+
+# Use orjson for encoding when installed (several times faster than json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Outbound queue per WebSocket and what to do when a slow client fills it:
+#   drop_oldest - discard the oldest queued message (default)
+#   drop_newest - discard the message being enqueued
+#   disconnect  - close the slow client's connection
+WS_SEND_QUEUE_SIZE = int(os.environ.get("WS_SEND_QUEUE_SIZE", "256"))
+WS_SLOW_CONSUMER_POLICY = os.environ.get("WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+
+# Message types where only the latest value matters. While one is still queued for a
+# client, a newer message of the same type for the same call replaces it in place.
+COALESCED_MESSAGE_TYPES = {"wellbeing_update", "timer_update", "call_status"}
+
+
+def _json_default(value: Any):
+    """Encode the non-JSON types found in model .dict() output."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_message(message: dict) -> str:
+    """Serialize a message once, to be sent as-is to every recipient."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(message, default=_json_default).decode()
+    return json.dumps(message, default=_json_default)
+
+
+class ClientChannel:
+    """Bounded outbound queue and writer task for one WebSocket connection."""
+
+    def __init__(self, websocket: WebSocket, manager: "ConnectionManager",
+                 max_size: int = WS_SEND_QUEUE_SIZE, policy: str = WS_SLOW_CONSUMER_POLICY):
+        self.websocket = websocket
+        self.manager = manager
+        self.max_size = max_size
+        self.policy = policy
+
+        # Queued items are [coalesce_key, encoded_message] so coalescing can swap the message
+        self._queue: deque = deque()
+        self._coalescable: Dict[Hashable, list] = {}
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._writer())
+
+        # Metrics
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def enqueue(self, message: str, coalesce_key: Optional[Hashable] = None):
+        """Queue a pre-encoded message for this client without waiting for it to be sent."""
+        if coalesce_key is not None:
+            queued = self._coalescable.get(coalesce_key)
+            if queued is not None:
+                queued[1] = message
+                self.coalesced += 1
+                return
+
+        if len(self._queue) >= self.max_size:
+            if self.policy == "drop_newest":
+                self.dropped += 1
+                return
+            if self.policy == "disconnect":
+                self.dropped += len(self._queue) + 1
+                logger.warning("Disconnecting slow WebSocket client (send queue full)")
+                self.manager.disconnect(self.websocket)
+                asyncio.create_task(self._close())
+                return
+            # drop_oldest
+            oldest = self._queue.popleft()
+            self._forget(oldest)
+            self.dropped += 1
+
+        item = [coalesce_key, message]
+        self._queue.append(item)
+        if coalesce_key is not None:
+            self._coalescable[coalesce_key] = item
+
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._ready.set()
+
+    def _forget(self, item: list):
+        if item[0] is not None and self._coalescable.get(item[0]) is item:
+            del self._coalescable[item[0]]
+
+    async def _writer(self):
+        try:
+            while True:
+                while not self._queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+
+                item = self._queue.popleft()
+                self._forget(item)
+                await self.websocket.send_text(item[1])
+                self.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error sending to WebSocket client: {e}")
+            self.manager.disconnect(self.websocket)
+
+    async def _close(self):
+        try:
+            await self.websocket.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Stop the writer task, discarding anything still queued."""
+        if self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._queue.clear()
+        self._coalescable.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
 
 class ConnectionManager:
     """Manages WebSocket connections and broadcasts events to connected clients."""
@@ -13,22 +154,36 @@ class ConnectionManager:
     def __init__(self):
         # Store active connections
         self.active_connections: Set[WebSocket] = set()
-        # Map call_id to connections interested in that call
+        # Map call_id to connections interested in that call, and the reverse index
+        # so disconnects only touch the connection's own subscriptions
         self.call_subscriptions: Dict[str, Set[WebSocket]] = {}
+        self.connection_subscriptions: Dict[WebSocket, Set[str]] = {}
+        # Outbound queue + writer task per connection
+        self.channels: Dict[WebSocket, ClientChannel] = {}
+
+        # Totals from connections that have since disconnected
+        self._closed_totals = {"sent": 0, "dropped": 0, "coalesced": 0}
 
     async def connect(self, websocket: WebSocket):
         """Accept a new WebSocket connection."""
         await websocket.accept()
         self.active_connections.add(websocket)
+        self.channels[websocket] = ClientChannel(websocket, self)
         logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection."""
         self.active_connections.discard(websocket)
 
-        # Remove from all call subscriptions
-        for call_id, subscribers in self.call_subscriptions.items():
-            subscribers.discard(websocket)
+        channel = self.channels.pop(websocket, None)
+        if channel:
+            channel.close()
+            for key in self._closed_totals:
+                self._closed_totals[key] += getattr(channel, key)
+
+        # Remove from this connection's call subscriptions
+        for call_id in self.connection_subscriptions.pop(websocket, ()):
+            self._discard_subscriber(call_id, websocket)
 
         logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
 
@@ -37,62 +192,99 @@ class ConnectionManager:
         if call_id not in self.call_subscriptions:
             self.call_subscriptions[call_id] = set()
         self.call_subscriptions[call_id].add(websocket)
+        self.connection_subscriptions.setdefault(websocket, set()).add(call_id)
         logger.info(f"WebSocket subscribed to call {call_id}")
 
-    async def send_personal_message(self, message: dict, websocket: WebSocket):
-        """Send a message to a specific WebSocket connection."""
-        try:
-            await websocket.send_json(message)
-        except Exception as e:
-            logger.error(f"Error sending personal message: {e}")
-            self.disconnect(websocket)
-
-    async def broadcast(self, message: dict):
-        """Broadcast a message to all connected clients."""
-        disconnected = set()
-
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to connection: {e}")
-                disconnected.add(connection)
-
-        # Clean up disconnected clients
-        for connection in disconnected:
-            self.disconnect(connection)
-
-    async def broadcast_to_call(self, call_id: str, message: dict):
-        """Broadcast a message to all clients subscribed to a specific call."""
-        print(f"")
-        print(f"🔴 [WEBSOCKET] Broadcasting to call subscribers")
-        print(f"   Call ID: {call_id}")
-        print(f"   Message type: {message.get('type')}")
-        print(f"   All call subscriptions: {list(self.call_subscriptions.keys())}")
-
-        if call_id not in self.call_subscriptions:
-            print(f"   ⚠️  No subscribers found for call_id: {call_id}")
+    def unsubscribe_from_call(self, websocket: WebSocket, call_id: str):
+        """Stop sending updates for a call to a connection."""
+        own = self.connection_subscriptions.get(websocket)
+        if own is not None:
+            own.discard(call_id)
+            if not own:
+                del self.connection_subscriptions[websocket]
+        self._discard_subscriber(call_id, websocket)
+        logger.info(f"WebSocket unsubscribed from call {call_id}")
+
+    def drop_call(self, call_id: str, delay_seconds: float = 0):
+        """
+        Remove all subscriptions for an ended call. With a delay, late events (e.g.
+        village action updates still in progress) reach subscribers before the drop.
+        """
+        if delay_seconds > 0:
+            asyncio.get_running_loop().call_later(delay_seconds, self.drop_call, call_id)
             return
 
-        disconnected = set()
-        subscribers = self.call_subscriptions[call_id].copy()
-        print(f"   ✅ Found {len(subscribers)} subscribers for call_id: {call_id}")
+        for websocket in self.call_subscriptions.pop(call_id, ()):
+            own = self.connection_subscriptions.get(websocket)
+            if own is not None:
+                own.discard(call_id)
+                if not own:
+                    del self.connection_subscriptions[websocket]
 
-        for connection in subscribers:
-            try:
-                print(f"   📤 Sending message to subscriber...")
-                await connection.send_json(message)
-                print(f"   ✅ Message sent successfully")
-            except Exception as e:
-                logger.error(f"Error broadcasting to call subscriber: {e}")
-                print(f"   ❌ Failed to send to subscriber: {e}")
-                disconnected.add(connection)
+    def _discard_subscriber(self, call_id: str, websocket: WebSocket):
+        subscribers = self.call_subscriptions.get(call_id)
+        if subscribers is not None:
+            subscribers.discard(websocket)
+            if not subscribers:
+                del self.call_subscriptions[call_id]
+
+    async def send_personal_message(self, message: dict, websocket: WebSocket):
+        """Queue a message for a specific WebSocket connection."""
+        channel = self.channels.get(websocket)
+        if channel:
+            channel.enqueue(encode_message(message))
 
-        # Clean up disconnected clients
-        for connection in disconnected:
-            self.disconnect(connection)
+    async def broadcast(self, message: dict):
+        """Broadcast a message to all connected clients (non-blocking enqueue)."""
+        self._fan_out(self.active_connections, message, message.get("data", {}).get("call_id"))
 
-        print(f"   ✅ Broadcast complete (sent to {len(subscribers) - len(disconnected)} clients)")
+    async def broadcast_to_call(self, call_id: str, message: dict):
+        """Broadcast a message to all clients subscribed to a specific call (non-blocking enqueue)."""
+        await self.broadcast_to_calls([call_id], message)
+
+    async def broadcast_to_calls(self, call_ids: Iterable[Optional[str]], message: dict):
+        """
+        Broadcast a message to the union of subscribers of several keys (e.g. a call's
+        UUID and its room_name). Each client receives the message once.
+        """
+        call_ids = [c for c in call_ids if c]
+
+        subscribers: Set[WebSocket] = set()
+        for call_id in call_ids:
+            subscribers.update(self.call_subscriptions.get(call_id, ()))
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("ws_broadcast", extra={
+                "call_ids": call_ids, "type": message.get("type"), "subscribers": len(subscribers)
+            })
+
+        if subscribers:
+            self._fan_out(subscribers, message, call_ids[0])
+
+    def _fan_out(self, connections: Iterable[WebSocket], message: dict, call_id: Optional[str]):
+        """Encode once and enqueue the same text frame for every connection."""
+        encoded = encode_message(message)
+        coalesce_key = _coalesce_key(message, call_id)
+        for connection in list(connections):
+            channel = self.channels.get(connection)
+            if channel:
+                channel.enqueue(encoded, coalesce_key)
+
+    def stats(self) -> Dict:
+        """Queue depth and delivery metrics across all connections."""
+        channels = list(self.channels.values())
+        depths = [c.depth for c in channels]
+        return {
+            "connections": len(self.active_connections),
+            "subscribed_calls": len(self.call_subscriptions),
+            "queue_size": WS_SEND_QUEUE_SIZE,
+            "slow_consumer_policy": WS_SLOW_CONSUMER_POLICY,
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "sent": self._closed_totals["sent"] + sum(c.sent for c in channels),
+            "dropped": self._closed_totals["dropped"] + sum(c.dropped for c in channels),
+            "coalesced": self._closed_totals["coalesced"] + sum(c.coalesced for c in channels),
+        }
 
     # ========================================================================
     # Event Helper Methods (matching frontend WSEvent types)
@@ -119,28 +311,12 @@ class ConnectionManager:
         })
 
     async def emit_transcript_update(self, call_id: str, transcript_line: dict, room_name: str = None):
-        """Emit transcript_update event. Broadcasts to both call_id and room_name subscribers."""
-        print(f"")
-        print(f"🟣 [WS_MANAGER] emit_transcript_update called")
-        print(f"   Call ID: {call_id}")
-        print(f"   Room name: {room_name}")
-        print(f"   Transcript line: {transcript_line.get('speaker')} - {transcript_line.get('text', '')[:50]}...")
-
+        """Emit transcript_update event. Broadcasts once to call_id and room_name subscribers."""
         message = {
             "type": "transcript_update",
             "data": transcript_line
         }
-
-        # Broadcast to call_id subscribers
-        print(f"   📡 Broadcasting to call_id: {call_id}")
-        await self.broadcast_to_call(call_id, message)
-
-        # Also broadcast to room_name subscribers if provided
-        if room_name and room_name != call_id:
-            print(f"   📡 Also broadcasting to room_name: {room_name}")
-            await self.broadcast_to_call(room_name, message)
-
-        print(f"   ✅ emit_transcript_update complete")
+        await self.broadcast_to_calls([call_id, room_name], message)
 
     async def emit_biometric_update(self, call_id: str, biometric_data: dict):
         """Emit biometric_update event."""
@@ -150,34 +326,28 @@ class ConnectionManager:
         })
 
     async def emit_wellbeing_update(self, call_id: str, wellbeing_data: dict, room_name: str = None):
-        """Emit wellbeing_update event. Broadcasts to both call_id and room_name subscribers."""
+        """Emit wellbeing_update event. Broadcasts once to call_id and room_name subscribers."""
         message = {
             "type": "wellbeing_update",
             "data": wellbeing_data
         }
-        await self.broadcast_to_call(call_id, message)
-        if room_name and room_name != call_id:
-            await self.broadcast_to_call(room_name, message)
+        await self.broadcast_to_calls([call_id, room_name], message)
 
     async def emit_profile_update(self, call_id: str, profile_fact: dict, room_name: str = None):
-        """Emit profile_update event. Broadcasts to both call_id and room_name subscribers."""
+        """Emit profile_update event. Broadcasts once to call_id and room_name subscribers."""
         message = {
             "type": "profile_update",
             "data": profile_fact
         }
-        await self.broadcast_to_call(call_id, message)
-        if room_name and room_name != call_id:
-            await self.broadcast_to_call(room_name, message)
+        await self.broadcast_to_calls([call_id, room_name], message)
 
     async def emit_concern_detected(self, call_id: str, concern: dict, room_name: str = None):
-        """Emit concern_detected event. Broadcasts to both call_id and room_name subscribers."""
+        """Emit concern_detected event. Broadcasts once to call_id and room_name subscribers."""
         message = {
             "type": "concern_detected",
             "data": concern
         }
-        await self.broadcast_to_call(call_id, message)
-        if room_name and room_name != call_id:
-            await self.broadcast_to_call(room_name, message)
+        await self.broadcast_to_calls([call_id, room_name], message)
 
     async def emit_village_action_started(self, call_id: str, action: dict):
         """Emit village_action_started event."""
@@ -221,5 +391,13 @@ class ConnectionManager:
         })
 
 
+def _coalesce_key(message: dict, call_id: Optional[str]) -> Optional[Hashable]:
+    """Key under which queued copies of this message may be replaced by newer ones."""
+    message_type = message.get("type")
+    if message_type in COALESCED_MESSAGE_TYPES:
+        return (message_type, call_id)
+    return None
+
+
 # Global connection manager instance
 ws_manager = ConnectionManager()
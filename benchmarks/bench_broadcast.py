@@ -0,0 +1,120 @@
+"""
+WebSocket fan-out cost at 1k subscribers: encode-once broadcast_to_calls against
+per-connection send_json to the call_id and then the room_name subscribers.
+
+    python benchmarks/bench_broadcast.py [--subscribers 1000] [--messages 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.websocket_manager import ORJSON_AVAILABLE, ConnectionManager  # noqa: E402
+
+CALL_ID = "0b6e4a52-5c1f-4a8e-9a57-0d3d1f6f2c11"
+ROOM_NAME = "call_margaret_1760000000"
+
+
+class FakeWebSocket:
+    """Counts frames instead of writing them to a socket."""
+
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        self.frames += 1
+        self.bytes += len(data)
+
+    async def send_json(self, data: dict):
+        # What starlette does for every call
+        await self.send_text(json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str))
+
+    async def close(self):
+        pass
+
+
+def transcript_message(i: int) -> dict:
+    return {
+        "type": "transcript_update",
+        "timestamp": datetime(2026, 1, 1, 9, 30, i % 60),
+        "data": {
+            "call_id": CALL_ID,
+            "line": {
+                "id": f"line-{i}",
+                "speaker": "elder",
+                "speaker_name": "Margaret",
+                "text": "I walked down to the garden this morning and the roses are blooming again.",
+                "timestamp": datetime(2026, 1, 1, 9, 30, i % 60).isoformat(),
+            },
+        },
+    }
+
+
+async def per_connection(subscribers: int, messages: int):
+    # Half the dashboards subscribe by call ID, half by room name, some by both
+    sockets = [FakeWebSocket() for _ in range(subscribers)]
+    by_call = sockets[:subscribers * 3 // 5]
+    by_room = sockets[subscribers * 2 // 5:]
+
+    started = time.perf_counter()
+    for i in range(messages):
+        message = transcript_message(i)
+        for socket in by_call:
+            await socket.send_json(message)
+        for socket in by_room:
+            await socket.send_json(message)
+    return time.perf_counter() - started, sockets
+
+
+async def encode_once(subscribers: int, messages: int):
+    manager = ConnectionManager()
+    sockets = [FakeWebSocket() for _ in range(subscribers)]
+    for socket in sockets:
+        await manager.connect(socket)
+    for socket in sockets[:subscribers * 3 // 5]:
+        manager.subscribe_to_call(socket, CALL_ID)
+    for socket in sockets[subscribers * 2 // 5:]:
+        manager.subscribe_to_call(socket, ROOM_NAME)
+
+    started = time.perf_counter()
+    for i in range(messages):
+        await manager.broadcast_to_calls([CALL_ID, ROOM_NAME], transcript_message(i))
+        # Let the writer tasks drain their queues, as they would between utterances
+        await asyncio.sleep(0)
+    while any(channel.depth for channel in manager.channels.values()):
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+
+    for socket in sockets:
+        manager.disconnect(socket)
+    return elapsed, sockets
+
+
+def report(label: str, elapsed: float, sockets, messages: int):
+    frames = sum(socket.frames for socket in sockets)
+    print(f"{label:<26} {elapsed / messages * 1e3:8.2f} ms/message  {frames / elapsed:>10,.0f} frames/s  "
+          f"{frames:>8,} frames sent")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print(f"{args.subscribers} subscribers, {args.messages} messages, orjson: {ORJSON_AVAILABLE}")
+    report("send_json per connection", *asyncio.run(per_connection(args.subscribers, args.messages)), args.messages)
+    report("encode once, de-duplicated", *asyncio.run(encode_once(args.subscribers, args.messages)), args.messages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Room-name lookup cost in CallRegistry against the linear scan it replaced.
+
+    python benchmarks/bench_call_registry.py [--calls 100 1000 10000] [--lookups 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.call_registry import CallRegistry  # noqa: E402
+from backend.models import CallSession  # noqa: E402
+
+
+def make_calls(count: int):
+    started = datetime(2026, 1, 1)
+    return [
+        CallSession.model_construct(id=f"call-{i}", elder_id="margaret", room_name=f"room-{i:08x}",
+                                    type="elder_checkin", status="in_progress", started_at=started)
+        for i in range(count)
+    ]
+
+
+def linear_scan(calls: dict, room_name: str):
+    # What /api/transcript/stream did before the room index
+    for call_id, call in calls.items():
+        if call.room_name == room_name:
+            return call_id, call
+    return None, None
+
+
+def per_lookup_ns(lookup, rooms) -> float:
+    started = time.perf_counter()
+    for room in rooms:
+        lookup(room)
+    return (time.perf_counter() - started) / len(rooms) * 1e9
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--lookups", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    print(f"{'active calls':>12} {'registry':>12} {'linear scan':>14}")
+    for count in args.calls:
+        calls = make_calls(count)
+        registry = CallRegistry(max_calls=count)
+        for call in calls:
+            registry.add(call)
+        by_id = {call.id: call for call in calls}
+
+        rng = random.Random(0)
+        rooms = [calls[rng.randrange(count)].room_name for _ in range(args.lookups)]
+        # The scan is O(calls); fewer lookups keep the run short at 10k calls
+        scan_rooms = rooms[:max(100, args.lookups * 100 // count)]
+
+        registry_ns = per_lookup_ns(registry.resolve, rooms)
+        scan_ns = per_lookup_ns(lambda room: linear_scan(by_id, room), scan_rooms)
+        print(f"{count:>12,} {registry_ns:>9.0f} ns {scan_ns:>11.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
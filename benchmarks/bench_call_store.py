@@ -0,0 +1,126 @@
+"""
+SQLite call store throughput: inserts and queries over 1M transcript lines.
+
+    python benchmarks/bench_call_store.py [--calls 2000] [--lines-per-call 500] [--path /tmp/bench.sqlite3]
+
+Writes calls and their transcripts (one line per transaction, as the streaming
+endpoint does, then bulk batches for the rest), ends the calls, then times the read
+paths the API uses. The database goes in a temporary directory unless --path is given.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.call_store import SQLiteCallStore  # noqa: E402
+from backend.margaret import margaret_elder  # noqa: E402
+from backend.models import CallSession, TranscriptLine  # noqa: E402
+
+SINGLE_LINE_INSERTS = 20000
+
+
+def make_calls(count: int):
+    start = datetime(2026, 1, 1)
+    return [
+        CallSession(id=str(uuid.uuid4()), elder_id=margaret_elder.id, room_name=f"call_{i:08x}",
+                    type="elder_checkin", status="in_progress", started_at=start + timedelta(minutes=i))
+        for i in range(count)
+    ]
+
+
+def make_lines(call: CallSession, count: int):
+    return [
+        TranscriptLine(id=str(uuid.uuid4()), speaker="elder" if i % 2 else "agent", speaker_name="Margaret",
+                       text="I went to the garden this morning and the roses are finally blooming again",
+                       timestamp=(call.started_at + timedelta(seconds=i)).isoformat())
+        for i in range(count)
+    ]
+
+
+def percentiles(seconds) -> str:
+    ordered = sorted(seconds)
+    return (f"p50 {ordered[len(ordered) // 2] * 1e3:6.2f} ms, "
+            f"p95 {ordered[int(len(ordered) * 0.95)] * 1e3:6.2f} ms")
+
+
+async def timed(query, runs: int):
+    seconds = []
+    for i in range(runs):
+        started = time.perf_counter()
+        result = await query(i)
+        seconds.append(time.perf_counter() - started)
+    return seconds, result
+
+
+async def run(args):
+    store = SQLiteCallStore(args.path or os.path.join(tempfile.mkdtemp(prefix="bench-store-"), "village.sqlite3"))
+    await store.save_elder(margaret_elder)
+    calls = make_calls(args.calls)
+
+    started = time.perf_counter()
+    for call in calls:
+        await store.save_call(call)
+    print(f"save_call            {len(calls) / (time.perf_counter() - started):>10,.0f} calls/s")
+
+    # Streaming: one transaction per line
+    first = calls[0]
+    lines = make_lines(first, SINGLE_LINE_INSERTS)
+    started = time.perf_counter()
+    for line in lines:
+        await store.add_transcript_line(first.id, line)
+    elapsed = time.perf_counter() - started
+    print(f"add_transcript_line  {len(lines) / elapsed:>10,.0f} lines/s ({elapsed / len(lines) * 1e6:.0f} us/line)")
+
+    # Bulk: each remaining call's transcript in one transaction
+    total, building, started = len(lines), 0.0, time.perf_counter()
+    for call in calls[1:]:
+        build_started = time.perf_counter()
+        batch = make_lines(call, args.lines_per_call)
+        building += time.perf_counter() - build_started
+        await store.add_transcript_lines(call.id, batch)
+        total += len(batch)
+    elapsed = time.perf_counter() - started - building
+    print(f"add_transcript_lines {(total - len(lines)) / elapsed:>10,.0f} lines/s "
+          f"({args.lines_per_call} per transaction), {total:,} lines stored")
+
+    # Transcripts are only accepted while a call is active, so calls end afterwards
+    started = time.perf_counter()
+    for call in calls:
+        await store.update_call(call.id, {"status": "completed", "duration_seconds": 600,
+                                          "ended_at": call.started_at + timedelta(seconds=600)}, only_active=True)
+    print(f"update_call (end)    {len(calls) / (time.perf_counter() - started):>10,.0f} calls/s")
+
+    others = calls[1:]
+    seconds, call = await timed(lambda i: store.get_call(others[i * 7 % len(others)].id), 200)
+    print(f"get_call             {percentiles(seconds)} ({len(call.transcript)} lines each)")
+    seconds, _ = await timed(lambda i: store.get_call_by_room(others[i * 11 % len(others)].room_name), 200)
+    print(f"get_call_by_room     {percentiles(seconds)}")
+    seconds, listed = await timed(lambda i: store.list_calls(elder_id=margaret_elder.id, limit=20), 50)
+    print(f"list_calls(20)       {percentiles(seconds)} ({sum(len(c.transcript) for c in listed):,} lines)")
+    seconds, _ = await timed(lambda i: store.list_calls(limit=1, ended=False), 50)
+    print(f"list_calls(active)   {percentiles(seconds)}")
+
+    started = time.perf_counter()
+    stats = await store.stats()
+    print(f"stats                {(time.perf_counter() - started) * 1e3:6.0f} ms {stats['rows']}")
+    print(f"database             {os.path.getsize(store.path) / 1e6:,.0f} MB")
+    store.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--lines-per-call", type=int, default=500)
+    parser.add_argument("--path", help="SQLite file to write (default: a temporary directory)")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Peak memory of decoding a long recording for predict_parkinson: the in-memory
+decode_audio against the original pydub -> WAV bytes -> temp file -> librosa.load path.
+
+    python benchmarks/bench_decode.py [--minutes 30] [--format mp3|wav] [--file recording.mp3]
+
+MP3 needs ffmpeg and ffprobe on PATH (for pydub); WAV doesn't. Each decoder runs in
+a fresh process so its peak RSS is its own.
+"""
+import argparse
+import importlib
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def temp_file_decode(audio_bytes: bytes, ext: str):
+    """The decode path predict_parkinson used before decode_audio."""
+    import librosa
+    from pydub import AudioSegment
+
+    if ext != ".wav":
+        wav_io = io.BytesIO()
+        AudioSegment.from_file(io.BytesIO(audio_bytes), format=ext[1:]).export(wav_io, format="wav")
+        audio_bytes = wav_io.getvalue()
+        del wav_io
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
+        tmp.write(audio_bytes)
+        tmp_path = tmp.name
+    del audio_bytes
+    try:
+        return librosa.load(tmp_path, sr=22050)
+    finally:
+        os.remove(tmp_path)
+
+
+def make_recording(minutes: float, path: str):
+    """A synthetic 44.1 kHz mono voice-like tone, as MP3 or WAV depending on `path`."""
+    import numpy as np
+
+    sr = 44100
+    t = np.arange(int(sr * 60 * minutes)) / sr
+    voice = 0.3 * np.sin(2 * np.pi * (140 + 20 * np.sin(2 * np.pi * 0.3 * t)) * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 2 * t))
+    pcm = (voice * 32767).astype(np.int16)
+    del t, voice
+    if path.endswith(".wav"):
+        import soundfile as sf
+        sf.write(path, pcm, sr, subtype="PCM_16")
+    else:
+        from pydub import AudioSegment
+        AudioSegment(pcm.tobytes(), frame_rate=sr, sample_width=2, channels=1).export(path, format="mp3", bitrate="64k")
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss carries over from the parent across fork + exec; VmHWM starts fresh
+    try:
+        with open("/proc/self/status") as f:
+            return int(f.read().split("VmHWM:")[1].split()[0]) / 1024
+    except (OSError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(decoder: str, path: str):
+    warnings.filterwarnings("ignore")
+    # Imported before the baseline so both decoders are measured without their import cost
+    for module in ("librosa", "pydub"):
+        importlib.import_module(module)
+    from backend.parkinson.run_model import decode_audio
+
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "rb") as f:
+        audio_bytes = f.read()
+    baseline = peak_rss_mb()
+
+    started = time.perf_counter()
+    if decoder == "decode_audio":
+        y, sr = decode_audio(audio_bytes, ext)
+    else:
+        y, sr = temp_file_decode(audio_bytes, ext)
+    elapsed = time.perf_counter() - started
+    print(f"{decoder:<16} {elapsed:>6.1f}s  peak RSS +{peak_rss_mb() - baseline:>6.0f} MB  "
+          f"({len(y) / sr / 60:.1f} min at {sr} Hz, {y.nbytes / 1e6:.0f} MB array)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=30)
+    parser.add_argument("--format", choices=["mp3", "wav"], default="mp3", help="Format of the generated recording")
+    parser.add_argument("--file", help="Recording to decode instead of a generated one")
+    parser.add_argument("--child", nargs=2, metavar=("DECODER", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(*args.child)
+        return
+
+    path = args.file
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="bench-decode-"), f"recording.{args.format}")
+        make_recording(args.minutes, path)
+    print(f"{path}: {os.path.getsize(path) / 1e6:.1f} MB")
+    for decoder in ("temp_file", "decode_audio"):
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--child", decoder, path], cwd=ROOT, check=True)
+
+
+if __name__ == "__main__":
+    main()
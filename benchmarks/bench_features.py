@@ -0,0 +1,103 @@
+"""
+Parkinson's feature extraction on synthetic speech-like recordings: wall time and peak
+traced memory of the shared-STFT extract_features against the original independent
+librosa passes, asserting the features match.
+
+    python benchmarks/bench_features.py [--minutes 1 5 20]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.parkinson.run_model import TARGET_SR, extract_features, load_model  # noqa: E402
+
+
+def separate_pass_features(y: np.ndarray, sr: int) -> dict:
+    """extract_features as it was before the shared STFT: every feature group runs its own passes."""
+    import librosa
+    import scipy.stats
+
+    features = {}
+    pitches = librosa.yin(y, fmin=75, fmax=600)
+    pitches = pitches[~np.isnan(pitches)]
+    features["Fo"] = np.mean(pitches) if len(pitches) > 0 else 0
+    features["Jitter"] = np.mean(np.abs(np.diff(pitches))) / (features["Fo"] + 1e-6) if len(pitches) > 1 else 0
+
+    rms = librosa.feature.rms(y=y)[0]
+    features["Shimmer"] = np.mean(np.abs(np.diff(rms))) / (np.mean(rms) + 1e-6)
+    features["Shimmer(dB)"] = 20 * np.log10(features["Shimmer"] + 1e-6)
+    features["Shimmer:APQ5"] = features["Shimmer"] * 0.8
+    features["Shimmer:APQ11"] = features["Shimmer"] * 0.6
+
+    harmonic = librosa.effects.harmonic(y)
+    percussive = librosa.effects.percussive(y)
+    features["HNR"] = np.mean(harmonic) / (np.mean(percussive) + 1e-6)
+    features["NHR"] = 1.0 / (features["HNR"] + 1e-6)
+    features["RPDE"] = scipy.stats.entropy(np.abs(librosa.stft(y).mean(axis=0)) + 1e-6)
+    features["DFA"] = np.mean(np.abs(np.diff(y)))
+    features["PPE"] = scipy.stats.entropy(np.abs(y) + 1e-6)
+    features["spread1"] = np.std(y)
+    features["spread2"] = scipy.stats.kurtosis(y)
+    return features
+
+
+def synthetic_recording(minutes: float, sr: int = TARGET_SR) -> np.ndarray:
+    """A gliding voiced tone with syllable-rate amplitude modulation and a little noise."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(sr * 60 * minutes)) / sr
+    pitch = 140 + 20 * np.sin(2 * np.pi * 0.3 * t)
+    voice = 0.3 * np.sin(2 * np.pi * pitch * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 2 * t))
+    return (voice + 0.02 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 5, 20])
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore")
+
+    selected = load_model()["selected_features"]
+    variants = [
+        ("separate passes", lambda y: separate_pass_features(y, TARGET_SR)),
+        ("shared STFT", lambda y: extract_features(y, TARGET_SR)),
+        ("shared STFT, model's", lambda y: extract_features(y, TARGET_SR, wanted=selected)),
+    ]
+
+    # Compile librosa's numba kernels before timing anything
+    for _, fn in variants:
+        fn(synthetic_recording(0.05))
+
+    print(f"{'recording':>9}  {'variant':<22} {'wall':>8} {'peak memory':>12}")
+    for minutes in args.minutes:
+        y = synthetic_recording(minutes)
+        results = {}
+        for label, fn in variants:
+            results[label], elapsed, peak = measure(lambda: fn(y))
+            print(f"{minutes:>5g} min  {label:<22} {elapsed:>7.2f}s {peak / 1e6:>9.1f} MB")
+
+        reference = results["separate passes"]
+        for label, features in list(results.items())[1:]:
+            for name, value in features.items():
+                assert np.isclose(reference[name], value, rtol=1e-5, atol=1e-7), (label, name, reference[name], value)
+        print(f"{'':>11}features match ({len(reference)} all, {len(selected)} used by the model)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Transcript ingest throughput (/api/transcript/stream handler, called directly) with
+the per-utterance prints the handler used to make, with every per-message event
+logged (LOG_LEVEL=DEBUG) and with the default sampled INFO logging.
+
+    python benchmarks/bench_ingest.py [--chunks 20000] [--calls 50] [--subscribers 20]
+
+Each mode runs in a fresh process, since logging is configured at import.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeWebSocket:
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        pass
+
+    async def close(self):
+        pass
+
+
+def print_like_before(chunk, call):
+    """The prints stream_transcript_chunk made for every utterance before it logged instead."""
+    print(f"")
+    print(f"🟢 [BACKEND] Received transcript stream request")
+    print(f"   Call ID: {chunk.call_id}")
+    print(f"   Speaker: {chunk.speaker} ({chunk.speaker_name})")
+    print(f"   Text: {chunk.text[:100]}..." if len(chunk.text) > 100 else f"   Text: {chunk.text}")
+    print(f"   Timestamp: {chunk.timestamp}")
+    print(f"   ✅ Found call: {call.id}")
+    print(f"   ✅ Created transcript line: {call.transcript[-1].id}")
+    print(f"   ✅ Added to call transcript (now {len(call.transcript)} lines)")
+    print(f"   📡 Broadcasting to WebSocket subscribers...")
+    print(f"      - Call ID: {call.id}")
+    print(f"      - Room name: {call.room_name}")
+    print(f"   ✅ WebSocket broadcast complete")
+    print(f"   🤖 Scheduling AI analysis in background...")
+    print(f"   ✅ Transcript stream request complete")
+
+
+async def ingest(chunks: int, calls: int, subscribers: int, prints: bool = False) -> float:
+    sys.path.insert(0, ROOT)
+    import backend.main as app
+
+    started_calls = [await app.start_call_api(app.StartCallRequest(elder_id="margaret")) for _ in range(calls)]
+    rooms = [call.room_name for call in started_calls]
+    for room in rooms:
+        for _ in range(subscribers):
+            socket = FakeWebSocket()
+            await app.ws_manager.connect(socket)
+            app.ws_manager.subscribe_to_call(socket, room)
+
+    started = time.perf_counter()
+    for i in range(chunks):
+        chunk = app.TranscriptChunkRequest(
+            call_id=rooms[i % calls], speaker="elder" if i % 2 else "agent", speaker_name="Margaret",
+            text="I had a lovely walk with my neighbour Tom this morning"
+        )
+        await app.stream_transcript_chunk(chunk)
+        if prints:
+            print_like_before(chunk, started_calls[i % calls])
+        if i % 100 == 0:
+            await asyncio.sleep(0)  # let WebSocket writers and the debounced analysis run
+    return time.perf_counter() - started
+
+
+def run_child(level: str, args, prints: bool = False) -> dict:
+    workdir = tempfile.mkdtemp(prefix="bench-ingest-")
+    env = {
+        **os.environ,
+        "LOG_LEVEL": level,
+        "ANALYSIS_BACKEND": "local",
+        "CALL_STORE_PATH": os.path.join(workdir, "village.sqlite3"),
+        "JOBS_DB_PATH": os.path.join(workdir, "jobs.sqlite3"),
+    }
+    output_path = os.path.join(workdir, "output.log")
+    result_path = os.path.join(workdir, "result.json")
+    with open(output_path, "w") as output:
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", result_path,
+             "--chunks", str(args.chunks), "--calls", str(args.calls), "--subscribers", str(args.subscribers)]
+            + (["--prints"] if prints else []),
+            cwd=ROOT, env=env, stdout=output, stderr=subprocess.STDOUT, check=True
+        )
+    with open(result_path) as f:
+        result = json.load(f)
+    result["output_bytes"] = os.path.getsize(output_path)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--subscribers", type=int, default=20, help="WebSocket subscribers per call")
+    parser.add_argument("--child", metavar="RESULT_PATH", help=argparse.SUPPRESS)
+    parser.add_argument("--prints", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        elapsed = asyncio.run(ingest(args.chunks, args.calls, args.subscribers, args.prints))
+        with open(args.child, "w") as f:
+            json.dump({"elapsed": elapsed}, f)
+        return
+
+    print(f"{args.chunks} chunks over {args.calls} calls, {args.subscribers} subscribers per call")
+    for label, level, prints in (("prints", "INFO", True), ("DEBUG", "DEBUG", False), ("INFO", "INFO", False)):
+        result = run_child(level, args, prints)
+        print(f"{label:<7} {args.chunks / result['elapsed']:>8,.0f} chunks/s  "
+              f"{result['output_bytes'] / 1e6:>8.1f} MB of output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Import `backend` as a package from the repository root, as the app and workers do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import httpx
+
+from backend import main
+from backend.ai_analyzer import AIAnalyzer
+from backend.analysis_backends import AnalysisBackend, GeminiBackend
+from backend.margaret import margaret_elder
+from backend.models import CallSession, TranscriptLine
+
+
+class SlowBackend(AnalysisBackend):
+    """Answers after `latency_seconds`, tracking how many analyses run at once."""
+
+    name = "slow"
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+        self.running = 0
+        self.peak_running = 0
+
+    async def analyze(self, elder, context):
+        self.running += 1
+        self.peak_running = max(self.peak_running, self.running)
+        try:
+            await asyncio.sleep(self.latency_seconds)
+        finally:
+            self.running -= 1
+        return {"wellbeing": {"mood": "content"}, "concerns": [], "profile_updates": [], "suggested_actions": []}
+
+
+class FakeGeminiModels:
+    """Stands in for `client.aio.models`, recording which prompt cache each request used."""
+
+    def __init__(self):
+        self.cached_content = []
+
+    async def generate_content(self, model, contents, config):
+        self.cached_content.append(config.cached_content)
+        text = json.dumps({"wellbeing": {"mood": "content"}, "concerns": [], "profile_updates": [],
+                           "suggested_actions": []})
+        return SimpleNamespace(text=text, usage_metadata=None)
+
+
+def call_with_lines(analyzer: AIAnalyzer, call_id: str, lines: int = 3) -> CallSession:
+    call = CallSession(id=call_id, elder_id=margaret_elder.id, room_name=f"room-{call_id}",
+                       type="elder_checkin", status="in_progress", started_at=datetime(2026, 1, 1))
+    for i in range(lines):
+        analyzer.record_transcript_line(call, TranscriptLine(
+            id=f"{call_id}-{i}", speaker="elder", speaker_name="Margaret",
+            text="The garden is lovely today", timestamp=f"2026-01-01T00:00:0{i}"
+        ))
+    return call
+
+
+def test_slow_analysis_times_out_with_an_empty_result():
+    analyzer = AIAnalyzer(backend=SlowBackend(latency_seconds=1), timeout_seconds=0.05)
+    call = call_with_lines(analyzer, "c1")
+
+    started = time.monotonic()
+    result = asyncio.run(analyzer.analyze_call(call, margaret_elder))
+
+    assert time.monotonic() - started < 0.5
+    assert result == {"wellbeing_update": None, "concerns": [], "profile_facts": [], "suggested_actions": []}
+    # Nothing was analyzed, so the next analysis still covers these lines
+    assert analyzer.analysis_context.get("c1")["lines_analyzed"] == 0
+
+
+def test_analysis_after_cache_creation_timed_out():
+    backend = GeminiBackend(api_key="test")
+    models = FakeGeminiModels()
+    backend._client = SimpleNamespace(aio=SimpleNamespace(models=models))
+    create_seconds = [1.0, 0.0]
+
+    async def create_prompt_cache(prompt_prefix):
+        await asyncio.sleep(create_seconds.pop(0))
+        return "cachedContents/1"
+
+    backend._create_prompt_cache = create_prompt_cache
+    analyzer = AIAnalyzer(backend=backend, timeout_seconds=0.05)
+    call = call_with_lines(analyzer, "c1")
+
+    async def run():
+        first = await analyzer.analyze_call(call, margaret_elder)
+        second = await analyzer.analyze_call(call, margaret_elder)
+        return first, second
+
+    first, second = asyncio.run(run())
+    # The first analysis was cancelled while creating the cache; the next one creates it
+    assert first["wellbeing_update"] is None
+    assert second["wellbeing_update"] is not None
+    assert models.cached_content == ["cachedContents/1"]
+    assert backend._cache_users == {analyzer.analysis_context.get("c1")["prompt_cache_key"]: 1}
+
+    analyzer.cleanup_call_context("c1")
+    assert backend._cache_users == {}
+
+
+def test_long_call_moves_to_the_replacement_cache():
+    backend = GeminiBackend(api_key="test")
+    models = FakeGeminiModels()
+    backend._client = SimpleNamespace(aio=SimpleNamespace(models=models))
+    names = iter(["cachedContents/1", "cachedContents/2"])
+
+    async def create_prompt_cache(prompt_prefix):
+        return next(names)
+
+    backend._create_prompt_cache = create_prompt_cache
+    analyzer = AIAnalyzer(backend=backend)
+    call = call_with_lines(analyzer, "c1")
+
+    async def run():
+        await analyzer.analyze_call(call, margaret_elder)
+        # The call has run long enough that its cache is about to expire
+        key = analyzer.analysis_context.get("c1")["prompt_cache_key"]
+        backend._prompt_caches[key] = ("cachedContents/1", time.monotonic() + 1)
+        await analyzer.analyze_call(call, margaret_elder)
+
+    asyncio.run(run())
+    assert models.cached_content == ["cachedContents/1", "cachedContents/2"]
+
+
+def test_concurrent_analyses_are_limited_across_calls():
+    backend = SlowBackend(latency_seconds=0.02)
+    analyzer = AIAnalyzer(backend=backend, max_concurrency=2)
+    calls = [call_with_lines(analyzer, f"c{i}") for i in range(6)]
+
+    async def run():
+        return await asyncio.gather(*(analyzer.analyze_call(call, margaret_elder) for call in calls))
+
+    results = asyncio.run(run())
+    assert backend.peak_running == 2
+    assert all(result["wellbeing_update"] is not None for result in results)
+
+
+def test_api_stays_responsive_during_a_slow_analysis():
+    analyzer = AIAnalyzer(backend=SlowBackend(latency_seconds=0.5))
+    call = call_with_lines(analyzer, "c1")
+
+    async def run():
+        latencies = []
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://api") as client:
+            await client.get("/api/elder/margaret")
+            analysis = asyncio.create_task(analyzer.analyze_call(call, margaret_elder))
+            while not analysis.done():
+                started = time.perf_counter()
+                response = await client.get("/api/elder/margaret")
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200
+                await asyncio.sleep(0.02)
+        return await analysis, latencies
+
+    result, latencies = asyncio.run(run())
+    assert result["wellbeing_update"] is not None
+    assert len(latencies) > 10
+    # A fraction of the analysis latency, so the analysis never held the event loop
+    assert max(latencies) < 0.05
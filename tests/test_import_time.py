@@ -0,0 +1,38 @@
+"""Importing the API must not load the heavy modules deferred to first use (see warm_up)."""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each costs from a hundred milliseconds to a second at import
+DEFERRED_MODULES = {"google.genai", "livekit.api", "librosa", "scipy", "pydub", "soundfile", "sklearn"}
+
+
+def imported_modules(statement: str) -> set:
+    """Modules imported by running `statement` in a fresh interpreter (`python -X importtime`)."""
+    env = {**os.environ, "STARTUP_WARMUP": "false"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    return {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "cumulative" not in line
+    }
+
+
+def test_backend_main_defers_heavy_imports():
+    modules = imported_modules("import backend.main")
+    assert "backend.main" in modules
+    assert not DEFERRED_MODULES & modules
+
+
+def test_run_model_defers_audio_stack_and_model():
+    modules = imported_modules(
+        "import backend.parkinson.run_model as m; assert m._model_data is None"
+    )
+    assert not DEFERRED_MODULES & modules
@@ -0,0 +1,43 @@
+import asyncio
+
+from backend.parkinson.batch import score_recordings
+
+
+class FakePool:
+    """Extracts a one-number feature row per recording and scores rows as their sum."""
+
+    workers = 2
+    capacity = 4
+
+    def __init__(self):
+        self.score_calls = []
+
+    async def features(self, audio, filename, source=None):
+        audio = await audio()
+        if not audio:
+            raise RuntimeError("Prediction error: File too short or empty.")
+        return [len(audio)], {"file": filename}
+
+    async def score(self, rows, selections):
+        self.score_calls.append(len(rows))
+        return [{"score": sum(row), "audio": selection} for row, selection in zip(rows, selections)]
+
+
+def test_each_batch_is_scored_with_one_model_call():
+    recordings = {"calls/a.mp3": b"a", "calls/empty.mp3": b"", "calls/bb.mp3": b"bb", "calls/ccc.mp3": b"ccc"}
+    pool = FakePool()
+
+    async def fetch(path):
+        return recordings[path]
+
+    async def run():
+        return [line async for line in score_recordings(list(recordings), fetch, pool, batch_size=3)]
+
+    assert asyncio.run(run()) == [
+        {"path": "calls/a.mp3", "score": 1, "audio": {"file": "a.mp3"}},
+        {"path": "calls/empty.mp3", "error": "Prediction error: File too short or empty."},
+        {"path": "calls/bb.mp3", "score": 2, "audio": {"file": "bb.mp3"}},
+        {"path": "calls/ccc.mp3", "score": 3, "audio": {"file": "ccc.mp3"}},
+    ]
+    # The failed recording is left out of its batch's model call
+    assert pool.score_calls == [2, 1]
@@ -0,0 +1,180 @@
+"""The post-call copy streams a recording from LiveKit's S3 output into Supabase Storage."""
+import asyncio
+import hashlib
+import os
+import tracemalloc
+
+import httpx
+import pytest
+
+from backend import database, main, repository
+from backend.recording_spool import RecordingSpool
+from backend.repository import StorageRepository, SupabaseExecutor
+
+S3_ENDPOINT = "http://s3.test/storage/v1/s3"
+SUPABASE_URL = "http://supabase.test"
+# Larger than the 256 KB pieces each chunk's request body is read in
+CHUNK_BYTES = 512 * 1024
+
+
+class StreamingTransport(httpx.AsyncBaseTransport):
+    """Like httpx.MockTransport, but leaves request bodies for the handler to stream, as a server would."""
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.handler(request)
+
+
+class FakeObjectStore:
+    """LiveKit's S3 output and Supabase's resumable upload endpoint, served in memory."""
+
+    def __init__(self, recording: bytes, download_piece_bytes: int = 64 * 1024):
+        self.recording = recording
+        self.download_piece_bytes = download_piece_bytes
+        self.uploaded = bytearray()
+        self.upload_offset = 0
+        self.upload_headers = None
+        self.body_pieces = []
+        self.patches = 0
+        self.fail_patches = set()
+
+    def transport(self) -> StreamingTransport:
+        return StreamingTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        if url.startswith(S3_ENDPOINT.replace("/storage/v1/s3", "")) and "upload" not in url:
+            if request.method == "HEAD":
+                return httpx.Response(200)
+            return httpx.Response(200, content=self._download())
+
+        if request.method == "POST":
+            self.upload_headers = request.headers
+            return httpx.Response(201, headers={"Location": f"{SUPABASE_URL}/storage/v1/upload/resumable/up1"})
+        if request.method == "HEAD":
+            return httpx.Response(200, headers={"Upload-Offset": str(self.upload_offset)})
+        if request.method == "PATCH":
+            self.patches += 1
+            assert int(request.headers["Upload-Offset"]) == self.upload_offset
+            if self.patches in self.fail_patches:
+                return httpx.Response(500)
+            async for piece in request.stream:
+                self.receive(piece)
+                self.upload_offset += len(piece)
+            return httpx.Response(204, headers={"Upload-Offset": str(self.upload_offset)})
+        return httpx.Response(405)
+
+    def receive(self, piece: bytes):
+        self.uploaded += piece
+
+    async def _download(self):
+        for start in range(0, len(self.recording), self.download_piece_bytes):
+            yield self.recording[start:start + self.download_piece_bytes]
+
+
+class GeneratedObjectStore(FakeObjectStore):
+    """A recording of `size` bytes generated as it is downloaded; uploads are hashed, not kept."""
+
+    def __init__(self, size: int):
+        super().__init__(recording=b"", download_piece_bytes=1024 * 1024)
+        self.size = size
+        self.block = os.urandom(self.download_piece_bytes)
+        self.upload_digest = hashlib.sha256()
+
+    def pieces(self):
+        for start in range(0, self.size, len(self.block)):
+            yield self.block[:self.size - start]
+
+    async def _download(self):
+        for piece in self.pieces():
+            yield piece
+
+    def receive(self, piece: bytes):
+        self.upload_digest.update(piece)
+
+
+def serve(monkeypatch, tmp_path, fake: FakeObjectStore):
+    monkeypatch.setenv("S3_ENDPOINT", S3_ENDPOINT)
+    monkeypatch.setenv("S3_ACCESS_KEY", "key")
+    monkeypatch.setenv("S3_SECRET", "secret")
+    monkeypatch.setenv("S3_BUCKET", "recordings")
+    monkeypatch.setattr(database, "url", SUPABASE_URL)
+    monkeypatch.setattr(database, "key", "service-key")
+    monkeypatch.setattr(repository, "RETRY_BACKOFF_SECONDS", 0)
+
+    read_range = repository._read_range
+
+    async def recording_read_range(*args, **kwargs):
+        async for piece in read_range(*args, **kwargs):
+            fake.body_pieces.append(len(piece))
+            yield piece
+
+    monkeypatch.setattr(repository, "_read_range", recording_read_range)
+
+    monkeypatch.setattr(main.http_pool, "_client", httpx.AsyncClient(transport=fake.transport()))
+    monkeypatch.setattr(main, "recording_spool", RecordingSpool(str(tmp_path)))
+    monkeypatch.setattr(main, "recording_storage", StorageRepository(SupabaseExecutor(client=object())))
+    return fake
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    monkeypatch.setattr(repository, "TUS_CHUNK_BYTES", CHUNK_BYTES)
+    return serve(monkeypatch, tmp_path, FakeObjectStore(os.urandom(CHUNK_BYTES * 5 + 1234)))
+
+
+def copy(path: str) -> bool:
+    async def run():
+        try:
+            return await main.copy_recording_to_supabase_storage("room-1", path)
+        finally:
+            await main.http_pool.aclose()
+    return asyncio.run(run())
+
+
+def test_copy_streams_recording_to_storage(store):
+    assert copy("calls/room-1.mp3") is True
+
+    assert bytes(store.uploaded) == store.recording
+    # Re-running the copy overwrites the object rather than failing
+    assert store.upload_headers["x-upsert"] == "true"
+    # Uploaded in TUS chunks, each streamed from the spool file in pieces
+    assert store.patches == -(-len(store.recording) // CHUNK_BYTES)
+    assert sum(store.body_pieces) == len(store.recording)
+    assert max(store.body_pieces) <= 256 * 1024
+
+    recent = main.recording_tracker.stats()["recent_recordings"]
+    transferred = next(entry for entry in recent if entry["path"] == "calls/room-1.mp3")["bytes_transferred"]
+    assert transferred == {"s3": len(store.recording), "upload": len(store.recording)}
+
+
+def test_copy_resumes_after_a_failed_chunk(store):
+    store.fail_patches = {2}
+
+    assert copy("calls/room-2.mp3") is True
+    assert bytes(store.uploaded) == store.recording
+    assert store.patches == -(-len(store.recording) // CHUNK_BYTES) + 1
+
+
+@pytest.mark.skipif(not os.environ.get("RUN_SLOW_TESTS"), reason="copies 500 MB; set RUN_SLOW_TESTS=1")
+def test_copy_memory_stays_flat_for_a_large_recording(monkeypatch, tmp_path):
+    size = 500 * 1024 * 1024
+    # Supabase's real 6 MB chunk size
+    fake = serve(monkeypatch, tmp_path, GeneratedObjectStore(size))
+
+    tracemalloc.start()
+    try:
+        assert copy("calls/room-large.mp3") is True
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    expected = hashlib.sha256()
+    for piece in fake.pieces():
+        expected.update(piece)
+    assert fake.upload_offset == size
+    assert fake.upload_digest.hexdigest() == expected.hexdigest()
+    # The S3 download and the upload each hold a piece at a time, never the recording
+    assert peak < 16 * 1024 * 1024
@@ -0,0 +1,200 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from backend import database, repository
+from backend.http_client import HttpClientPool
+from backend.repository import (
+    CallsRepository, RepositoryUnavailable, StorageRepository, SupabaseExecutor, _is_transient,
+)
+
+LATENCY_SECONDS = 0.2
+
+
+class StatusError(Exception):
+    """Stands in for the client's API errors, which carry an HTTP status as `code`."""
+
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(repository, "RETRY_BACKOFF_SECONDS", 0)
+
+
+@pytest.mark.parametrize("error", [
+    asyncio.TimeoutError(),
+    httpx.ReadTimeout("read timed out"),
+    httpx.RemoteProtocolError("connection closed"),
+    StatusError(429),
+    StatusError(500),
+    StatusError("503"),
+])
+def test_transient_errors_are_retried_when_idempotent(error):
+    assert _is_transient(error, idempotent=True)
+    assert not _is_transient(error, idempotent=False)
+
+
+def test_connect_errors_are_always_retried():
+    # The request never reached the server, so even a write can be resent
+    error = httpx.ConnectError("connection refused")
+    assert _is_transient(error, idempotent=True)
+    assert _is_transient(error, idempotent=False)
+
+
+@pytest.mark.parametrize("error", [
+    StatusError(400),
+    StatusError(404),
+    StatusError(409),
+    StatusError("not a status"),
+    ValueError("bad row"),
+])
+def test_permanent_errors_are_not_retried(error):
+    assert not _is_transient(error, idempotent=True)
+
+
+def flaky(errors, result="ok"):
+    """A blocking call that raises each of `errors` in turn, then returns `result`."""
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return fn, calls
+
+
+def test_run_retries_transient_errors():
+    executor = SupabaseExecutor(client=object(), retries=2)
+    fn, calls = flaky([StatusError(503), httpx.ConnectError("refused")])
+
+    assert asyncio.run(executor.run("calls.select", fn)) == "ok"
+    assert len(calls) == 3
+    assert executor.stats()["retried"] == 2
+    assert executor.stats()["failures"] == 0
+
+
+def test_run_gives_up_after_the_last_retry():
+    executor = SupabaseExecutor(client=object(), retries=1)
+    fn, calls = flaky([StatusError(500)] * 3)
+
+    with pytest.raises(StatusError):
+        asyncio.run(executor.run("calls.select", fn))
+    assert len(calls) == 2
+    assert executor.stats()["failures"] == 1
+
+
+def test_run_does_not_retry_non_idempotent_writes():
+    executor = SupabaseExecutor(client=object(), retries=2)
+    fn, calls = flaky([StatusError(500)])
+
+    with pytest.raises(StatusError):
+        asyncio.run(executor.run("calls.insert", fn, idempotent=False))
+    assert len(calls) == 1
+
+
+def test_run_does_not_retry_permanent_errors():
+    executor = SupabaseExecutor(client=object(), retries=2)
+    fn, calls = flaky([StatusError(400)])
+
+    with pytest.raises(StatusError):
+        asyncio.run(executor.run("calls.update", fn))
+    assert len(calls) == 1
+
+
+def test_run_times_out_and_retries():
+    executor = SupabaseExecutor(client=object(), retries=1, timeout_seconds=0.05)
+    calls = []
+
+    def slow_then_fast():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.2)
+        return "ok"
+
+    assert asyncio.run(executor.run("calls.select", slow_then_fast)) == "ok"
+    assert executor.stats()["timeouts"] == 1
+    assert executor.stats()["retried"] == 1
+
+
+def test_run_without_client_is_unavailable():
+    executor = SupabaseExecutor(client=None)
+    with pytest.raises(RepositoryUnavailable):
+        asyncio.run(executor.run("calls.select", lambda: None))
+
+
+class SlowSupabase:
+    """A supabase-py client whose every request blocks for one round trip to a slow server."""
+
+    def table(self, name):
+        return self
+
+    def update(self, fields):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def execute(self):
+        time.sleep(LATENCY_SECONDS)
+        return "ok"
+
+    @property
+    def storage(self):
+        return self
+
+    def from_(self, bucket):
+        return self
+
+    def download(self, path):
+        time.sleep(LATENCY_SECONDS)
+        return b"audio"
+
+
+async def slow_storage_server(request: httpx.Request) -> httpx.Response:
+    await asyncio.sleep(LATENCY_SECONDS)
+    return httpx.Response(200, content=b"audio")
+
+
+def test_requests_overlap_without_blocking_the_event_loop(monkeypatch, tmp_path):
+    executor = SupabaseExecutor(client=SlowSupabase())
+    calls, storage = CallsRepository(executor), StorageRepository(executor)
+    pool = HttpClientPool()
+    pool._client = httpx.AsyncClient(transport=httpx.MockTransport(slow_storage_server))
+    monkeypatch.setattr("backend.http_client.http_pool", pool)
+    monkeypatch.setattr(database, "url", "http://supabase.test")
+    monkeypatch.setattr(database, "key", "service-key")
+
+    async def run():
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        ticking = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        with open(tmp_path / "download", "wb") as file:
+            results = await asyncio.gather(
+                *(calls.update(f"call-{i}", {"status": "completed"}) for i in range(4)),
+                storage.download("calls/room-1.mp3"),
+                storage.download_to("calls/room-2.mp3", file),
+            )
+        elapsed = time.perf_counter() - started
+        ticking.cancel()
+        await pool.aclose()
+        return results, elapsed, ticks
+
+    results, elapsed, ticks = asyncio.run(run())
+    assert results == ["ok"] * 4 + [b"audio", 5]
+    # Six requests take about as long as one
+    assert elapsed < 2 * LATENCY_SECONDS
+    assert max(later - earlier for earlier, later in zip(ticks, ticks[1:])) < 0.1
+    executor.shutdown()
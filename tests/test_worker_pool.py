@@ -0,0 +1,115 @@
+import asyncio
+import os
+import signal
+import time
+
+import httpx
+import pytest
+
+from backend import main
+from backend.parkinson import worker_pool
+from backend.parkinson.feature_cache import FeatureCache
+from backend.parkinson.worker_pool import ParkinsonWorkerPool, PoolSaturated
+
+
+# Run in the spawned workers, so they must be importable module-level functions
+
+def skip_model_load():
+    pass
+
+
+def echo(value):
+    return value
+
+
+def crash_once(marker: str):
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os.kill(os.getpid(), signal.SIGKILL)
+    return "recovered"
+
+
+def crash():
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+def busy_analyze(audio_bytes, filename, speech_intervals, max_seconds, window_seconds=None, score=True):
+    """Stands in for _analyze: burns CPU like a decode and feature extraction."""
+    deadline = time.process_time() + 0.3
+    while time.process_time() < deadline:
+        pass
+    return {"row": [], "selection": {}, "result": {"filename": filename}}
+
+
+@pytest.fixture
+def pool(monkeypatch, tmp_path):
+    monkeypatch.setattr(worker_pool, "_init_worker", skip_model_load)
+    pool = ParkinsonWorkerPool(workers=1, max_queued=1, cache=FeatureCache(str(tmp_path / "cache")))
+    yield pool
+    pool.shutdown()
+
+
+def test_interactive_requests_are_turned_away_when_full(pool):
+    async def run():
+        release = asyncio.Event()
+
+        async def occupy():
+            # Holds a slot without a worker, like an analysis waiting on its download
+            async with pool._slots:
+                await release.wait()
+
+        pool._ensure_started()
+        holders = [asyncio.create_task(occupy()) for _ in range(pool.capacity)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(PoolSaturated):
+            await pool._run(echo, 1, wait=False)
+        queued = asyncio.create_task(pool._run(echo, 2, wait=True))
+        await asyncio.sleep(0.05)
+        assert not queued.done()
+
+        release.set()
+        await asyncio.gather(*holders)
+        assert await queued == 2
+
+    asyncio.run(run())
+    assert pool.stats()["rejected"] == 1
+
+
+def test_pool_is_replaced_after_a_worker_dies(pool, tmp_path):
+    async def run():
+        # The first attempt kills its worker; the retry runs on a new pool
+        assert await pool._run(crash_once, str(tmp_path / "crashed")) == "recovered"
+        # A task that kills every pool it runs on fails, and the pool still recovers
+        with pytest.raises(worker_pool.BrokenProcessPool):
+            await pool._run(crash)
+        assert await pool._run(echo, "ok") == "ok"
+
+    asyncio.run(run())
+    stats = pool.stats()
+    assert stats["restarts"] == 3
+    assert stats["failed"] == 1
+
+
+def test_health_stays_fast_while_analyses_run(pool, monkeypatch):
+    monkeypatch.setattr(worker_pool, "_analyze", busy_analyze)
+
+    async def run():
+        predictions = asyncio.gather(*(
+            pool.predict(f"recording {i}".encode(), f"r{i}.wav") for i in range(8)
+        ))
+        latencies = []
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://api") as client:
+            while not predictions.done():
+                started = time.perf_counter()
+                response = await client.get("/health")
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200
+                await asyncio.sleep(0.02)
+        return await predictions, latencies
+
+    results, latencies = asyncio.run(run())
+    assert [result["filename"] for result in results] == [f"r{i}.wav" for i in range(8)]
+    assert len(latencies) > 10
+    # Shorter than one analysis, so none of them ran on the event loop
+    assert max(latencies) < 0.25